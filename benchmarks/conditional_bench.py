@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Conditional GET benchmark.
+
+Compares, per public page, the time to answer a revalidation with a matching
+``If-None-Match`` (304) against a page-cache hit and a full render. Run from
+the repository root:
+
+    python benchmarks/conditional_bench.py [--iterations 2000]
+"""
+
+import argparse
+import statistics
+import time
+
+from render_bench import PAGES, render_once
+
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+
+def timed(func, iterations):
+    func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    factory = RequestFactory(HTTP_HOST='localhost')
+    print(f"{'page':<28}{'304':>10}{'cache hit':>12}{'render':>10}")
+    for name in PAGES:
+        path = reverse(name)
+        match = resolve(path)
+        etag = match.func(factory.get(path), **match.kwargs)['ETag']
+        revalidate = factory.get(path, HTTP_IF_NONE_MATCH=etag)
+        plain = factory.get(path)
+
+        def not_modified():
+            response = match.func(revalidate, **match.kwargs)
+            assert response.status_code == 304
+
+        not_modified_time = timed(not_modified, args.iterations)
+        hit_time = timed(lambda: match.func(plain, **match.kwargs), args.iterations)
+        render_time = timed(lambda: render_once(match.func, plain, match.kwargs), args.iterations)
+        print(f'{name:<28}{not_modified_time * 1e6:>8.1f}us{hit_time * 1e6:>10.1f}us{render_time * 1e6:>8.0f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure what database connection handling costs per request.
+
+Runs a stream of emulated requests, each sending Django's
+``request_started`` and ``request_finished`` signals around one
+``SELECT 1``, under each connection mode:
+
+- ``fresh``: ``CONN_MAX_AGE = 0``, a new connection for every request;
+- ``persistent``: connections kept for ``CONN_MAX_AGE`` and health-checked;
+- ``pool``: a psycopg connection pool (PostgreSQL only).
+
+Every mode runs in its own interpreter, configured through the same
+environment variables the site reads. Without ``--database-url`` a temporary
+SQLite database is used. Run from the repository root:
+
+    python benchmarks/db_connections.py --database-url postgres://... \\
+        [--requests 500] [--output db_connections.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Environment per mode, on top of DATABASE_URL.
+MODES = {
+    'fresh': {'DATABASE_POOL': '0', 'DATABASE_CONN_MAX_AGE': '0'},
+    'persistent': {'DATABASE_POOL': '0', 'DATABASE_CONN_MAX_AGE': '600'},
+    'pool': {'DATABASE_POOL': '1'},
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def emulate(requests):
+    """Per-request seconds for ``requests`` request cycles in this process."""
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sgcx_site.settings')
+    import django
+    django.setup()
+    from django.core import signals
+    from django.db import connection
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        signals.request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        signals.request_finished.send(sender=None)
+        timings.append(time.perf_counter() - start)
+    connection.close()
+    return timings
+
+
+def run_mode(mode, database_url, requests):
+    env = {**os.environ, **MODES[mode], 'DATABASE_URL': database_url, 'PYTHONPATH': str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, __file__, '--child', '--requests', str(requests)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'{mode} failed:\n{result.stderr[-2000:]}')
+    timings = json.loads(result.stdout)
+    # The first request opens the connection (or fills the pool) in every mode.
+    steady = timings[1:] or timings
+    return {
+        'first_ms': round(timings[0] * 1000, 3),
+        'mean_ms': round(sum(steady) / len(steady) * 1000, 3),
+        'p50_ms': round(percentile(steady, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(steady, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(steady, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare database connection modes.')
+    parser.add_argument('--database-url', default='',
+                        help='Database to connect to; a temporary SQLite file by default.')
+    parser.add_argument('--modes', nargs='+', choices=MODES)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(emulate(args.requests)))
+        return
+
+    postgres = args.database_url.split(':', 1)[0] in ('postgres', 'postgresql', 'pgsql')
+    modes = args.modes or [mode for mode in MODES if postgres or mode != 'pool']
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f'sqlite:///{directory}/bench.sqlite3'
+        results = {mode: run_mode(mode, database_url, args.requests) for mode in modes}
+
+    print(f"{'mode':<12}{'first ms':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for mode, result in results.items():
+        print(f'{mode:<12}' + ''.join(
+            f'{result[key]:>10.3f}' for key in ('first_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+        ))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
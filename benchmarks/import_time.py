@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Import-time report for booting the site.
+
+Imports ``sgcx_site.wsgi`` (which runs ``django.setup()`` and builds the
+middleware chain) in a fresh interpreter under ``python -X importtime`` and
+reports the slowest modules and the total per top-level package, for each
+site profile. Run from the repository root:
+
+    python benchmarks/import_time.py [--profiles full public] [--top 20] \\
+        [--output import_time.json] [--budget-ms 400]
+
+With ``--budget-ms``, the script exits with status 1 when any profile's total
+import time exceeds the budget, so CI can track boot time.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE = 'sgcx_site.wsgi'
+PROFILES = ('full', 'public')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure(profile, module=MODULE):
+    """``[(module, self_us, cumulative_us, depth)]`` for importing ``module``."""
+    env = {**os.environ, 'SITE_PROFILE': profile, 'PYTHONPATH': str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'importing {module} failed:\n{result.stderr[-2000:]}')
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize(rows, top):
+    total = sum(self_us for _, self_us, _, _ in rows)
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split('.')[0]] += self_us
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        'total_ms': round(total / 1000, 1),
+        'modules': len(rows),
+        'packages_ms': {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+        'slowest': [
+            {'module': name, 'self_ms': round(self_us / 1000, 2), 'cumulative_ms': round(cumulative_us / 1000, 2)}
+            for name, self_us, cumulative_us, _ in slowest
+        ],
+    }
+
+
+def print_summary(profile, summary, top):
+    print(f"\n{profile}: {summary['total_ms']:.1f} ms importing {summary['modules']} modules")
+    print(f"  {'package':<32}{'ms':>8}")
+    for name, ms in list(summary['packages_ms'].items())[:top]:
+        print(f'  {name:<32}{ms:>8.1f}')
+    print(f"  {'slowest modules':<48}{'self ms':>9}{'cum ms':>9}")
+    for row in summary['slowest']:
+        print(f"  {row['module']:<48}{row['self_ms']:>9.2f}{row['cumulative_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import time for booting the site.')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--top', type=int, default=15, help='Rows to show per table.')
+    parser.add_argument('--runs', type=int, default=3, help='Take the fastest of this many runs.')
+    parser.add_argument('--output', type=Path, help='Write the report as JSON to this file.')
+    parser.add_argument('--budget-ms', type=float, help='Fail if a profile imports for longer.')
+    args = parser.parse_args()
+
+    report = {}
+    for profile in args.profiles:
+        # The fastest run is the one least disturbed by the rest of the machine.
+        runs = [summarize(measure(profile), args.top) for _ in range(args.runs)]
+        report[profile] = min(runs, key=lambda summary: summary['total_ms'])
+        print_summary(profile, report[profile], args.top)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.budget_ms is not None:
+        over = {name: s['total_ms'] for name, s in report.items() if s['total_ms'] > args.budget_ms}
+        if over:
+            for name, total in over.items():
+                print(f'\n{name} imports in {total:.1f} ms, over the {args.budget_ms:g} ms budget')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
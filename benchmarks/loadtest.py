@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Load test every public route under a real server.
+
+Starts the site under gunicorn (``sgcx_site.wsgi``) or uvicorn
+(``sgcx_site.asgi``) on a local port, drives every named route in
+``landing/urls.py`` and ``projects/urls.py`` from a pool of keep-alive
+clients, and reports throughput and p50/p95/p99 latency per route. Everything
+runs locally with the standard library; no external load generator is used.
+
+    python benchmarks/loadtest.py --server wsgi --concurrency 16 --duration 20 \\
+        --output bench_output.json
+    python benchmarks/loadtest.py --compare bench_output.json --threshold 0.10
+
+With ``--compare`` the run is checked against a stored result: a route whose
+p95 latency rose, or whose throughput fell, by more than the threshold is
+reported as a regression and the script exits with status 1.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commands per server; Server fills in {bind}, {host} and {port}.
+SERVERS = {
+    'wsgi': lambda workers: [
+        sys.executable, '-m', 'gunicorn', 'sgcx_site.wsgi',
+        '--bind', '{bind}', '--workers', str(workers), '--log-level', 'warning',
+    ],
+    'asgi': lambda workers: [
+        sys.executable, '-m', 'uvicorn', 'sgcx_site.asgi:application',
+        '--host', '{host}', '--port', '{port}',
+        '--workers', str(workers), '--log-level', 'warning',
+    ],
+}
+SERVER_MODULES = {'wsgi': 'gunicorn', 'asgi': 'uvicorn'}
+
+# The site redirects plain HTTP in production; present as an HTTPS proxy hop.
+REQUEST_HEADERS = {'X-Forwarded-Proto': 'https', 'Accept-Encoding': 'gzip, br'}
+
+
+def discover_routes():
+    """``[(name, path)]`` for every public route, read from the URLconf."""
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sgcx_site.settings')
+    import django
+    django.setup()
+    from sgcx_site.routes import public_routes
+    return [(route.name if not route.kwargs else f'{route.name}[{route.path}]', route.path)
+            for route in public_routes()]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with status {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server did not listen on port {port} within {timeout}s')
+
+
+class Server:
+    """A server subprocess bound to a free local port."""
+
+    def __init__(self, command, env=None):
+        self.port = free_port()
+        self.command = [
+            part.format(bind=f'127.0.0.1:{self.port}', host='127.0.0.1', port=self.port)
+            for part in command
+        ]
+        # All load comes from one address, which the rate limiter would refuse.
+        self.env = {**os.environ, 'RATE_LIMIT': '0', **(env or {})}
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, cwd=ROOT, env=self.env, start_new_session=True)
+        try:
+            wait_for_port(self.port, self.process)
+        except Exception:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process and self.process.poll() is None:
+            os.killpg(self.process.pid, signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+
+
+def _get(connection, path):
+    connection.request('GET', path, headers={**REQUEST_HEADERS, 'Host': 'localhost'})
+    response = connection.getresponse()
+    response.read()
+    if response.will_close:
+        connection.close()
+    return response.status
+
+
+def _client_thread(port, routes, offset, deadline, samples, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    index = offset
+    while time.monotonic() < deadline:
+        name, path = routes[index % len(routes)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            try:
+                status = _get(connection, path)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; clients
+                # retry those on a new connection.
+                connection.close()
+                status = _get(connection, path)
+            elapsed = time.perf_counter() - start
+            if status != 200:
+                errors[name] = errors.get(name, 0) + 1
+            else:
+                samples.setdefault(name, []).append(elapsed)
+        except (OSError, http.client.HTTPException):
+            errors[name] = errors.get(name, 0) + 1
+            connection.close()
+    connection.close()
+
+
+def _client_process(port, routes, threads, first_offset, duration):
+    deadline = time.monotonic() + duration
+    samples, errors = {}, {}
+    pool = [
+        threading.Thread(
+            target=_client_thread,
+            args=(port, routes, first_offset + i, deadline, samples, errors),
+        )
+        for i in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return samples, errors
+
+
+def drive(port, routes, concurrency, duration, warmup=2.0):
+    """
+    Run ``concurrency`` closed-loop clients for ``duration`` seconds.
+
+    Clients are spread over several processes so the load generator's own
+    GIL does not cap throughput. Returns ``(samples, errors)`` keyed by route.
+    """
+    if warmup:
+        _client_process(port, routes, 1, 0, warmup)
+    processes = max(1, min(concurrency, os.cpu_count() or 1))
+    per_process = [concurrency // processes + (i < concurrency % processes) for i in range(processes)]
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        jobs = [
+            pool.apply_async(_client_process, (port, routes, threads, sum(per_process[:i]), duration))
+            for i, threads in enumerate(per_process) if threads
+        ]
+        results = [job.get() for job in jobs]
+    samples, errors = {}, {}
+    for process_samples, process_errors in results:
+        for name, values in process_samples.items():
+            samples.setdefault(name, []).extend(values)
+        for name, count in process_errors.items():
+            errors[name] = errors.get(name, 0) + count
+    return samples, errors
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values, errors, duration):
+    values = sorted(values)
+    ms = lambda seconds: None if seconds is None else round(seconds * 1000, 3)  # noqa: E731
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'rps': round(len(values) / duration, 1),
+        'mean_ms': ms(sum(values) / len(values)) if values else None,
+        'p50_ms': ms(percentile(values, 0.50)),
+        'p95_ms': ms(percentile(values, 0.95)),
+        'p99_ms': ms(percentile(values, 0.99)),
+    }
+
+
+def report(samples, errors, routes, duration):
+    result = {}
+    for name, _ in routes:
+        result[name] = summarize(samples.get(name, []), errors.get(name, 0), duration)
+    everything = [value for values in samples.values() for value in values]
+    result['TOTAL'] = summarize(everything, sum(errors.values()), duration)
+    return result
+
+
+def print_report(title, result):
+    print(f'\n{title}')
+    print(f"{'route':<40}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, row in result.items():
+        cells = [row['p50_ms'], row['p95_ms'], row['p99_ms']]
+        cells = ''.join(f'{cell:>9.2f}' if cell is not None else f"{'-':>9}" for cell in cells)
+        print(f"{name:<40}{row['rps']:>9.1f}{cells}{row['errors']:>8}")
+
+
+def compare(current, baseline, threshold):
+    """Regressions of ``current`` against ``baseline`` as readable strings."""
+    regressions = []
+    for server, routes in current['results'].items():
+        for name, row in routes.items():
+            base = baseline.get('results', {}).get(server, {}).get(name)
+            if not base:
+                continue
+            if base['p95_ms'] and row['p95_ms'] and row['p95_ms'] > base['p95_ms'] * (1 + threshold):
+                regressions.append(f"{server} {name}: p95 {base['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms")
+            if base['rps'] and row['rps'] < base['rps'] * (1 - threshold):
+                regressions.append(f"{server} {name}: {base['rps']:.1f} -> {row['rps']:.1f} req/s")
+            if row['errors'] > base['errors']:
+                regressions.append(f"{server} {name}: errors {base['errors']} -> {row['errors']}")
+    return regressions
+
+
+def run(server, command, routes, args, env=None):
+    with Server(command, env=env) as running:
+        samples, errors = drive(running.port, routes, args.concurrency, args.duration)
+    return report(samples, errors, routes, args.duration)
+
+
+def server_available(server):
+    module = SERVER_MODULES[server]
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', choices=[*SERVERS, 'all'], default='wsgi')
+    parser.add_argument('--workers', type=int, default=2, help='Server worker processes.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server.')
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file.')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON to check for regressions.')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed relative regression.')
+    args = parser.parse_args()
+
+    routes = discover_routes()
+    servers = list(SERVERS) if args.server == 'all' else [args.server]
+    results = {}
+    for server in servers:
+        if not server_available(server):
+            print(f'Skipping {server}: {SERVER_MODULES[server]} is not installed')
+            continue
+        command = SERVERS[server](args.workers)
+        results[server] = run(server, command, routes, args)
+        print_report(f'{server} ({args.workers} workers, {args.concurrency} clients, {args.duration:g}s)',
+                     results[server])
+
+    output = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'git': _git_revision(),
+        },
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(output, indent=2))
+        print(f'\nResults written to {args.output}')
+    if args.compare:
+        regressions = compare(output, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f'\nRegressions against {args.compare} (threshold {args.threshold:.0%}):')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print(f'\nNo regressions against {args.compare}')
+
+
+def _git_revision():
+    if not shutil.which('git'):
+        return None
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+if __name__ == '__main__':
+    main()
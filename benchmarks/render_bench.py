@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Template render benchmark.
+
+Renders each public page straight through its view, bypassing the page cache,
+and prints the median and p95 render time per page. Run from the repository
+root:
+
+    python benchmarks/render_bench.py [--iterations 500]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sgcx_site.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import RequestFactory  # noqa: E402
+from django.urls import resolve, reverse  # noqa: E402
+
+PAGES = [
+    'landing:home',
+    'landing:about',
+    'landing:research',
+    'landing:contact',
+    'projects:project_list',
+]
+
+
+def render_once(view, request, kwargs):
+    # Skip the page cache and any other view decorators.
+    while hasattr(view, '__wrapped__'):
+        view = view.__wrapped__
+    return view(request, **kwargs)
+
+
+def bench(path, iterations):
+    factory = RequestFactory(HTTP_HOST='localhost')
+    match = resolve(path)
+    request = factory.get(path)
+    render_once(match.func, request, match.kwargs)  # warm the template loader
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_once(match.func, request, match.kwargs)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'page':<28}{'median':>12}{'p95':>12}")
+    for name in PAGES:
+        median, p95 = bench(reverse(name), args.iterations)
+        print(f'{name:<28}{median * 1e6:>10.0f}us{p95 * 1e6:>10.0f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the gunicorn server profiles on this app.
+
+Starts ``gunicorn -c gunicorn.conf.py`` once per profile in
+``sgcx_site.serving.PROFILES`` and load tests every public route, optionally
+while a number of slow clients trickle their request headers in, which is
+what ties up sync workers behind a real network. Run from the repository root:
+
+    python benchmarks/server_profiles.py [--profiles sync gthread] \\
+        [--workers 2] [--concurrency 16] [--duration 10] [--slow-clients 4]
+"""
+
+import argparse
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+from loadtest import ROOT, Server, discover_routes, drive, print_report, report
+
+sys.path.insert(0, str(ROOT))
+from sgcx_site.serving import PROFILES  # noqa: E402
+
+
+def _slow_client(port, stop):
+    """Send request headers one byte per second until ``stop`` is set."""
+    header = b'GET / HTTP/1.1\r\nHost: localhost\r\nX-Slow: ' + b'x' * 4096
+    while not stop.is_set():
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+                for byte in header:
+                    if stop.wait(1):
+                        return
+                    sock.sendall(bytes([byte]))
+        except OSError:
+            # The server gave up on this connection; open another.
+            stop.wait(0.1)
+
+
+def run_profile(profile, routes, args):
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', '{bind}']
+    env = {'GUNICORN_PROFILE': profile, 'WEB_CONCURRENCY': str(args.workers)}
+    with Server(command, env=env) as server:
+        stop = threading.Event()
+        for _ in range(args.slow_clients):
+            threading.Thread(target=_slow_client, args=(server.port, stop), daemon=True).start()
+        try:
+            samples, errors = drive(server.port, routes, args.concurrency, args.duration)
+        finally:
+            stop.set()
+    return report(samples, errors, routes, args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn server profiles.')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--slow-clients', type=int, default=0,
+                        help='Connections that send their request headers very slowly.')
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    routes = discover_routes()
+    results = {}
+    for profile in args.profiles:
+        results[profile] = run_profile(profile, routes, args)
+        print_report(f'{profile} ({args.workers} workers, {args.concurrency} clients, '
+                     f'{args.slow_clients} slow)', results[profile])
+
+    print(f"\n{'profile':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for profile, result in results.items():
+        total = result['TOTAL']
+        cells = ''.join(
+            f'{total[key]:>10.2f}' if total[key] is not None else f"{'-':>10}"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+        )
+        print(f"{profile:<12}{total['rps']:>10.1f}{cells}{total['errors']:>8}")
+
+    if args.output:
+        args.output.write_text(json.dumps({'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
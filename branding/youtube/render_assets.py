@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+SGCX YouTube Assets Renderer
+Draws the YouTube profile picture and banner with Pillow, without a browser
+
+The layouts in youtube_assets_capture.html are described declaratively in
+ASSETS below (sizes in CSS pixels: 1rem = 16px) and drawn directly, so no
+Playwright or Chromium download is needed. Text is set in the DejaVu Serif
+bundled in branding/fonts (the HTML names Georgia), so every machine draws
+the same images. Each output is checked against YouTube's upload limits; the
+script exits with status 1 if one is too large.
+
+    python render_assets.py [--output-dir DIR] [--only sgcx_youtube_banner.png]
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# In the repo rather than looked up on the machine: no fallback, so the
+# images never depend on what is installed.
+FONT_DIR = Path(__file__).resolve().parent.parent / 'fonts'
+FONTS = {
+    'bold': FONT_DIR / 'DejaVuSerif-Bold.ttf',
+    'regular': FONT_DIR / 'DejaVuSerif.ttf',
+}
+
+
+@dataclass(frozen=True)
+class Gradient:
+    """CSS linear-gradient(135deg, start, end)"""
+    start: str = '#667eea'
+    end: str = '#764ba2'
+
+
+@dataclass(frozen=True)
+class Shadow:
+    """CSS text-shadow: dx dy blur rgba(0, 0, 0, opacity)"""
+    dx: float
+    dy: float
+    blur: float
+    opacity: float
+
+
+@dataclass(frozen=True)
+class Text:
+    text: str
+    size: float
+    color: tuple = (255, 255, 255, 255)
+    weight: str = 'bold'
+    line_height: float = 1.0
+    margin: tuple = (0, 0)  # top, bottom
+    letter_spacing: float = 0  # em
+    shadow: Shadow = None
+
+
+@dataclass(frozen=True)
+class Logo:
+    """SGC in front of an outlined X stretched horizontally"""
+    sgc: Text
+    x_size: float
+    x_scale: float = 1.8
+    x_stroke: int = 3
+    x_color: tuple = (255, 255, 255, 128)
+
+
+@dataclass(frozen=True)
+class Stack:
+    """Left-aligned column of text lines"""
+    children: tuple
+
+
+@dataclass(frozen=True)
+class Row:
+    """Centered row, like display: flex with gap"""
+    children: tuple
+    gap: float = 0
+
+
+@dataclass(frozen=True)
+class Asset:
+    filename: str
+    size: tuple
+    content: object
+    max_bytes: int
+    background: Gradient = field(default_factory=Gradient)
+
+
+LOGO_SHADOW = Shadow(3, 3, 6, 0.4)
+
+ASSETS = (
+    Asset(
+        filename='sgcx_youtube_profile.png',
+        size=(512, 512),
+        content=Logo(
+            sgc=Text('SGC', size=128, letter_spacing=0.15, shadow=LOGO_SHADOW),
+            x_size=192,
+        ),
+        max_bytes=4 * MB,
+    ),
+    Asset(
+        filename='sgcx_youtube_banner.png',
+        size=(2560, 1440),
+        content=Row(gap=120, children=(
+            Logo(sgc=Text('SGC', size=80, letter_spacing=0.15, shadow=LOGO_SHADOW), x_size=128),
+            Stack(children=(
+                Text('SGCX Research', size=48, line_height=0.9, shadow=Shadow(2, 2, 4, 0.4)),
+                Text('Statistical AI through', size=20.8, weight='regular', margin=(8, 0),
+                     color=(255, 255, 255, 230), shadow=Shadow(1, 1, 2, 0.3)),
+                Text('Human-AI Collaboration', size=20.8, weight='regular', margin=(0, 8),
+                     color=(255, 255, 255, 230), shadow=Shadow(1, 1, 2, 0.3)),
+                Text('sgcx.org', size=17.6, weight='regular', line_height=1.15,
+                     color=(255, 255, 255, 204), shadow=Shadow(1, 1, 2, 0.3)),
+            )),
+        )),
+        max_bytes=6 * MB,
+    ),
+)
+
+_fonts = {}
+
+
+def load_font(weight, size):
+    """The bundled font for weight at size"""
+    key = (weight, size)
+    if key not in _fonts:
+        try:
+            _fonts[key] = ImageFont.truetype(str(FONTS[weight]), round(size))
+        except OSError as error:
+            sys.exit(f'❌ Cannot load {FONTS[weight]}: {error}')
+    return _fonts[key]
+
+
+def gradient(size, spec):
+    """135deg gradient: the color depends on x + y only"""
+    width, height = size
+    ramp = Image.linear_gradient('L').rotate(90).resize((width + height - 1, 1))
+    mask = Image.new('L', size)
+    for y in range(height):
+        mask.paste(ramp.crop((y, 0, y + width, 1)), (0, y))
+    # The mask runs from black at the top-left corner to white at the bottom-right
+    return Image.composite(Image.new('RGBA', size, spec.end), Image.new('RGBA', size, spec.start), mask)
+
+
+def text_width(spec):
+    font = load_font(spec.weight, spec.size)
+    spacing = spec.letter_spacing * spec.size
+    return sum(font.getlength(char) + spacing for char in spec.text)
+
+
+def measure(node):
+    """(width, height) of a node's CSS box"""
+    if isinstance(node, Text):
+        top, bottom = node.margin
+        return text_width(node), node.size * node.line_height + top + bottom
+    if isinstance(node, Logo):
+        return measure(node.sgc)
+    if isinstance(node, Stack):
+        sizes = [measure(child) for child in node.children]
+        return max(w for w, _ in sizes), sum(h for _, h in sizes)
+    if isinstance(node, Row):
+        sizes = [measure(child) for child in node.children]
+        return sum(w for w, _ in sizes) + node.gap * (len(sizes) - 1), max(h for _, h in sizes)
+    raise TypeError(f'Unknown layout node: {node!r}')
+
+
+def draw_shadow(canvas, layer, shadow, position):
+    alpha = layer.getchannel('A').point(lambda value: round(value * shadow.opacity))
+    if shadow.blur:
+        alpha = alpha.filter(ImageFilter.GaussianBlur(shadow.blur / 2))
+    shade = Image.new('RGBA', layer.size, (0, 0, 0, 0))
+    shade.putalpha(alpha)
+    canvas.alpha_composite(shade, (position[0] + round(shadow.dx), position[1] + round(shadow.dy)))
+
+
+def draw_text(canvas, spec, x, y):
+    """Draw spec with its line box's top-left corner at (x, y)"""
+    font = load_font(spec.weight, spec.size)
+    spacing = spec.letter_spacing * spec.size
+    # A layer just big enough for the glyphs and their shadow, not the canvas
+    pad = round(spec.size)
+    left, top = round(x) - pad, round(y + spec.margin[0]) - pad
+    layer = Image.new('RGBA', (round(text_width(spec)) + 2 * pad, round(spec.size * spec.line_height) + 2 * pad))
+    draw = ImageDraw.Draw(layer)
+    pen = x - left
+    middle = y + spec.margin[0] + spec.size * spec.line_height / 2 - top
+    for char in spec.text:
+        draw.text((pen, middle), char, font=font, fill=spec.color, anchor='lm')
+        pen += font.getlength(char) + spacing
+    if spec.shadow:
+        draw_shadow(canvas, layer, spec.shadow, (left, top))
+    canvas.alpha_composite(layer, (left, top))
+
+
+def draw_logo(canvas, spec, x, y):
+    width, height = measure(spec.sgc)
+    font = load_font('bold', spec.x_size)
+    glyph_width = round(font.getlength('X')) + 2 * spec.x_stroke
+    layer = Image.new('RGBA', (glyph_width, round(spec.x_size * 1.4)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    center = (layer.width / 2, layer.height / 2)
+    # Stroke, then clear the glyph itself: an outline like -webkit-text-stroke
+    draw.text(center, 'X', font=font, fill=spec.x_color, anchor='mm',
+              stroke_width=spec.x_stroke, stroke_fill=spec.x_color)
+    draw.text(center, 'X', font=font, fill=(0, 0, 0, 0), anchor='mm')
+    layer = layer.resize((round(layer.width * spec.x_scale), layer.height), Image.LANCZOS)
+    canvas.alpha_composite(layer, (round(x + (width - layer.width) / 2), round(y + (height - layer.height) / 2)))
+    draw_text(canvas, spec.sgc, x, y)
+
+
+def draw(canvas, node, x, y):
+    if isinstance(node, Text):
+        draw_text(canvas, node, x, y)
+    elif isinstance(node, Logo):
+        draw_logo(canvas, node, x, y)
+    elif isinstance(node, Stack):
+        for child in node.children:
+            draw(canvas, child, x, y)
+            y += measure(child)[1]
+    elif isinstance(node, Row):
+        _, height = measure(node)
+        for child in node.children:
+            child_width, child_height = measure(child)
+            draw(canvas, child, x, y + (height - child_height) / 2)
+            x += child_width + node.gap
+    else:
+        raise TypeError(f'Unknown layout node: {node!r}')
+
+
+def render(asset):
+    """The asset as an RGB image"""
+    canvas = gradient(asset.size, asset.background)
+    width, height = measure(asset.content)
+    draw(canvas, asset.content, (asset.size[0] - width) / 2, (asset.size[1] - height) / 2)
+    return canvas.convert('RGB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the SGCX YouTube assets with Pillow.')
+    parser.add_argument('--output-dir', type=Path, default=Path(__file__).resolve().parent)
+    parser.add_argument('--only', nargs='+', choices=[asset.filename for asset in ASSETS])
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    too_large = []
+    for asset in ASSETS:
+        if args.only and asset.filename not in args.only:
+            continue
+        start = time.perf_counter()
+        path = args.output_dir / asset.filename
+        render(asset).save(path, optimize=True)
+        elapsed = time.perf_counter() - start
+        size = path.stat().st_size
+        status = '✅' if size <= asset.max_bytes else '⚠️  over'
+        print(f'{status} {path} {asset.size[0]}x{asset.size[1]}: {size / MB:.2f}MB '
+              f'(limit {asset.max_bytes // MB}MB), {elapsed:.2f}s')
+        if size > asset.max_bytes:
+            too_large.append(asset.filename)
+
+    if resource is not None:
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if sys.platform == 'darwin':
+            peak_mb /= 1024  # bytes there, kilobytes elsewhere
+        print(f'Peak memory: {peak_mb:.0f}MB')
+    if too_large:
+        print(f"❌ Too large for YouTube: {', '.join(too_large)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
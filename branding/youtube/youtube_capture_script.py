@@ -2,18 +2,33 @@
 """
 SGCX YouTube Assets Capture Script
 Captures YouTube profile picture and banner from HTML at exact sizes
+
+render_assets.py draws the same assets with Pillow, without a browser; this
+script remains for checking them against what Chromium renders.
 """
 
 import os
-import time
 from pathlib import Path
 
+# Resolves once web fonts have loaded and two frames have been laid out and painted
+RENDERED_JS = """
+    async () => {
+        await document.fonts.ready;
+        await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+    }
+"""
+
 def setup_output_directory():
     """Create output directory for YouTube assets"""
     output_dir = Path("youtube_assets")
     output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
+def wait_until_rendered(page):
+    """Wait for the page to finish loading and painting, rather than a fixed delay"""
+    page.wait_for_load_state("load")
+    page.evaluate(RENDERED_JS)
+
 def check_playwright():
     """Check if playwright is installed and install if needed"""
     try:
@@ -61,10 +76,10 @@ def capture_youtube_assets():
         page = browser.new_page(viewport={"width": 3000, "height": 2000})
         
         # Load the HTML file
-        page.goto(f"file://{html_file}")
+        page.goto(f"file://{html_file}", wait_until="load")
         
-        # Wait for page to load and fonts to render
-        time.sleep(3)
+        # Wait for fonts to load and the first frames to render
+        wait_until_rendered(page)
         
         # Force layout recalculation to ensure flexbox is properly rendered
         page.evaluate("""
@@ -83,8 +98,8 @@ def capture_youtube_assets():
             window.getComputedStyle(document.body).height;
         """)
         
-        # Wait for layout to settle
-        time.sleep(2)
+        # Wait for the new layout to be painted
+        wait_until_rendered(page)
         
         # Capture profile picture
         print(f"\n📸 Capturing YouTube Profile Picture...")
@@ -127,7 +142,7 @@ def capture_youtube_assets():
             
             # Scroll the banner into view to ensure proper rendering
             banner_locator.scroll_into_view_if_needed()
-            time.sleep(1)
+            wait_until_rendered(page)
             
             # Debug: Check the actual rendered layout
             banner_info = page.evaluate("""
@@ -230,8 +245,8 @@ def debug_elements():
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)  # Visible for debugging
         page = browser.new_page(viewport={"width": 3000, "height": 2000})
-        page.goto(f"file://{html_file}")
-        time.sleep(2)
+        page.goto(f"file://{html_file}", wait_until="load")
+        wait_until_rendered(page)
         
         print("🔍 Debugging YouTube elements:")
         print("=" * 40)
@@ -0,0 +1,78 @@
+# gunicorn.conf.py
+"""
+Gunicorn configuration for the web dyno.
+
+Worker class, worker and thread counts come from sgcx_site.serving; set
+GUNICORN_PROFILE to sync, gthread or uvicorn to switch profiles.
+"""
+
+import gc
+import os
+import shutil
+import subprocess
+import sys
+
+from sgcx_site.serving import server_config
+
+_config = server_config()
+
+wsgi_app = _config['wsgi_app']
+worker_class = _config['worker_class']
+workers = _config['workers']
+threads = _config['threads']
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Import Django once in the arbiter; forked workers share the loaded modules
+# copy-on-write instead of each importing the app.
+preload_app = True
+
+max_requests = _config['max_requests']
+max_requests_jitter = _config['max_requests_jitter']
+
+# Heroku's router times requests out at 30 seconds.
+timeout = 30
+graceful_timeout = 20
+keepalive = 5
+
+# Worker heartbeats go to a tmpfs so a slow disk never looks like a hung worker.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Workers share one metrics directory so a scrape reports for all of them.
+os.environ.setdefault('METRICS_DIR', f"/tmp/sgcx-metrics-{os.environ.get('PORT', '8000')}")
+
+
+def on_starting(server):
+    server.log.info(
+        'Serving profile %s: %d worker(s) x %d thread(s), %s',
+        _config['profile'], workers, threads, worker_class,
+    )
+    # Snapshots from a previous arbiter would be merged into this one's totals.
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def when_ready(server):
+    # Warm the app up in the arbiter (templates, URLs, static manifest, search
+    # index, every public page), so every forked worker starts warm and shares
+    # it. Takes at most WARMUP_BUDGET seconds.
+    from sgcx_site.warmup import warm_up
+
+    server.log.info('%s', warm_up())
+
+    # The release phase purged the CDN while the old release still served;
+    # now that this one does, purge those keys again. A separate process, so
+    # neither a slow CDN API nor a thread is in the arbiter when it forks.
+    subprocess.Popen([sys.executable, 'manage.py', 'purge_cdn', '--pending'],
+                     cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    # Move everything the preloaded app allocated out of the collector's view,
+    # so collections in the workers do not write to (and un-share) its pages.
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # Keep the exited worker's counts, but not a file per worker ever started.
+    from sgcx_site.metrics import retire
+
+    retire(os.environ['METRICS_DIR'], worker.pid)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.compatibility, deploy=True)
+def contact_queue_check(app_configs, **kwargs):
+    # Without Redis, enqueue only delivers inline in DEBUG; a deployed site
+    # would refuse every contact submission.
+    if settings.DEBUG or settings.REDIS_URL:
+        return []
+    return [Error(
+        'REDIS_URL is not set, so the contact form cannot queue submissions.',
+        hint='Set REDIS_URL, or DEBUG=True to deliver submissions inline.',
+        id='landing.E001',
+    )]
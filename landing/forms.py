@@ -0,0 +1,22 @@
+# landing/forms.py
+from django import forms
+
+from .outbox import SUBJECTS
+
+
+class ContactForm(forms.Form):
+    kind = forms.ChoiceField(choices=list(SUBJECTS.items()), initial='general')
+    name = forms.CharField(max_length=100)
+    email = forms.EmailField(max_length=254)
+    organization = forms.CharField(max_length=200, required=False)
+    message = forms.CharField(max_length=5000, widget=forms.Textarea)
+    # Hidden from people by CSS; bots that fill in every field fill this too.
+    website = forms.CharField(required=False)
+
+    @property
+    def is_spam(self):
+        return bool(self.cleaned_data.get('website'))
+
+    def submission(self):
+        """The fields to queue for delivery."""
+        return {name: self.cleaned_data[name] for name in ('kind', 'name', 'email', 'organization', 'message')}
@@ -0,0 +1,59 @@
+# landing/management/commands/build_critical_css.py
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sgcx_site.critical_css import (
+    cache_key, critical_rules, document_elements, stylesheet_source, write_index,
+)
+from sgcx_site.routes import public_routes, rendering_client
+
+
+class Command(BaseCommand):
+    help = 'Extract the critical subset of a stylesheet for every public page template.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stylesheet', default='css/main.css', help='Static name of the stylesheet.')
+
+    def handle(self, *args, **options):
+        stylesheet_name = options['stylesheet']
+        stylesheet = stylesheet_source(stylesheet_name)
+        root = Path(settings.CRITICAL_CSS_ROOT)
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Pages sharing a template contribute their elements to one subset.
+        elements = {}
+        failures = []
+        with rendering_client() as client:
+            for route in public_routes():
+                response = client.get(route.path, secure=True)
+                if response.status_code != 200 or not response.templates:
+                    failures.append(f'{route.name} ({route.path}): HTTP {response.status_code}')
+                    continue
+                template_name = response.templates[0].name
+                html = response.content.decode(response.charset or 'utf-8')
+                elements.setdefault(template_name, []).extend(document_elements(html))
+        if failures:
+            raise CommandError('Could not render:\n  ' + '\n  '.join(failures))
+
+        index = {}
+        built = 0
+        for template_name, template_elements in sorted(elements.items()):
+            key = cache_key(template_name, stylesheet)
+            target = root / f'{key}.css'
+            if not target.exists():
+                css = critical_rules(stylesheet, template_elements)
+                target.write_text(css, encoding='utf-8')
+                built += 1
+                self.stdout.write(f'{template_name}: {len(css)} of {len(stylesheet)} bytes')
+            index[template_name] = key
+        write_index({stylesheet_name: index})
+
+        live = {f'{key}.css' for key in index.values()}
+        for stale in root.glob('*.css'):
+            if stale.name not in live:
+                stale.unlink()
+        self.stdout.write(self.style.SUCCESS(
+            f'{built} critical stylesheet(s) built, {len(index) - built} unchanged'
+        ))
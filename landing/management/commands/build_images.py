@@ -0,0 +1,18 @@
+# landing/management/commands/build_images.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sgcx_site.images import build_variants
+
+
+class Command(BaseCommand):
+    help = 'Build WebP/AVIF/PNG variants at 1x/2x/3x for the images in landing/static.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild variants that are up to date.')
+
+    def handle(self, *args, **options):
+        source_root = settings.BASE_DIR / 'landing' / 'static'
+        index = build_variants(source_root, force=options['force'], log=self.stdout.write)
+        count = sum(len(entry['variants']) for entry in index.values())
+        self.stdout.write(self.style.SUCCESS(f'{count} variant(s) for {len(index)} image(s)'))
@@ -0,0 +1,19 @@
+# landing/management/commands/collectstatic.py
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+
+from logo_gen import build_logos
+
+
+class Command(CollectStaticCommand):
+    help = CollectStaticCommand.help + ' Rebuilds the logos from logo_gen.py first.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--skip-logos', action='store_true', help='Do not rebuild the logos.')
+
+    def handle(self, **options):
+        # The logos are generated sources: build them before they are
+        # collected, and before build_images derives variants of the PNGs.
+        if not options['skip_logos']:
+            build_logos(log=self.stdout.write if options['verbosity'] >= 1 else lambda message: None)
+        return super().handle(**options)
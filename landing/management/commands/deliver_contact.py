@@ -0,0 +1,96 @@
+# landing/management/commands/deliver_contact.py
+"""
+Deliver queued contact form submissions (see ``landing.outbox``).
+
+Runs as the ``worker`` process in the ``Procfile``. Submissions are taken
+from Redis in batches and sent over one SMTP connection per batch; failures
+are retried with backoff. On SIGTERM (a Heroku restart) the current batch is
+finished before the worker exits. Run a single worker: on start it requeues
+whatever was left in the processing list, which another live worker would
+still be sending.
+
+If Redis is unreachable the worker waits, longer after each failure, and
+then requeues the processing list again: a reply lost in the failure may
+have moved submissions there. A submission may then be sent twice, but none
+is lost.
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from redis.exceptions import RedisError
+
+from landing import outbox
+from sgcx_site.redis_client import SOCKET_TIMEOUT, redis_client
+
+# Seconds to wait after consecutive Redis errors.
+BACKOFF = (1, 2, 5, 10, 30)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued contact form submissions by email.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Submissions sent per SMTP connection.')
+        parser.add_argument(
+            '--block', type=int, default=5,
+            help=f'Seconds to wait for a submission before polling retries (less than {SOCKET_TIMEOUT}).',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        client = redis_client()
+        if client is None:
+            raise CommandError('REDIS_URL is not set; without it submissions are delivered inline.')
+        if not 0 < options['block'] < SOCKET_TIMEOUT:
+            raise CommandError(f'--block must be between 1 and {SOCKET_TIMEOUT - 1} seconds.')
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        sent = 0
+        errors = 0
+        recovering = True
+        while not self.stopping:
+            try:
+                if recovering:
+                    recovered = outbox.recover(client)
+                    if recovered:
+                        self.stdout.write(f'Requeued {recovered} unfinished submission(s)')
+                    recovering = False
+                delivered = self.deliver_batch(client, options)
+            except RedisError as error:
+                delay = BACKOFF[min(errors, len(BACKOFF) - 1)]
+                errors += 1
+                recovering = True
+                self.stderr.write(f'Redis error ({error}); retrying in {delay}s')
+                self.pause(delay)
+                continue
+            errors = 0
+            if delivered is None:
+                if options['once']:
+                    break
+                continue
+            sent += delivered
+        self.stdout.write(self.style.SUCCESS(f'{sent} submission(s) delivered'))
+
+    def deliver_batch(self, client, options):
+        """Send one batch; the number delivered, or ``None`` if the queue was empty."""
+        outbox.requeue_due(client)
+        batch = outbox.claim(client, options['batch_size'], 0.1 if options['once'] else options['block'])
+        if not batch:
+            return None
+        failed = outbox.send_batch(batch)
+        outbox.finish(client, batch, failed)
+        self.stdout.write(f'Sent {len(batch) - len(failed)} of {len(batch)} submission(s)')
+        return len(batch) - len(failed)
+
+    def pause(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(max(0, min(0.5, deadline - time.monotonic())))
+
+    def stop(self, signum, frame):
+        self.stopping = True
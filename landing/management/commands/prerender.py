@@ -0,0 +1,125 @@
+# landing/management/commands/prerender.py
+"""
+Render every public route to static HTML for WhiteNoise to serve.
+
+Each route is fetched through the test client, so the output is exactly what
+the view would return. Pages are written as ``<path>/index.html`` under
+``PRERENDER_ROOT`` together with gzip (and, when the ``brotli`` package is
+installed, Brotli) variants. A manifest records the templates each page
+rendered; on the next run a page is only re-rendered when the fingerprint of
+those templates, the static files they reference, the view module, the
+catalog entries behind the page, the code of the template tags and themes
+(``rendering_sources``) or the critical CSS built for the pages changes.
+"""
+
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sgcx_site.compression import compress_variants
+from sgcx_site.routes import public_routes, rendering_client, route_fingerprint
+from sgcx_site.versioning import dependency_fingerprint, rendering_sources
+
+# File suffixes WhiteNoise looks for next to the identity file.
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def output_path(root, url_path):
+    return root / url_path.strip('/') / 'index.html'
+
+
+def shared_fingerprint():
+    """Digest of what every page depends on besides its templates and view."""
+    digest = hashlib.sha256()
+    for path in rendering_sources():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    critical_root = Path(settings.CRITICAL_CSS_ROOT)
+    if critical_root.is_dir():
+        for path in sorted(critical_root.iterdir()):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest().encode()
+
+
+def write_if_changed(path, content):
+    if path.exists() and path.read_bytes() == content:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+
+
+class Command(BaseCommand):
+    help = 'Prerender the public site to static HTML served by WhiteNoise.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-render every route even if its dependencies are unchanged.',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.PRERENDER_ROOT)
+        manifest_path = Path(settings.PRERENDER_MANIFEST)
+        try:
+            previous = json.loads(manifest_path.read_text())
+        except (FileNotFoundError, ValueError):
+            previous = {}
+
+        manifest = {}
+        failures = []
+        rendered = skipped = 0
+        shared = shared_fingerprint()
+
+        with rendering_client() as client:
+            for route in public_routes():
+                entry = previous.get(route.path)
+                view_source = inspect.getsourcefile(inspect.unwrap(route.callback))
+                extra = (Path(view_source).read_bytes(), route_fingerprint(route).encode(), shared)
+                target = output_path(root, route.path)
+
+                if entry and not options['force'] and target.exists():
+                    try:
+                        fingerprint = dependency_fingerprint(entry['templates'], extra)
+                    except Exception:
+                        fingerprint = None
+                    if fingerprint == entry['fingerprint']:
+                        manifest[route.path] = entry
+                        skipped += 1
+                        continue
+
+                response = client.get(route.path, secure=True)
+                if response.status_code != 200:
+                    failures.append(f'{route.name} ({route.path}): HTTP {response.status_code}')
+                    continue
+
+                templates = sorted({template.name for template in response.templates if template.name})
+                content = response.content
+                write_if_changed(target, content)
+                for coding, data in compress_variants(content).items():
+                    write_if_changed(target.with_name(target.name + SUFFIXES[coding]), data)
+                manifest[route.path] = {
+                    'name': route.name,
+                    'templates': templates,
+                    'fingerprint': dependency_fingerprint(templates, extra),
+                }
+                rendered += 1
+                self.stdout.write(f'Rendered {route.name} -> {target.relative_to(root)}')
+
+        for path in set(previous) - set(manifest):
+            target = output_path(root, path)
+            for stale in [target] + [target.with_name(target.name + suffix) for suffix in SUFFIXES.values()]:
+                stale.unlink(missing_ok=True)
+
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+        if failures:
+            raise CommandError('Prerendering failed for:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} page(s) rendered, {skipped} unchanged, output in {root}'
+        ))
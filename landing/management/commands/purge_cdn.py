@@ -0,0 +1,86 @@
+# landing/management/commands/purge_cdn.py
+"""
+Purge from the CDN what changed since the previous deploy (see ``sgcx_site.cdn``).
+
+Run in Heroku's release phase (see ``Procfile``): every surrogate key of
+this build is fingerprinted, compared with the keys recorded by the
+previous run, and the keys that changed or disappeared are purged through
+``CDN_BACKEND``. This build's keys are recorded only after the purge
+succeeds, so a failed purge is retried by the next run. With nothing
+recorded to compare against (the first run, or lost state), every key is
+purged, as with ``--all``.
+
+The release phase runs before the new release serves, so the purged keys
+are also recorded as pending; ``--pending``, which gunicorn starts when a
+web dyno is ready, waits ``CDN_REPURGE_DELAY`` seconds and purges them
+again, dropping whatever the CDN refetched from the old dynos meanwhile.
+
+On Heroku the state must be in Redis: the release dyno's filesystem is gone
+once the release ends, so each release would purge every key and the web
+dynos would never see the pending keys.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sgcx_site import cdn
+
+
+class Command(BaseCommand):
+    help = 'Purge the surrogate keys whose content changed since the last purge.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--previous', help='Key manifest (JSON) to compare with instead of the recorded one.')
+        parser.add_argument('--all', action='store_true', help='Purge every key of this build.')
+        parser.add_argument('--dry-run', action='store_true', help='List the keys without purging or recording them.')
+        parser.add_argument('--pending', action='store_true',
+                            help='Purge again the keys the release phase purged, after CDN_REPURGE_DELAY seconds.')
+
+    def handle(self, *args, **options):
+        if settings.IS_HEROKU and not settings.REDIS_URL and not isinstance(cdn.purge_backend(), cdn.LocalBackend):
+            raise CommandError('purge_cdn needs REDIS_URL on Heroku: a dyno\'s filesystem does not keep the purged keys.')
+        if options['pending']:
+            return self.purge_pending()
+
+        current = cdn.key_manifest()
+        if options['previous']:
+            previous = json.loads(Path(options['previous']).read_text())
+        else:
+            previous = cdn.load_state()
+
+        if options['all']:
+            keys = sorted(current)
+        elif previous is None:
+            keys = sorted(current)
+            self.stdout.write('No keys recorded by a previous purge; purging every key.')
+        else:
+            keys = cdn.stale_keys(previous, current)
+
+        for key in keys:
+            self.stdout.write(f'  {key}')
+        if options['dry_run']:
+            self.stdout.write(f'{len(keys)} key(s) would be purged')
+            return
+
+        try:
+            cdn.purge(keys)
+        except cdn.PurgeError as error:
+            raise CommandError(str(error)) from error
+        cdn.save_state(current)
+        cdn.save_pending(keys)
+        self.stdout.write(self.style.SUCCESS(f'{len(keys)} key(s) purged, {len(current)} recorded'))
+
+    def purge_pending(self):
+        time.sleep(settings.CDN_REPURGE_DELAY)
+        keys = cdn.take_pending()
+        try:
+            cdn.purge(keys)
+        except cdn.PurgeError as error:
+            cdn.save_pending(keys)
+            raise CommandError(str(error)) from error
+        self.stdout.write(self.style.SUCCESS(f'{len(keys)} pending key(s) purged'))
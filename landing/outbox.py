@@ -0,0 +1,174 @@
+# landing/outbox.py
+"""
+Delivery queue for contact form submissions.
+
+The form view only validates a submission and pushes it onto a Redis list,
+so a slow or unreachable mail server never holds up a web worker. The
+``deliver_contact`` worker (see the ``Procfile``) moves submissions in
+batches to a processing list, sends them over one SMTP connection, and
+removes each once its mail is accepted. A failed submission is retried
+after the delays in ``RETRY_DELAYS`` and then set aside on a dead-letter
+list; one that was being processed when a worker died goes back on the
+queue when the next worker starts.
+
+Without ``REDIS_URL``, in DEBUG only, submissions are delivered inline
+through ``EMAIL_BACKEND``, which prints them to the console in development.
+Otherwise, or if inline delivery fails, ``enqueue`` raises
+``QueueUnavailable`` so the visitor is told the message was not sent rather
+than losing it; ``check --deploy`` (run in the release phase) reports a
+deployment without Redis before it serves.
+"""
+
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from redis.exceptions import RedisError
+
+from sgcx_site.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before each retry; a submission is tried once more than this.
+RETRY_DELAYS = (30, 2 * 60, 10 * 60, 60 * 60)
+
+SUBJECTS = {
+    'general': 'General inquiry',
+    'collaboration': 'Research collaboration',
+    'lacuna': 'Project Lacuna early access',
+}
+
+
+class QueueUnavailable(Exception):
+    """The submission could not be queued or, without Redis, delivered."""
+
+
+def queue_keys():
+    """``(queue, processing, retry, dead)`` Redis keys."""
+    base = settings.CONTACT_QUEUE
+    return base, f'{base}:processing', f'{base}:retry', f'{base}:dead'
+
+
+def enqueue(submission):
+    """Queue ``submission`` (a dict of form fields) for delivery."""
+    message = json.dumps({'id': uuid.uuid4().hex, 'submitted': time.time(), 'attempts': 0, **submission})
+    client = redis_client()
+    if client is None:
+        if not settings.DEBUG:
+            logger.error('REDIS_URL is not set; refusing a contact submission')
+            raise QueueUnavailable('No queue without REDIS_URL')
+        if send_batch([message]):
+            raise QueueUnavailable('Could not deliver the submission inline')
+        return
+    queue, _, _, _ = queue_keys()
+    try:
+        client.lpush(queue, message)
+    except RedisError as error:
+        raise QueueUnavailable from error
+
+
+def build_email(submission):
+    kind = submission['kind']
+    subject = f"[sgcx.org] {SUBJECTS.get(kind, kind)}: {submission['name']}"
+    lines = [
+        f"From: {submission['name']} <{submission['email']}>",
+        f"Organization: {submission.get('organization') or '-'}",
+        f"Submitted: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(submission['submitted']))}",
+        '',
+        submission['message'],
+    ]
+    recipient = settings.CONTACT_RECIPIENTS.get(kind, settings.CONTACT_RECIPIENTS['general'])
+    return EmailMessage(subject, '\n'.join(lines), to=[recipient], reply_to=[submission['email']])
+
+
+def send_batch(messages):
+    """Send queued ``messages`` over one connection; returns those that failed."""
+    failed = []
+    emails = []
+    for message in messages:
+        try:
+            emails.append((message, build_email(json.loads(message))))
+        except (ValueError, KeyError, TypeError):
+            logger.error('Malformed contact submission: %r', message[:200])
+            failed.append(message)
+    if not emails:
+        return failed
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception('Could not connect to the mail server')
+        return failed + [message for message, _ in emails]
+    try:
+        for message, email in emails:
+            email.connection = connection
+            try:
+                email.send()
+            except Exception:
+                logger.exception('Could not send contact submission')
+                failed.append(message)
+    finally:
+        connection.close()
+    return failed
+
+
+def recover(client):
+    """Requeue submissions a previous worker claimed but never finished."""
+    queue, processing, _, _ = queue_keys()
+    moved = 0
+    while client.lmove(processing, queue, 'LEFT', 'RIGHT') is not None:
+        moved += 1
+    return moved
+
+
+def requeue_due(client, now=None):
+    """Move retries whose delay has passed back onto the queue."""
+    queue, _, retry, _ = queue_keys()
+    due = client.zrangebyscore(retry, '-inf', now or time.time())
+    if due:
+        with client.pipeline() as pipe:
+            pipe.zrem(retry, *due)
+            pipe.lpush(queue, *due)
+            pipe.execute()
+    return len(due)
+
+
+def claim(client, batch_size, timeout):
+    """Move up to ``batch_size`` submissions to the processing list, oldest first."""
+    queue, processing, _, _ = queue_keys()
+    first = client.blmove(queue, processing, timeout, 'RIGHT', 'LEFT')
+    if first is None:
+        return []
+    with client.pipeline(transaction=False) as pipe:
+        for _ in range(batch_size - 1):
+            pipe.lmove(queue, processing, 'RIGHT', 'LEFT')
+        rest = [message for message in pipe.execute() if message is not None]
+    return [first, *rest]
+
+
+def finish(client, batch, failed, now=None):
+    """Remove delivered submissions; schedule failed ones for retry or bury them."""
+    _, processing, retry, dead = queue_keys()
+    failed = set(failed)
+    now = now or time.time()
+    with client.pipeline() as pipe:
+        for message in batch:
+            pipe.lrem(processing, 1, message)
+            if message not in failed:
+                continue
+            try:
+                submission = json.loads(message)
+                attempts = submission['attempts'] + 1
+            except (ValueError, KeyError, TypeError):
+                pipe.lpush(dead, message)
+                continue
+            submission['attempts'] = attempts
+            if attempts <= len(RETRY_DELAYS):
+                pipe.zadd(retry, {json.dumps(submission): now + RETRY_DELAYS[attempts - 1]})
+            else:
+                logger.error('Giving up on contact submission %s after %d attempts', submission.get('id'), attempts)
+                pipe.lpush(dead, json.dumps(submission))
+        pipe.execute()
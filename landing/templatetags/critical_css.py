@@ -0,0 +1,36 @@
+# landing/templatetags/critical_css.py
+from functools import lru_cache
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from sgcx_site.critical_css import critical_css_for
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _stylesheet_tags(template_name, stylesheet_name):
+    href = static(stylesheet_name)
+    css = critical_css_for(template_name, stylesheet_name)
+    if css is None:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        '<style>{}</style>\n'
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(css), href, href,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context, stylesheet_name):
+    """
+    Inline the page's critical CSS and load the full stylesheet asynchronously.
+
+    Falls back to a render-blocking ``<link>`` when ``build_critical_css``
+    has not produced a subset for this page's template.
+    """
+    return _stylesheet_tags(context.template.name, stylesheet_name)
@@ -0,0 +1,18 @@
+# landing/templatetags/fragments.py
+from django import template
+
+from sgcx_site.fragments import cached_reverse, render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment(template_name):
+    """Render a request-independent partial once per process."""
+    return render_fragment(template_name)
+
+
+@register.simple_tag
+def cached_url(viewname, *args, **kwargs):
+    """Like ``{% url %}``, but memoized across requests."""
+    return cached_reverse(viewname, *args, **kwargs)
@@ -0,0 +1,23 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from sgcx_site.logo import SYMBOL_ID, logo_size, logo_symbol
+
+register = template.Library()
+
+
+@register.simple_tag
+def logo_sprite():
+    """Define the logo symbol; include once per page, before any ``{% logo %}``."""
+    return mark_safe(logo_symbol())
+
+
+@register.simple_tag
+def logo(height=40, alt='SGCX', css_class=''):
+    """Draw the inline logo symbol ``height`` pixels tall."""
+    width, height = logo_size(height)
+    return format_html(
+        '<svg class="{}" width="{}" height="{}" role="img" aria-label="{}"><use href="#{}"></use></svg>',
+        css_class, width, height, alt, SYMBOL_ID,
+    )
@@ -0,0 +1,44 @@
+# landing/templatetags/responsive_images.py
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from sgcx_site.images import FORMATS, variants_for
+
+register = template.Library()
+
+
+def _srcset(variants, mime):
+    return ', '.join(
+        f"{static(variant['name'])} {variant['density']:g}x"
+        for variant in variants if variant['type'] == mime
+    )
+
+
+@register.simple_tag
+def picture(name, alt='', css_class=''):
+    """
+    ``<picture>`` with AVIF/WebP sources and a PNG ``srcset`` fallback.
+
+    Falls back to a plain ``<img>`` when ``build_images`` has not produced
+    variants for ``name``.
+    """
+    variants = variants_for(name)
+    if not variants:
+        return format_html('<img src="{}" alt="{}" class="{}">', static(name), alt, css_class)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}">',
+        ((mime, _srcset(variants, mime)) for mime, _ in FORMATS
+         if any(variant['type'] == mime for variant in variants)),
+    )
+    smallest = min(variants, key=lambda variant: variant['height'])
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" width="{}" height="{}" alt="{}" class="{}"></picture>',
+        sources,
+        static(name),
+        _srcset(variants, 'image/png'),
+        smallest['width'],
+        smallest['height'],
+        alt,
+        css_class,
+    )
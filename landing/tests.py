@@ -1,3 +1,918 @@
-from django.test import TestCase
+import dataclasses
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict, deque
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from landing import outbox
+from projects import catalog
+from landing.templatetags.responsive_images import picture
+from sgcx_site import cdn, critical_css, database, images, metrics, search, versioning, warmup
+from sgcx_site.compression import negotiate_encoding
+from sgcx_site.pagecache import local_pages, page_cache_key
+from sgcx_site.ratelimit import CrawlerVerifier, RateLimiter, RateLimitMiddleware
+
+
+def clear_page_caches():
+    local_pages.clear()
+    caches[settings.PAGE_CACHE_ALIAS].clear()
+
+
+class ContentVersionTests(SimpleTestCase):
+    def setUp(self):
+        versioning.content_version.cache_clear()
+        self.addCleanup(versioning.content_version.cache_clear)
+
+    def test_rendering_sources_cover_views_tags_and_themes(self):
+        base_dir = Path(settings.BASE_DIR)
+        names = {path.relative_to(base_dir).as_posix() for path in versioning.rendering_sources()}
+        self.assertIn('landing/views.py', names)
+        self.assertIn('landing/templatetags/logo.py', names)
+        self.assertIn('projects/views.py', names)
+        self.assertIn('projects/themes.py', names)
+
+    def test_version_changes_when_a_view_changes(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        views = directory / 'views.py'
+        shutil.copy(Path(settings.BASE_DIR) / 'landing' / 'views.py', views)
+
+        with mock.patch.object(versioning, 'rendering_sources', return_value=[views]):
+            before = versioning.content_version()
+            views.write_text(views.read_text().replace("'About SGCX'", "'About us'"))
+            versioning.content_version.cache_clear()
+            after = versioning.content_version()
+
+        self.assertNotEqual(before, after)
+
+    def test_page_cache_key_follows_the_version(self):
+        request = RequestFactory(HTTP_HOST='sgcx.org').get('/about/')
+        with mock.patch('sgcx_site.pagecache.content_version', return_value='aaaa'):
+            old = page_cache_key(request)
+        with mock.patch('sgcx_site.pagecache.content_version', return_value='bbbb'):
+            new = page_cache_key(request)
+        self.assertNotEqual(old, new)
+        self.assertIn('/about/', new)
+
+
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        clear_page_caches()
+        self.addCleanup(clear_page_caches)
+
+    def test_second_request_is_served_from_the_cache(self):
+        with mock.patch('landing.views.render', wraps=render) as rendered:
+            first = self.client.get('/about/', secure=True, headers={'host': 'sgcx.org'})
+            second = self.client.get('/about/', secure=True, headers={'host': 'sgcx.org'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(rendered.call_count, 1)
+
+    def test_new_version_misses_the_cache(self):
+        with mock.patch('landing.views.render', wraps=render) as rendered:
+            self.client.get('/about/', secure=True, headers={'host': 'sgcx.org'})
+            with mock.patch('sgcx_site.pagecache.content_version', return_value='next-deploy'):
+                self.client.get('/about/', secure=True, headers={'host': 'sgcx.org'})
+        self.assertEqual(rendered.call_count, 2)
+
+
+class ConditionalPageTests(SimpleTestCase):
+    def setUp(self):
+        clear_page_caches()
+        self.addCleanup(clear_page_caches)
+
+    def get(self, path, **headers):
+        return self.client.get(path, secure=True, headers={'host': 'sgcx.org', **headers})
+
+    def test_etag_names_the_coding_sent(self):
+        response = self.get('/about/', accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].endswith('-gzip"'))
+
+    def test_identity_body_has_a_bare_etag(self):
+        with mock.patch('sgcx_site.pagecache.compress_variants', return_value={}):
+            response = self.get('/about/', accept_encoding='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('-', response['ETag'])
+
+    def test_revalidation_gets_304_with_vary(self):
+        etag = self.get('/about/', accept_encoding='gzip')['ETag']
+        response = self.get('/about/', accept_encoding='gzip', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_tag_for_a_coding_the_client_no_longer_accepts_is_stale(self):
+        etag = self.get('/about/', accept_encoding='gzip')['ETag']
+        response = self.get('/about/', accept_encoding='identity', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_version_invalidates_the_etag(self):
+        etag = self.get('/about/')['ETag']
+        with mock.patch('sgcx_site.conditional.content_version', return_value='next-deploy'):
+            response = self.get('/about/', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_found_has_no_validators(self):
+        response = self.get('/projects/nope/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class FakeRedis:
+    """The list and sorted set commands the outbox uses, in memory."""
+
+    def __init__(self):
+        self.lists = defaultdict(deque)
+        self.zsets = defaultdict(dict)
+
+    def lpush(self, key, *values):
+        self.lists[key].extendleft(values)
+        return len(self.lists[key])
+
+    def lmove(self, source, destination, wherefrom, whereto):
+        if not self.lists[source]:
+            return None
+        value = self.lists[source].popleft() if wherefrom == 'LEFT' else self.lists[source].pop()
+        if whereto == 'LEFT':
+            self.lists[destination].appendleft(value)
+        else:
+            self.lists[destination].append(value)
+        return value
+
+    def blmove(self, source, destination, timeout, wherefrom, whereto):
+        return self.lmove(source, destination, wherefrom, whereto)
+
+    def lrem(self, key, count, value):
+        try:
+            self.lists[key].remove(value)
+        except ValueError:
+            return 0
+        return 1
+
+    def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets[key].pop(member, None)
+
+    def zrangebyscore(self, key, low, high):
+        return sorted(member for member, score in self.zsets[key].items() if score <= float(high))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+SUBMISSION = {
+    'kind': 'general',
+    'name': 'Ada',
+    'email': 'ada@example.com',
+    'organization': '',
+    'message': 'Hello',
+}
+
+
+class OutboxTests(SimpleTestCase):
+    def setUp(self):
+        self.client = FakeRedis()
+        patcher = mock.patch('landing.outbox.redis_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue, self.processing, self.retry, self.dead = outbox.queue_keys()
+
+    def queued(self, count):
+        for number in range(count):
+            outbox.enqueue({**SUBMISSION, 'name': f'Sender {number}'})
+
+    def test_claim_takes_the_oldest_first(self):
+        self.queued(3)
+        batch = outbox.claim(self.client, 2, 0.1)
+        self.assertEqual([json.loads(message)['name'] for message in batch], ['Sender 0', 'Sender 1'])
+        self.assertEqual(len(self.client.lists[self.processing]), 2)
+        self.assertEqual(len(self.client.lists[self.queue]), 1)
+
+    def test_finish_removes_sent_and_schedules_failed(self):
+        self.queued(2)
+        batch = outbox.claim(self.client, 2, 0.1)
+        outbox.finish(self.client, batch, [batch[1]], now=1000)
+        self.assertFalse(self.client.lists[self.processing])
+        (retry, due), = self.client.zsets[self.retry].items()
+        self.assertEqual(json.loads(retry)['attempts'], 1)
+        self.assertEqual(due, 1000 + outbox.RETRY_DELAYS[0])
+
+    def test_requeue_due_moves_only_due_retries(self):
+        self.client.zadd(self.retry, {'early': 100, 'late': 200})
+        self.assertEqual(outbox.requeue_due(self.client, now=150), 1)
+        self.assertEqual(list(self.client.lists[self.queue]), ['early'])
+        self.assertEqual(list(self.client.zsets[self.retry]), ['late'])
+
+    def test_gives_up_after_the_last_retry(self):
+        message = json.dumps({**SUBMISSION, 'submitted': 0, 'attempts': len(outbox.RETRY_DELAYS)})
+        self.client.lpush(self.processing, message)
+        with self.assertLogs('landing.outbox', 'ERROR'):
+            outbox.finish(self.client, [message], [message])
+        self.assertFalse(self.client.zsets[self.retry])
+        self.assertEqual(len(self.client.lists[self.dead]), 1)
+
+    def test_recover_requeues_unfinished(self):
+        self.queued(2)
+        outbox.claim(self.client, 2, 0.1)
+        self.assertEqual(outbox.recover(self.client), 2)
+        self.assertEqual(len(self.client.lists[self.queue]), 2)
+
+    def test_worker_survives_a_redis_timeout(self):
+        self.queued(1)
+        blmove = self.client.blmove
+        failures = [RedisTimeoutError('Timeout reading from socket')]
+
+        def flaky_blmove(*args):
+            if failures:
+                raise failures.pop()
+            return blmove(*args)
+
+        self.client.blmove = flaky_blmove
+        with mock.patch('landing.management.commands.deliver_contact.redis_client', return_value=self.client), \
+                mock.patch('landing.management.commands.deliver_contact.time.sleep'):
+            call_command('deliver_contact', '--once', stdout=mock.Mock(), stderr=mock.Mock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(self.client.lists[self.processing])
+
+
+@override_settings(DEBUG=True)
+class InlineDeliveryTests(SimpleTestCase):
+    def post(self, **headers):
+        return self.client.post(
+            '/contact/send/', SUBMISSION, secure=True,
+            headers={'host': 'sgcx.org', 'accept': 'application/json', **headers},
+        )
+
+    def test_failed_inline_delivery_is_reported(self):
+        with mock.patch('landing.outbox.redis_client', return_value=None), \
+                mock.patch('landing.outbox.send_batch', side_effect=lambda messages: messages):
+            with self.assertRaises(outbox.QueueUnavailable):
+                outbox.enqueue(SUBMISSION)
+
+    @override_settings(DEBUG=False)
+    def test_no_inline_delivery_without_debug(self):
+        with mock.patch('landing.outbox.redis_client', return_value=None), \
+                mock.patch('landing.outbox.send_batch') as send_batch:
+            with self.assertRaises(outbox.QueueUnavailable):
+                outbox.enqueue(SUBMISSION)
+        send_batch.assert_not_called()
+
+    @override_settings(DEBUG=False, REDIS_URL=None)
+    def test_deploy_check_requires_redis(self):
+        from landing.checks import contact_queue_check
+
+        self.assertEqual([error.id for error in contact_queue_check(None)], ['landing.E001'])
+        with override_settings(REDIS_URL='redis://localhost'):
+            self.assertEqual(contact_queue_check(None), [])
+
+    def test_contact_form_says_not_sent(self):
+        with mock.patch('landing.outbox.redis_client', return_value=None), \
+                mock.patch('landing.outbox.send_batch', side_effect=lambda messages: messages):
+            response = self.post(origin='https://sgcx.org')
+        self.assertEqual(response.status_code, 503)
+
+    def test_cross_origin_posts_are_refused(self):
+        with mock.patch('landing.outbox.redis_client', return_value=None), \
+                mock.patch('landing.outbox.send_batch', return_value=[]), \
+                mock.patch('landing.views.CONTACT_LIMITER.acquire', return_value=0):
+            for headers, status in (
+                ({'origin': 'https://sgcx.org'}, 202),
+                ({'referer': 'https://sgcx.org/contact/'}, 202),
+                ({'origin': 'https://evil.example'}, 403),
+                ({'referer': 'https://evil.example/form'}, 403),
+                ({}, 403),
+            ):
+                with self.subTest(**headers):
+                    self.assertEqual(self.post(**headers).status_code, status)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=2, burst=3, max_keys=2, clock=self.clock)
+
+    def test_burst_then_wait_for_the_next_token(self):
+        self.assertEqual([self.limiter.acquire('a') for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(self.limiter.acquire('a'), 0.5)
+
+    def test_bucket_refills_over_time(self):
+        for _ in range(3):
+            self.limiter.acquire('a')
+        self.clock.now = 1.0
+        self.assertEqual([self.limiter.acquire('a') for _ in range(2)], [0, 0])
+        self.assertTrue(self.limiter.acquire('a'))
+
+    def test_least_recently_seen_client_is_forgotten(self):
+        for _ in range(3):
+            self.limiter.acquire('a')
+        self.limiter.acquire('b')
+        self.limiter.acquire('c')
+        self.assertEqual(self.limiter.acquire('a'), 0)
+
+
+@override_settings(RATE_LIMIT=True, RATE_LIMITS={'client': (1, 2), 'bot': (1, 4)}, TRUSTED_PROXY_HOPS=0)
+class RateLimitMiddlewareTests(SimpleTestCase):
+    googlebot = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
+
+    def setUp(self):
+        patcher = mock.patch('sgcx_site.ratelimit.redis_client', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory(REMOTE_ADDR='192.0.2.1')
+
+    def statuses(self, count, user_agents=('',)):
+        return [
+            self.middleware(self.factory.get('/', HTTP_USER_AGENT=user_agents[number % len(user_agents)])).status_code
+            for number in range(count)
+        ]
+
+    def test_client_over_the_limit_gets_429_with_retry_after(self):
+        self.assertEqual(self.statuses(2), [200, 200])
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_unverified_crawler_gets_client_limits(self):
+        with mock.patch.object(CrawlerVerifier, 'verified', return_value=False):
+            self.assertEqual(self.statuses(3, [self.googlebot]), [200, 200, 429])
+
+    def test_cycling_crawler_names_shares_one_bucket(self):
+        agents = [self.googlebot, 'bingbot/2.0', 'Applebot/0.1', '']
+        with mock.patch.object(CrawlerVerifier, 'verified', return_value=False):
+            self.assertEqual(self.statuses(3, agents), [200, 200, 429])
+
+    def test_verified_crawler_gets_bot_limits(self):
+        with mock.patch.object(CrawlerVerifier, 'verified', return_value=True):
+            self.assertEqual(self.statuses(5, [self.googlebot]), [200, 200, 200, 200, 429])
+
+
+class CrawlerVerifierTests(SimpleTestCase):
+    def test_lookup_runs_in_the_background(self):
+        checked = []
+        verifier = CrawlerVerifier(check=lambda address, domains: checked.append(domains) or True)
+        self.assertFalse(verifier.verified('192.0.2.1', 'googlebot'))
+        verifier._queue.join()
+        self.assertEqual(checked, [('.googlebot.com', '.google.com', '.googleusercontent.com')])
+        self.assertTrue(verifier.verified('192.0.2.1', 'googlebot'))
+
+
+class PurgeTests(SimpleTestCase):
+    def setUp(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        patcher = mock.patch('sgcx_site.cdn.redis_client', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        state = override_settings(CDN_STATE_FILE=directory / 'cdn_keys.json')
+        state.enable()
+        self.addCleanup(state.disable)
+        cdn.purged.clear()
+        self.addCleanup(cdn.purged.clear)
+
+    def purge(self):
+        cdn.purged.clear()
+        call_command('purge_cdn', stdout=mock.Mock())
+        return sorted(cdn.purged)
+
+    def test_first_run_purges_every_key(self):
+        self.assertEqual(self.purge(), sorted(cdn.key_manifest()))
+
+    def test_unchanged_build_purges_nothing(self):
+        self.purge()
+        self.assertEqual(self.purge(), [])
+
+    def test_changed_project_purges_its_key_and_the_catalog(self):
+        self.purge()
+        first, *rest = catalog.PROJECTS
+        changed = (dataclasses.replace(first, tagline='Something else'), *rest)
+        with mock.patch.object(catalog, 'PROJECTS', changed), mock.patch.object(catalog, 'VERSION', 'next'):
+            self.assertEqual(self.purge(), [cdn.CATALOG_KEY, cdn.project_key(first.slug)])
+
+    def test_changed_base_purges_the_old_base_key_instead_of_pages(self):
+        self.purge()
+        old = cdn.base_key()
+        with mock.patch('sgcx_site.cdn.base_version', return_value='next'):
+            self.assertEqual(self.purge(), [old])
+
+    def test_pending_keys_are_purged_again_once(self):
+        keys = self.purge()
+        cdn.purged.clear()
+        call_command('purge_cdn', '--pending', stdout=mock.Mock())
+        self.assertEqual(sorted(cdn.purged), keys)
+        cdn.purged.clear()
+        call_command('purge_cdn', '--pending', stdout=mock.Mock())
+        self.assertEqual(list(cdn.purged), [])
+
+    @override_settings(IS_HEROKU=True, REDIS_URL=None, CDN_BACKEND='sgcx_site.cdn.FastlyBackend')
+    def test_heroku_without_redis_refuses(self):
+        cdn.purge_backend.cache_clear()
+        self.addCleanup(cdn.purge_backend.cache_clear)
+        with self.assertRaises(CommandError):
+            call_command('purge_cdn', stdout=mock.Mock())
+
+
+@override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+class MiddlewareProfileTests(SimpleTestCase):
+    """
+    The public and admin chains, under both the WSGI and the ASGI handler.
+
+    AsyncClient always sends ``Host: testserver``, so these requests use it.
+    """
+
+    def assert_public(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.cookies)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+    def test_public_page_skips_sessions_and_csrf(self):
+        self.assert_public(self.client.get('/about/', secure=True))
+
+    async def test_public_page_skips_sessions_and_csrf_async(self):
+        self.assert_public(await self.async_client.get('/about/', secure=True))
+
+    def test_admin_gets_csrf(self):
+        login = self.client.get('/admin/login/', secure=True)
+        self.assertEqual(login.status_code, 200)
+        self.assertIn(settings.CSRF_COOKIE_NAME, login.cookies)
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post('/admin/login/', {'username': 'x', 'password': 'y'}, secure=True)
+        self.assertEqual(response.status_code, 403)
+
+    async def test_admin_gets_csrf_async(self):
+        login = await self.async_client.get('/admin/login/', secure=True)
+        self.assertEqual(login.status_code, 200)
+        self.assertIn(settings.CSRF_COOKIE_NAME, login.cookies)
+        client = self.async_client_class(enforce_csrf_checks=True)
+        response = await client.post('/admin/login/', {'username': 'x', 'password': 'y'}, secure=True)
+        self.assertEqual(response.status_code, 403)
+
+
+PUBLIC_PROFILE_PROBE = """
+import json, sys
+import django
+django.setup()
+from django.conf import settings
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+client = Client(HTTP_HOST='sgcx.org')
+about = client.get('/about/', secure=True)
+print(json.dumps({
+    'admin': client.get('/admin/', secure=True).status_code,
+    'about': about.status_code,
+    'cookies': list(about.cookies),
+    'link': about.get('Link', ''),
+    'apps': settings.INSTALLED_APPS,
+    'profiles': sorted(settings.MIDDLEWARE_PROFILES),
+    'imported': sorted(name for name in sys.modules if name.startswith('django.contrib.admin')),
+}))
+"""
+
+
+class PublicSiteProfileTests(SimpleTestCase):
+    """SITE_PROFILE=public, in a fresh interpreter: the app registry is fixed once set up."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        result = subprocess.run(
+            [sys.executable, '-c', PUBLIC_PROFILE_PROBE],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'sgcx_site.settings', 'SITE_PROFILE': 'public', 'DEBUG': 'True'},
+        )
+        cls.probe = json.loads(result.stdout.splitlines()[-1])
+
+    def test_admin_is_not_routed_or_installed(self):
+        self.assertEqual(self.probe['admin'], 404)
+        self.assertFalse([app for app in self.probe['apps'] if app.startswith('django.contrib.admin')])
+        self.assertEqual(self.probe['imported'], [])
+
+    def test_public_pages_run_the_public_chain_only(self):
+        self.assertEqual(self.probe['about'], 200)
+        self.assertEqual(self.probe['profiles'], ['public'])
+        self.assertEqual(self.probe['cookies'], [])
+        self.assertIn('rel=preload', self.probe['link'])
+
+
+class MetricsRetireTests(SimpleTestCase):
+    def test_exited_worker_is_folded_into_the_retired_totals(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        for pid, count in ((101, 2), (102, 3), (103, 5)):
+            (directory / f'metrics-{pid}.json').write_text(json.dumps({
+                'histograms': [],
+                'counters': [['sgcx_requests_total', ['landing:home', 'GET', '200'], count]],
+            }))
+        with override_settings(METRICS_DIR=str(directory)), \
+                mock.patch.object(metrics.registry, 'flush'):
+            before = metrics.exposition(metrics.merged_snapshots())
+            metrics.retire(directory, 101)
+            metrics.retire(directory, 102)
+            after = metrics.exposition(metrics.merged_snapshots())
+
+        self.assertEqual(after, before)
+        self.assertIn('status="200"} 10', after)
+        self.assertEqual(sorted(path.name for path in directory.iterdir()),
+                         ['metrics-103.json', 'metrics-retired.json'])
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ImageVariantTests(SimpleTestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'images').mkdir()
+        Image.new('RGBA', (120, 96), (255, 255, 255, 128)).save(self.root / 'images' / 'logo.png')
+
+    @override_settings(RESPONSIVE_IMAGE_HEIGHTS={'images/logo.png': 16})
+    def test_variants_at_each_density_in_each_format(self):
+        index = images.build_variants(self.root, log=lambda message: None)
+        variants = index['images/logo.png']['variants']
+        self.assertEqual({variant['density'] for variant in variants}, {1, 2, 3})
+        self.assertIn('image/webp', {variant['type'] for variant in variants})
+        for variant in variants:
+            self.assertTrue((self.root / variant['name']).is_file())
+            self.assertEqual(variant['height'], 16 * variant['density'])
+
+    @override_settings(RESPONSIVE_IMAGE_HEIGHTS={'images/logo.png': 16})
+    def test_picture_lists_each_format_under_its_own_urls(self):
+        index = images.build_variants(self.root, log=lambda message: None)
+        with mock.patch('sgcx_site.images.variant_index', return_value=index):
+            html = picture('images/logo.png', alt='SGCX')
+        self.assertIn('<source type="image/webp" srcset="/static/images/variants/logo-1x.webp 1x', html)
+        self.assertIn('<img src="/static/images/logo.png"', html)
+        self.assertIn('width="20" height="16"', html)
+
+    def test_picture_without_variants_is_a_plain_img(self):
+        with mock.patch('sgcx_site.images.variant_index', return_value={}):
+            html = picture('images/logo.png', alt='SGCX')
+        self.assertEqual(html, '<img src="/static/images/logo.png" alt="SGCX" class="">')
+
+
+class LogoBuildTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_builds_every_variant_at_spec_size_once(self):
+        from PIL import Image
+
+        import logo_gen
+
+        written = logo_gen.build_logos(self.root, workers=1, log=lambda message: None)
+        self.assertEqual(len(written), 2 * len(logo_gen.VARIANTS))
+        for spec in logo_gen.VARIANTS.values():
+            with Image.open(self.root / f'{spec.filename_stem}.png') as image:
+                self.assertEqual(image.size, (spec.size.width * logo_gen.PNG_SCALE, spec.size.height * logo_gen.PNG_SCALE))
+        self.assertEqual(logo_gen.build_logos(self.root, workers=1, log=lambda message: None), [])
+
+    def test_committed_logos_match_the_spec(self):
+        import logo_gen
+
+        cache = json.loads((logo_gen.OUTPUT_DIR / logo_gen.CACHE_NAME).read_text())
+        renderer = logo_gen.renderer_digest()
+        for spec in logo_gen.VARIANTS.values():
+            self.assertEqual(cache[f'{spec.filename_stem}.png'], spec.digest(renderer))
+
+
+class SearchTests(SimpleTestCase):
+    def setUp(self):
+        self.index = search.SearchIndex({
+            '/a/': {'title': 'Missing data - SGCX', 'body': 'Imputation methods.'},
+            '/b/': {'title': 'Gradients', 'body': 'Handling missing data in gradient descent, and more.'},
+            '/c/': {'title': 'About', 'body': 'The mission of the group.'},
+        })
+
+    def urls(self, query):
+        results, _ = self.index.search(query)
+        return [document.url for document, _ in results]
+
+    def test_title_match_ranks_above_body_match(self):
+        self.assertEqual(self.urls('missing data '), ['/a/', '/b/'])
+        self.assertEqual(self.index.documents[0].title, 'Missing data')
+
+    def test_last_word_is_a_prefix(self):
+        results, suggestions = self.index.search('mis')
+        self.assertEqual({document.url for document, _ in results}, {'/a/', '/b/', '/c/'})
+        self.assertEqual(suggestions, ['missing', 'mission'])
+        self.assertEqual(self.urls('mis '), [])
+
+    def test_empty_queries_match_nothing(self):
+        for query in ('', '   ', '!?'):
+            with self.subTest(query=query):
+                self.assertEqual(self.index.search(query), ([], []))
+
+    @override_settings(PRERENDER_MANIFEST='/nonexistent/manifest.json', PRERENDER_ROOT='/nonexistent')
+    def test_index_covers_the_pages_without_a_prerendered_site(self):
+        self.addCleanup(setattr, search, '_index_version', None)
+        search._index_version = None
+        urls = {document.url for document in search.search_index().documents}
+        self.assertLessEqual({'/', '/about/', '/research/', '/contact/'}, urls)
+        self.assertLessEqual({f'/projects/{project.slug}/' for project in catalog.PROJECTS}, urls)
+        response = self.client.get('/search/', {'q': 'lacu'}, secure=True, headers={'host': 'sgcx.org'})
+        self.assertEqual(response.json()['results'][0]['url'], '/projects/lacuna/')
+
+
+class PrerenderTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'critical_css').mkdir()
+        paths = override_settings(
+            PRERENDER_ROOT=self.root / 'site',
+            PRERENDER_MANIFEST=self.root / 'manifest.json',
+            CRITICAL_CSS_ROOT=self.root / 'critical_css',
+        )
+        paths.enable()
+        self.addCleanup(paths.disable)
+        self.prerender()
+
+    def prerender(self):
+        """The pages rendered, rather than found unchanged, under the output root."""
+        output = io.StringIO()
+        call_command('prerender', stdout=output)
+        lines = output.getvalue().splitlines()
+        return sorted(line.split(' -> ')[1] for line in lines if line.startswith('Rendered '))
+
+    def pages(self):
+        return sorted(path.relative_to(self.root / 'site').as_posix() for path in self.root.rglob('index.html'))
+
+    def test_unchanged_build_renders_nothing(self):
+        self.assertEqual(self.prerender(), [])
+
+    def test_changed_template_renders_only_its_pages(self):
+        template_source = versioning.template_source
+
+        def edited(name):
+            return template_source(name) + ('<!-- edited -->' if name == 'landing/about.html' else '')
+
+        with mock.patch('sgcx_site.versioning.template_source', side_effect=edited):
+            self.assertEqual(self.prerender(), ['about/index.html'])
+
+    def test_changed_theme_renders_every_page(self):
+        from landing.management.commands import prerender
+
+        sources = prerender.rendering_sources()
+        themes = self.root / 'themes.py'
+        themes.write_text(Path(settings.BASE_DIR, 'projects', 'themes.py').read_text() + '\n# edited\n')
+        edited = [themes if path.name == 'themes.py' else path for path in sources]
+        with mock.patch.object(prerender, 'rendering_sources', return_value=edited):
+            self.assertEqual(self.prerender(), self.pages())
+
+    def test_changed_critical_css_renders_every_page(self):
+        (self.root / 'critical_css' / 'base.css').write_text('body{margin:0}')
+        self.assertEqual(self.prerender(), self.pages())
+
+    def test_failing_route_fails_the_build(self):
+        from landing.management.commands import prerender
+        from sgcx_site.routes import Route
+
+        routes = prerender.public_routes()
+        missing = Route('landing:missing', '/no-such-page/', routes[0].callback, {})
+        with mock.patch.object(prerender, 'public_routes', return_value=[*routes, missing]):
+            with self.assertRaisesMessage(CommandError, 'landing:missing (/no-such-page/): HTTP 404'):
+                call_command('prerender', stdout=mock.Mock())
+
+
+class NegotiateEncodingTests(SimpleTestCase):
+    def negotiate(self, header):
+        return negotiate_encoding(header, available=('br', 'gzip'))
+
+    def test_br_is_preferred_over_gzip_at_equal_quality(self):
+        self.assertEqual(self.negotiate('gzip, deflate, br'), 'br')
+
+    def test_higher_quality_wins(self):
+        self.assertEqual(self.negotiate('br;q=0.5, gzip'), 'gzip')
+
+    def test_q0_excludes_a_coding(self):
+        self.assertEqual(self.negotiate('br;q=0, gzip'), 'gzip')
+        self.assertIsNone(self.negotiate('br;q=0, gzip;q=0'))
+
+    def test_wildcard_covers_unlisted_codings(self):
+        self.assertEqual(self.negotiate('*'), 'br')
+        self.assertEqual(self.negotiate('br;q=0, *;q=0.1'), 'gzip')
+        self.assertIsNone(self.negotiate('*;q=0'))
+
+    def test_identity_when_nothing_is_accepted(self):
+        for header in ('', 'identity', 'deflate', 'gzip;q=bad'):
+            with self.subTest(header=header):
+                self.assertIsNone(self.negotiate(header))
+
+
+class CriticalCssTests(SimpleTestCase):
+    elements = critical_css.document_elements(
+        '<body><nav id="top" class="nav dark"><a href="/" class="logo">SGCX</a></nav>'
+        '<main><p class="lead">Hi</p></main></body>'
+    )
+
+    def matches(self, selector):
+        return critical_css.selector_matches(selector, self.elements)
+
+    def test_class_and_id_selectors(self):
+        self.assertTrue(self.matches('.nav'))
+        self.assertTrue(self.matches('nav.nav.dark'))
+        self.assertTrue(self.matches('#top'))
+        self.assertFalse(self.matches('.card'))
+        self.assertFalse(self.matches('#bottom'))
+        self.assertFalse(self.matches('main#top'))
+
+    def test_descendant_selectors_need_every_compound(self):
+        self.assertTrue(self.matches('nav a.logo'))
+        self.assertTrue(self.matches('main > p.lead'))
+        self.assertFalse(self.matches('nav .card'))
+
+    def test_pseudo_classes_are_ignored(self):
+        self.assertTrue(self.matches('a.logo:hover'))
+        self.assertTrue(self.matches('p::first-line'))
+        self.assertTrue(self.matches('p:not(.lead)'))
+        self.assertFalse(self.matches('table:hover'))
+
+    def test_critical_rules_keep_matching_selectors_and_media_blocks(self):
+        css = '''
+            /* layout */
+            .nav, .card { color: red; }
+            .card { margin: 0 }
+            @media (max-width: 600px) { .lead { font-size: 1rem; } .card { display: none } }
+            @media print { .card { display: none } }
+            @font-face { font-family: X; src: url(x.woff2) }
+        '''
+        self.assertEqual(
+            critical_css.critical_rules(css, self.elements),
+            '.nav{color: red;}'
+            '@media (max-width: 600px){.lead{font-size: 1rem;}}'
+            '@font-face{font-family: X; src: url(x.woff2)}',
+        )
+
+
+class SitemapTests(SimpleTestCase):
+    def get(self, path):
+        return self.client.get(path, secure=True, headers={'host': 'sgcx.org'})
+
+    def test_sitemap_lists_every_route_and_project(self):
+        from xml.etree import ElementTree
+
+        from sgcx_site.routes import public_routes
+
+        response = self.get('/sitemap.xml')
+        self.assertEqual(response['Content-Type'], 'application/xml; charset=utf-8')
+        namespace = {'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+        urls = ElementTree.fromstring(response.content).findall('sm:url', namespace)
+        locations = [url.findtext('sm:loc', namespaces=namespace) for url in urls]
+        self.assertEqual(locations, [f'https://sgcx.org{route.path}' for route in public_routes()])
+        for project in catalog.PROJECTS:
+            self.assertIn(f'https://sgcx.org/projects/{project.slug}/', locations)
+        self.assertTrue(all(url.findtext('sm:lastmod', namespaces=namespace) for url in urls))
+
+    def test_robots_points_to_the_sitemap(self):
+        response = self.get('/robots.txt')
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'User-agent: *')
+        self.assertIn('Disallow: /admin/', lines)
+        self.assertIn('Sitemap: https://sgcx.org/sitemap.xml', lines)
+
+
+class WarmUpTests(SimpleTestCase):
+    def setUp(self):
+        from sgcx_site.routes import public_routes
+
+        self.paths = [route.path for route in public_routes()]
+        self.clock = FakeClock()
+        patcher = mock.patch('sgcx_site.warmup.time.perf_counter', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pages_past_the_budget_are_skipped(self):
+        def slow_render(factory, route, cache):
+            self.clock.now += 1
+
+        with mock.patch('sgcx_site.warmup.render_page', side_effect=slow_render):
+            report = warmup.warm_up(budget=2.5)
+        self.assertEqual(report.pages, 3)
+        self.assertEqual(report.skipped, self.paths[3:])
+        self.assertIn('budget spent', str(report))
+
+    def test_spent_budget_skips_every_step(self):
+        report = warmup.warm_up(budget=0)
+        self.assertEqual(report.pages, 0)
+        self.assertEqual(report.skipped, ['urls', 'static manifest', 'content version', 'templates', 'search index'])
+
+    def test_a_failing_page_or_step_does_not_stop_the_rest(self):
+        def render(factory, route, cache):
+            if route.path == '/about/':
+                raise RuntimeError('broken page')
+
+        with mock.patch('sgcx_site.warmup.render_page', side_effect=render), \
+                mock.patch('sgcx_site.warmup.compile_templates', side_effect=RuntimeError('broken template')), \
+                self.assertLogs('sgcx_site.warmup', 'WARNING') as logs:
+            report = warmup.warm_up(budget=60)
+        self.assertEqual(report.pages, len(self.paths) - 1)
+        self.assertEqual(report.skipped, [])
+        self.assertIn('search index', report.steps)
+        self.assertEqual(len(logs.records), 2)
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def test_no_url_is_tuned_sqlite(self):
+        config = database.database_config('', '/srv/db.sqlite3')
+        self.assertEqual(config['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(config['NAME'], '/srv/db.sqlite3')
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('PRAGMA journal_mode=WAL', config['OPTIONS']['init_command'])
+
+    def test_sqlite_urls(self):
+        for url, name in (
+            ('sqlite:///relative.db', 'relative.db'),
+            ('sqlite:////absolute/path.db', '/absolute/path.db'),
+            ('sqlite://', '/srv/db.sqlite3'),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(database.database_config(url, '/srv/db.sqlite3')['NAME'], name)
+
+    def test_postgres_url_is_parsed(self):
+        for scheme in ('postgres', 'postgresql'):
+            with self.subTest(scheme=scheme):
+                config = database.database_config(f'{scheme}://us%40er:p%2Fss@db.example:5433/sgcx', None)
+                self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+                self.assertEqual(
+                    (config['NAME'], config['USER'], config['PASSWORD'], config['HOST'], config['PORT']),
+                    ('sgcx', 'us@er', 'p/ss', 'db.example', '5433'),
+                )
+
+    def test_pool_replaces_persistent_connections(self):
+        config = database.database_config('postgres://db.example/sgcx', None, pool_size=4)
+        self.assertEqual(config['OPTIONS']['pool'], database.pool_options(4))
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        config = database.database_config('postgres://db.example/sgcx', None, conn_max_age=30)
+        self.assertNotIn('pool', config['OPTIONS'])
+        self.assertEqual(config['CONN_MAX_AGE'], 30)
+
+    def test_pool_size_shares_the_server_connections(self):
+        self.assertEqual(database.pool_size(workers=3, threads=8), 8)
+        self.assertEqual(database.pool_size(workers=3, threads=8, max_connections=20), 6)
+        self.assertEqual(database.pool_size(workers=30, threads=8, max_connections=20), 1)
+
+    def test_sslmode(self):
+        url = 'postgres://db.example/sgcx'
+        self.assertEqual(database.database_config(url, None, require_ssl=True)['OPTIONS']['sslmode'], 'require')
+        self.assertNotIn('sslmode', database.database_config(url, None)['OPTIONS'])
+        config = database.database_config(f'{url}?sslmode=verify-full', None, require_ssl=True)
+        self.assertEqual(config['OPTIONS']['sslmode'], 'verify-full')
+
+    def test_unsupported_scheme(self):
+        with self.assertRaises(ImproperlyConfigured):
+            database.database_config('mysql://db.example/sgcx', None)
@@ -1,12 +1,20 @@
 # landing/urls.py
 from django.urls import path
+
+from sgcx_site.cdn import cdn_cache
+
 from . import views
 
 app_name = 'landing'
 
+# Purged by surrogate key after each deploy (manage.py purge_cdn), so the CDN
+# keeps pages for a day and serves them stale while it refetches or while
+# the origin is down; browsers check back after a minute.
+page = cdn_cache(max_age=60, s_maxage=24 * 60 * 60, stale_while_revalidate=60 * 60, stale_if_error=7 * 24 * 60 * 60)
+
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('about/', views.about, name='about'),
-    path('research/', views.research, name='research'),
-    path('contact/', views.contact, name='contact'),
-]
\ No newline at end of file
+    path('', page(views.home), name='home'),
+    path('about/', page(views.about), name='about'),
+    path('research/', page(views.research), name='research'),
+    path('contact/', page(views.contact), name='contact'),
+]
@@ -1,6 +1,23 @@
 # landing/views.py
-from django.shortcuts import render
+from urllib.parse import urlsplit
 
+from django.conf import settings
+from django.http import HttpResponseForbidden, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+
+from sgcx_site.conditional import conditional_page
+from sgcx_site.pagecache import cached_page
+from sgcx_site.ratelimit import RateLimiter, rate_limit
+
+from . import outbox
+from .forms import ContactForm
+
+CONTACT_LIMITER = RateLimiter(rate=1 / settings.CONTACT_REFILL_SECONDS, burst=settings.CONTACT_BURST)
+
+@conditional_page
+@cached_page
 def home(request):
     """Main landing page for SGCX"""
     context = {
@@ -9,6 +26,8 @@ def home(request):
     }
     return render(request, 'landing/home.html', context)
 
+@conditional_page
+@cached_page
 def about(request):
     """About page with detailed SGCX information"""
     context = {
@@ -17,6 +36,8 @@ def about(request):
     }
     return render(request, 'landing/about.html', context)
 
+@conditional_page
+@cached_page
 def research(request):
     """Research publications and methodology"""
     context = {
@@ -25,10 +46,47 @@ def research(request):
     }
     return render(request, 'landing/research.html', context)
 
+@conditional_page
+@cached_page
 def contact(request):
     """Contact information and forms"""
     context = {
         'page_title': 'Contact - SGCX',
         'meta_description': 'Get in touch with the SGCX research team',
     }
-    return render(request, 'landing/contact.html', context)
\ No newline at end of file
+    return render(request, 'landing/contact.html', context)
+
+def _back_to_form(anchor):
+    response = redirect(reverse('landing:contact') + anchor)
+    response.status_code = 303  # See Other: follow with a GET
+    return response
+
+def _same_origin(request):
+    # The public pages have no sessions or CSRF cookies (they are prerendered),
+    # so cross-site posts are refused by their Origin header instead, or by the
+    # Referer where a browser leaves Origin out; a post with neither is refused.
+    source = request.META.get('HTTP_ORIGIN') or request.META.get('HTTP_REFERER')
+    return source is not None and urlsplit(source).netloc == request.get_host()
+
+@rate_limit(CONTACT_LIMITER)
+@require_POST
+def contact_submit(request):
+    """Queue a contact form submission for delivery and answer at once"""
+    if not _same_origin(request):
+        return HttpResponseForbidden('Cross-origin form submissions are not accepted.')
+    wants_json = 'application/json' in request.META.get('HTTP_ACCEPT', '')
+    form = ContactForm(request.POST)
+    if not form.is_valid():
+        if wants_json:
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        return _back_to_form('#not-sent')
+    if not form.is_spam:
+        try:
+            outbox.enqueue(form.submission())
+        except outbox.QueueUnavailable:
+            if wants_json:
+                return JsonResponse({'errors': {'__all__': [{'message': 'Please try again later.'}]}}, status=503)
+            return _back_to_form('#not-sent')
+    if wants_json:
+        return JsonResponse({'queued': True}, status=202)
+    return _back_to_form('#sent')
@@ -1,217 +1,290 @@
 #!/usr/bin/env python3
 """
-SGCX Logo Asset Generator - SVG Paths Instead of Text
-Using proper SVG paths for the X, which should be much more reliable
+SGCX Logo Asset Generator - one parametric spec, every size and theme
+SGC in front of an X drawn as two SVG paths, as SVG and rasterized PNG
+
+Each variant in VARIANTS (SIZES x THEMES) is written to landing/static/images
+as sgcx-logo-<size>-<theme>.svg and .png. PNGs are drawn with Pillow at
+PNG_SCALE times the SVG size, so build_images can derive 1x/2x/3x variants,
+in the DejaVu Serif Bold bundled in branding/fonts (browsers draw the SVGs
+in Georgia): with the font in the repo, every machine renders the same PNGs.
+Variants render in parallel across a process pool, and a file is only
+rewritten when the hash of its spec (for PNGs, also of the font file and the
+Pillow version) changes. `manage.py collectstatic` runs this first, so the
+collected assets always match the spec.
+
+    python logo_gen.py [--force] [--workers N] [--test-html]
 """
 
+import argparse
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
-def create_logo_assets():
-    """Generate SGCX logo SVG files using SVG paths for the X"""
-    
-    # Use 'images' directory
-    base_dir = Path("landing/static/images")
-    base_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Main logo SVG - Using SVG paths for reliable X shape
-    main_logo_svg = '''<svg width="200" height="80" viewBox="0 0 200 80" xmlns="http://www.w3.org/2000/svg">
-  <!-- Large outlined X behind using SVG paths (stretched horizontally) -->
-  <g transform="translate(100, 40) scale(2.5, 1.4)" opacity="0.25">
-    <path d="M -20 -15 L 20 15 M 20 -15 L -20 15" 
-          stroke="#333" 
-          stroke-width="3" 
-          stroke-linecap="round" 
-          fill="none"/>
-  </g>
-  
-  <!-- SGC letters in front -->
-  <text x="100" y="40" 
-        font-family="Georgia, serif" 
-        font-size="32" 
-        font-weight="bold"
-        text-anchor="middle" 
-        dominant-baseline="middle"
-        fill="#333"
-        letter-spacing="3px">SGC</text>
-</svg>'''
-    
-    # Navigation logo SVG
-    nav_logo_svg = '''<svg width="120" height="48" viewBox="0 0 120 48" xmlns="http://www.w3.org/2000/svg">
-  <!-- Large outlined X behind using SVG paths -->
-  <g transform="translate(60, 24) scale(1.5, 0.8)" opacity="0.25">
-    <path d="M -20 -15 L 20 15 M 20 -15 L -20 15" 
-          stroke="#333" 
-          stroke-width="3" 
-          stroke-linecap="round" 
-          fill="none"/>
-  </g>
-  
-  <!-- SGC letters in front -->
-  <text x="60" y="24" 
-        font-family="Georgia, serif" 
-        font-size="20" 
-        font-weight="bold"
-        text-anchor="middle" 
-        dominant-baseline="middle"
-        fill="#333"
-        letter-spacing="2px">SGC</text>
-</svg>'''
-    
-    # Small logo SVG
-    small_logo_svg = '''<svg width="64" height="64" viewBox="0 0 64 64" xmlns="http://www.w3.org/2000/svg">
-  <!-- Large outlined X behind using SVG paths -->
-  <g transform="translate(32, 32) scale(1.2, 0.8)" opacity="0.3">
-    <path d="M -15 -10 L 15 10 M 15 -10 L -15 10" 
-          stroke="#333" 
-          stroke-width="2.5" 
-          stroke-linecap="round" 
-          fill="none"/>
-  </g>
-  
-  <!-- SGC letters in front -->
-  <text x="32" y="32" 
-        font-family="Georgia, serif" 
-        font-size="16" 
-        font-weight="bold"
-        text-anchor="middle" 
-        dominant-baseline="middle"
-        fill="#333"
-        letter-spacing="1px">SGC</text>
-</svg>'''
+OUTPUT_DIR = Path(__file__).resolve().parent / "landing" / "static" / "images"
 
-    # White version for dark backgrounds
-    white_logo_svg = '''<svg width="200" height="80" viewBox="0 0 200 80" xmlns="http://www.w3.org/2000/svg">
-  <!-- Large outlined X behind using SVG paths -->
-  <g transform="translate(100, 40) scale(2.5, 1.4)" opacity="0.4">
-    <path d="M -20 -15 L 20 15 M 20 -15 L -20 15" 
-          stroke="white" 
-          stroke-width="3" 
-          stroke-linecap="round" 
-          fill="none"/>
-  </g>
-  
-  <!-- SGC letters in front -->
-  <text x="100" y="40" 
-        font-family="Georgia, serif" 
-        font-size="32" 
-        font-weight="bold"
-        text-anchor="middle" 
-        dominant-baseline="middle"
-        fill="white"
-        letter-spacing="3px">SGC</text>
-</svg>'''
-    
-    # White nav version
-    white_nav_logo_svg = '''<svg width="120" height="48" viewBox="0 0 120 48" xmlns="http://www.w3.org/2000/svg">
+# Spec hashes of the variants last written; collectstatic ignores dotfiles
+CACHE_NAME = ".logo-cache.json"
+
+# Bump when the drawing code changes, to rebuild every variant
+GENERATOR_VERSION = 1
+
+# PNGs are this many times the SVG size: the 3x source for build_images
+PNG_SCALE = 3
+
+# Supersampling factor for antialiased PNG edges
+SUPERSAMPLE = 4
+
+# The PNGs' font, in the repo rather than looked up on the machine
+FONT = Path(__file__).resolve().parent / "branding" / "fonts" / "DejaVuSerif-Bold.ttf"
+
+
+@dataclass(frozen=True)
+class Size:
+    """Geometry of one logo size, in SVG user units"""
+    width: int
+    height: int
+    font_size: float
+    letter_spacing: float
+    x_scale: tuple  # horizontal, vertical stretch of the X
+    x_half: tuple = (20, 15)  # half width and height of the X path
+    x_stroke: float = 3
+
+
+@dataclass(frozen=True)
+class Theme:
+    color: str
+    x_opacity: float
+
+
+@dataclass(frozen=True)
+class LogoSpec:
+    """Everything that determines one variant's output"""
+    name: str
+    size: Size
+    theme: Theme
+
+    @property
+    def filename_stem(self):
+        return f"sgcx-logo-{self.name}"
+
+    def digest(self, renderer=None):
+        """Hash of the spec; of the PNG when given the font and Pillow's fingerprint"""
+        payload = json.dumps([GENERATOR_VERSION, PNG_SCALE, renderer, asdict(self)], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+SIZES = {
+    "main": Size(width=200, height=80, font_size=32, letter_spacing=3, x_scale=(2.5, 1.4)),
+    "nav": Size(width=120, height=48, font_size=20, letter_spacing=2, x_scale=(1.5, 0.8)),
+    "small": Size(width=64, height=64, font_size=16, letter_spacing=1, x_scale=(1.2, 0.8),
+                  x_half=(15, 10), x_stroke=2.5),
+}
+
+THEMES = {
+    "dark": Theme(color="#333", x_opacity=0.25),
+    "white": Theme(color="white", x_opacity=0.4),
+}
+
+VARIANTS = {
+    (size, theme): LogoSpec(f"{size}-{theme}", SIZES[size], THEMES[theme])
+    for size in SIZES
+    for theme in THEMES
+}
+
+
+def _number(value):
+    return f"{value:g}"
+
+
+def render_svg(spec):
+    """The variant as an SVG document"""
+    size, theme = spec.size, spec.theme
+    cx, cy = size.width / 2, size.height / 2
+    hx, hy = size.x_half
+    return f'''<svg width="{size.width}" height="{size.height}" viewBox="0 0 {size.width} {size.height}" xmlns="http://www.w3.org/2000/svg">
   <!-- Large outlined X behind using SVG paths -->
-  <g transform="translate(60, 24) scale(1.5, 0.8)" opacity="0.4">
-    <path d="M -20 -15 L 20 15 M 20 -15 L -20 15" 
-          stroke="white" 
-          stroke-width="3" 
-          stroke-linecap="round" 
+  <g transform="translate({_number(cx)}, {_number(cy)}) scale({_number(size.x_scale[0])}, {_number(size.x_scale[1])})" opacity="{_number(theme.x_opacity)}">
+    <path d="M -{hx} -{hy} L {hx} {hy} M {hx} -{hy} L -{hx} {hy}"
+          stroke="{theme.color}"
+          stroke-width="{_number(size.x_stroke)}"
+          stroke-linecap="round"
           fill="none"/>
   </g>
-  
+
   <!-- SGC letters in front -->
-  <text x="60" y="24" 
-        font-family="Georgia, serif" 
-        font-size="20" 
+  <text x="{_number(cx)}" y="{_number(cy)}"
+        font-family="Georgia, serif"
+        font-size="{_number(size.font_size)}"
         font-weight="bold"
-        text-anchor="middle" 
+        text-anchor="middle"
         dominant-baseline="middle"
-        fill="white"
-        letter-spacing="2px">SGC</text>
+        fill="{theme.color}"
+        letter-spacing="{_number(size.letter_spacing)}px">SGC</text>
 </svg>'''
-    
-    # Write all the files
-    files_to_create = {
-        'sgcx-logo-main.svg': main_logo_svg,
-        'sgcx-logo-nav.svg': nav_logo_svg,
-        'sgcx-logo-small.svg': small_logo_svg,
-        'sgcx-logo-white.svg': white_logo_svg,
-        'sgcx-logo-nav-white.svg': white_nav_logo_svg,
-    }
-    
-    for filename, content in files_to_create.items():
-        file_path = base_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"Created: {file_path}")
-    
-    print(f"\n✅ All logo assets created in {base_dir}/")
-    print("\nFiles created:")
-    for filename in files_to_create.keys():
-        print(f"  - {filename}")
-    
-    print(f"\n🎯 KEY IMPROVEMENT:")
-    print(f"   - Using SVG <path> elements instead of <text> for the X")
-    print(f"   - Paths are drawn as two lines: one diagonal, then the other")
-    print(f"   - Much more reliable than text transforms!")
-    print(f"   - stroke-linecap='round' gives clean line endings")
+
+
+def svg(size, theme):
+    """SVG for one size and theme, e.g. svg("main", "white")"""
+    return render_svg(VARIANTS[(size, theme)])
+
+
+def renderer_digest(font=FONT):
+    """Hash of what the PNGs' pixels depend on besides the spec: the font and Pillow"""
+    import PIL
+
+    digest = hashlib.sha256(Path(font).read_bytes())
+    digest.update(PIL.__version__.encode())
+    return digest.hexdigest()
+
+
+def render_png(spec, font_path):
+    """The variant drawn with Pillow at PNG_SCALE times its SVG size"""
+    from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+    size, theme = spec.size, spec.theme
+    unit = PNG_SCALE * SUPERSAMPLE
+    canvas_size = (size.width * unit, size.height * unit)
+    red, green, blue = ImageColor.getrgb(theme.color)[:3]
+    cx, cy = size.width / 2, size.height / 2
+    sx, sy = size.x_scale
+
+    # The X: two round-capped strokes, scaled with the group like the SVG
+    mask = Image.new("L", canvas_size)
+    draw = ImageDraw.Draw(mask)
+    stroke = size.x_stroke * (sx * sy) ** 0.5 * unit
+    hx, hy = size.x_half
+    for (x0, y0), (x1, y1) in (((-hx, -hy), (hx, hy)), ((hx, -hy), (-hx, hy))):
+        start = ((cx + sx * x0) * unit, (cy + sy * y0) * unit)
+        end = ((cx + sx * x1) * unit, (cy + sy * y1) * unit)
+        draw.line([start, end], fill=255, width=round(stroke))
+        for px, py in (start, end):
+            draw.ellipse([px - stroke / 2, py - stroke / 2, px + stroke / 2, py + stroke / 2], fill=255)
+    image = Image.new("RGBA", canvas_size, (red, green, blue, 0))
+    image.putalpha(mask.point(lambda value: round(value * theme.x_opacity)))
+
+    # SGC, centered including the trailing letter spacing as browsers do
+    font_size = round(size.font_size * unit)
+    font = ImageFont.truetype(str(font_path), font_size)
+    spacing = size.letter_spacing * unit
+    x = cx * unit - sum(font.getlength(char) + spacing for char in "SGC") / 2
+    draw = ImageDraw.Draw(image)
+    for char in "SGC":
+        draw.text((x, cy * unit), char, font=font, fill=(red, green, blue, 255), anchor="lm")
+        x += font.getlength(char) + spacing
+
+    return image.resize((size.width * PNG_SCALE, size.height * PNG_SCALE), Image.LANCZOS)
+
+
+def build_png(spec, output_dir, font_path):
+    """Write one variant's PNG; runs in a worker process"""
+    render_png(spec, font_path).save(Path(output_dir) / f"{spec.filename_stem}.png", optimize=True)
+    return spec.name
+
+
+def build_logos(output_dir=OUTPUT_DIR, force=False, workers=None, log=print):
+    """Rewrite the SVGs and PNGs whose spec changed; returns the files written"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = output_dir / CACHE_NAME
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    written = []
+
+    for spec in VARIANTS.values():
+        name = f"{spec.filename_stem}.svg"
+        digest = spec.digest()
+        if force or cache.get(name) != digest or not (output_dir / name).exists():
+            (output_dir / name).write_text(render_svg(spec), encoding="utf-8")
+            cache[name] = digest
+            written.append(name)
+
+    renderer = renderer_digest()
+    digests = {spec: spec.digest(renderer) for spec in VARIANTS.values()}
+    stale = [
+        spec for spec in VARIANTS.values()
+        if force
+        or cache.get(f"{spec.filename_stem}.png") != digests[spec]
+        or not (output_dir / f"{spec.filename_stem}.png").exists()
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(stale) or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(build_png, stale, [str(output_dir)] * len(stale), [str(FONT)] * len(stale)))
+    else:
+        for spec in stale:
+            build_png(spec, output_dir, FONT)
+    for spec in stale:
+        cache[f"{spec.filename_stem}.png"] = digests[spec]
+        written.append(f"{spec.filename_stem}.png")
+
+    for name in written:
+        log(f"Created: {output_dir / name}")
+    if written:
+        cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    return written
+
 
 def create_test_html():
     """Create a test HTML file to verify the logos work"""
-    
-    test_html = '''<!DOCTYPE html>
+
+    cards = "\n".join(
+        f'''        <div class="test-card{' blue-bg' if theme == 'white' else ''}">
+            <h3>{size.title()} ({theme})</h3>
+            <img src="landing/static/images/sgcx-logo-{size}-{theme}.svg" alt="SGCX" style="height: {SIZES[size].height}px;">
+            <img src="landing/static/images/sgcx-logo-{size}-{theme}.png" alt="SGCX" style="height: {SIZES[size].height}px;">
+        </div>'''
+        for size, theme in VARIANTS
+    )
+    test_html = f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>SGCX Logo Test</title>
     <style>
-        body { font-family: Georgia, serif; margin: 20px; background: #f5f5f5; }
-        .test-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; }
-        .test-card { background: white; padding: 20px; border-radius: 10px; text-align: center; }
-        .blue-bg { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; }
-        h1 { text-align: center; }
-        h3 { margin-bottom: 15px; }
+        body {{ font-family: Georgia, serif; margin: 20px; background: #f5f5f5; }}
+        .test-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; }}
+        .test-card {{ background: white; padding: 20px; border-radius: 10px; text-align: center; }}
+        .blue-bg {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; }}
+        h1 {{ text-align: center; }}
+        h3 {{ margin-bottom: 15px; }}
     </style>
 </head>
 <body>
-    <h1>SGCX Logo Test - SVG Paths</h1>
-    
+    <h1>SGCX Logo Test - SVG and PNG</h1>
+
     <div class="test-grid">
-        <div class="test-card">
-            <h3>Main Logo (Dark)</h3>
-            <img src="landing/static/images/sgcx-logo-main.svg" alt="SGCX Main" style="height: 80px;">
-        </div>
-        
-        <div class="test-card">
-            <h3>Nav Logo (Dark)</h3>
-            <img src="landing/static/images/sgcx-logo-nav.svg" alt="SGCX Nav" style="height: 48px;">
-        </div>
-        
-        <div class="test-card blue-bg">
-            <h3>White Version</h3>
-            <img src="landing/static/images/sgcx-logo-nav-white.svg" alt="SGCX White" style="height: 48px;">
-        </div>
-        
-        <div class="test-card">
-            <h3>Small/Favicon</h3>
-            <img src="landing/static/images/sgcx-logo-small.svg" alt="SGCX Small" style="height: 32px;">
-        </div>
+{cards}
     </div>
-    
-    <p style="text-align: center; margin-top: 30px;">
-        <strong>If you can see clear X shapes behind SGC, the path approach worked!</strong>
-    </p>
 </body>
 </html>'''
-    
+
     test_file = Path("logo_test.html")
     with open(test_file, 'w', encoding='utf-8') as f:
         f.write(test_html)
-    print(f"\n📁 Created {test_file} - open this in your browser to test the logos!")
+    print(f"\n📁 Created {test_file} - open this in your browser to compare SVG and PNG!")
 
-if __name__ == "__main__":
-    print("🎨 SGCX Logo Asset Generator - SVG Paths Approach")
+def main():
+    parser = argparse.ArgumentParser(description="Generate the SGCX logo variants.")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild every variant.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--test-html", action="store_true", help="Also write logo_test.html.")
+    args = parser.parse_args()
+
+    print("🎨 SGCX Logo Asset Generator")
     print("=" * 55)
-    
-    create_logo_assets()
-    create_test_html()
-    
-    print("\n🚀 Next steps:")
-    print("1. Open logo_test.html in your browser to verify the X is visible")
-    print("2. If it looks good, test with: python manage.py runserver")
-    print("3. The X should be much more reliable now!")
\ No newline at end of file
+
+    written = build_logos(args.output_dir, force=args.force, workers=args.workers)
+    print(f"\n✅ {len(written)} file(s) written in {args.output_dir}/")
+    if args.test_html:
+        create_test_html()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# projects/api.py
+"""
+Read-only JSON API for the project catalog.
+
+``/api/projects/`` lists the catalog in its published order and
+``/api/projects/<slug>/`` returns one project. Both accept
+``?fields=slug,name,status`` to return only some fields; the list also takes
+``?limit=N`` and the opaque ``?cursor=`` from a previous page's ``next``.
+
+The catalog is immutable for the life of a process, so every response body
+is serialized and compressed once per catalog version and query, then
+served from memory. Each body has a strong ETag, so a client polling with
+``If-None-Match`` gets an empty 304 until a deploy changes the catalog.
+Responses are tagged with the ``catalog`` or ``project:<slug>`` surrogate
+key, so a CDN can keep them until ``purge_cdn`` purges what changed.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from collections import namedtuple
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from sgcx_site.cdn import API_KEY, CATALOG_KEY, project_key
+from sgcx_site.compression import compress_variants, request_encoding
+
+from . import catalog
+
+FIELDS = ('slug', 'name', 'tagline', 'description', 'status', 'category', 'url')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+Payload = namedtuple('Payload', ['status', 'bodies', 'etag'])
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def parse_fields(value):
+    """The requested fields in ``FIELDS`` order; all of them when none are given."""
+    if not value:
+        return FIELDS
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(FIELDS)
+    if unknown:
+        raise InvalidQuery(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return tuple(name for name in FIELDS if name in requested)
+
+
+def parse_limit(value):
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidQuery('limit must be an integer') from None
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def encode_cursor(slug):
+    return base64.urlsafe_b64encode(slug.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The slug a cursor continues after; cursors stay valid across catalog versions."""
+    try:
+        slug = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        slug = None
+    if slug not in catalog.BY_SLUG:
+        raise InvalidQuery('Invalid cursor')
+    return slug
+
+
+@lru_cache(maxsize=None)
+def _fragment(version, slug, fields):
+    """One project serialized with ``fields``, as bytes ready to splice."""
+    project = catalog.BY_SLUG[slug]
+    record = {
+        name: reverse('projects:detail', kwargs={'slug': slug}) if name == 'url' else getattr(project, name)
+        for name in fields
+    }
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _payload(status, body):
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    bodies = compress_variants(body) if status == 200 else {}
+    bodies[None] = body
+    return Payload(status, bodies, etag)
+
+
+def _error(status, message):
+    return _payload(status, json.dumps({'error': message}).encode())
+
+
+# Payloads and fragments are keyed by catalog version, like the page cache
+# is by content version.
+@lru_cache(maxsize=512)
+def list_payload(version, fields, limit, after):
+    slugs = [project.slug for project in catalog.PROJECTS]
+    start = slugs.index(after) + 1 if after else 0
+    page = slugs[start:start + limit]
+    more = start + limit < len(slugs)
+    next_cursor = json.dumps(encode_cursor(page[-1]) if more and page else None).encode()
+    return _payload(200, b''.join((
+        b'{"version":', json.dumps(version).encode(),
+        b',"count":', str(len(slugs)).encode(),
+        b',"results":[', b','.join(_fragment(version, slug, fields) for slug in page),
+        b'],"next":', next_cursor, b'}',
+    )))
+
+
+@lru_cache(maxsize=512)
+def detail_payload(version, slug, fields):
+    if slug not in catalog.BY_SLUG:
+        return _error(404, 'No such project')
+    return _payload(200, _fragment(version, slug, fields))
+
+
+def _respond(request, payload):
+    encoding = request_encoding(request)
+    if encoding not in payload.bodies:
+        encoding = None
+    etag = f'"{payload.etag}-{encoding}"' if encoding else f'"{payload.etag}"'
+    if payload.status != 200:
+        return HttpResponse(payload.bodies[None], status=payload.status, content_type='application/json')
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(payload.bodies[encoding], content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _api_view(view_func):
+    """Answer GET/HEAD with ``view_func``'s payload and bad queries with a 400."""
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            response = _respond(request, _error(405, 'Method not allowed'))
+            response['Allow'] = 'GET, HEAD'
+            return response
+        try:
+            payload = view_func(request, *args, **kwargs)
+        except InvalidQuery as error:
+            payload = _error(400, str(error))
+        return _respond(request, payload)
+
+    # Payloads come from memory, so under ASGI there is nothing to hand off
+    # to a worker thread.
+    if settings.ASYNC_VIEWS:
+        sync_view = _wrapped_view
+
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            return sync_view(request, *args, **kwargs)
+
+    return _wrapped_view
+
+
+@_api_view
+def project_list(request):
+    """Catalog projects in published order, a page at a time."""
+    fields = parse_fields(request.GET.get('fields'))
+    limit = parse_limit(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
+    return list_payload(catalog.VERSION, fields, limit, decode_cursor(cursor) if cursor else None)
+
+
+@_api_view
+def project_detail(request, slug):
+    """One catalog project."""
+    return detail_payload(catalog.VERSION, slug, parse_fields(request.GET.get('fields')))
+
+
+project_list.surrogate_keys = lambda: [CATALOG_KEY, API_KEY]
+project_detail.surrogate_keys = lambda slug: [project_key(slug), API_KEY]
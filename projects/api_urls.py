@@ -0,0 +1,18 @@
+# projects/api_urls.py
+from django.urls import path
+
+from sgcx_site.cdn import cdn_cache
+
+from . import api
+
+app_name = 'api'
+
+# Clients may reuse a response for five minutes before revalidating; the CDN
+# keeps it until a deploy purges its keys.
+cached = cdn_cache(max_age=5 * 60, s_maxage=24 * 60 * 60, stale_while_revalidate=60 * 60,
+                   stale_if_error=7 * 24 * 60 * 60, html=False)
+
+urlpatterns = [
+    path('', cached(api.project_list), name='project_list'),
+    path('<slug:slug>/', cached(api.project_detail), name='project_detail'),
+]
@@ -0,0 +1,150 @@
+# projects/catalog.py
+"""
+The SGCX project catalog.
+
+Projects are immutable records built once at import and indexed by slug,
+category and status. Views, templates and caches all read from here, and
+``VERSION`` changes whenever any record does.
+"""
+
+import hashlib
+from dataclasses import astuple, dataclass
+from types import MappingProxyType
+
+RESEARCH = 'research'
+INTERFACE = 'interface'  # future subdomains
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    slug: str
+    name: str
+    tagline: str
+    description: str
+    status: str
+    category: str
+    page_title: str
+    meta_description: str
+
+    @property
+    def template_name(self):
+        return f'projects/{self.slug}.html'
+
+    @property
+    def fingerprint(self):
+        return hashlib.sha256(repr(astuple(self)).encode()).hexdigest()[:16]
+
+
+PROJECTS = (
+    # Research projects
+    Project(
+        slug='lacuna',
+        name='Project Lacuna',
+        tagline='Neural Networks for Missing Data Mechanism Detection',
+        description='Revolutionary tool for distinguishing between MAR and MNAR mechanisms',
+        status='Active Development',
+        category=RESEARCH,
+        page_title='Project Lacuna - SGCX',
+        meta_description='Neural Networks for Missing Data Mechanism Detection',
+    ),
+    Project(
+        slug='blacklight',
+        name='Project Blacklight',
+        tagline='Revealing true optimizer performance',
+        description='Quantify how close optimizers actually get to global minima',
+        status='Research Phase',
+        category=RESEARCH,
+        page_title='Project Blacklight - SGCX',
+        meta_description='Revealing true optimizer performance against known global minima',
+    ),
+    Project(
+        slug='gradflow',
+        name='GradFlow',
+        tagline='GPU-Accelerated WENO Implementation',
+        description='Modern PyTorch implementation of WENO schemes using convolution operations',
+        status='Early Development',
+        category=RESEARCH,
+        page_title='GradFlow - SGCX',
+        meta_description='GPU-Accelerated WENO Implementation using PyTorch',
+    ),
+    Project(
+        slug='afl',
+        name='AFL Research',
+        tagline='Approximate Forgiveness Level in Neural Networks',
+        description='Discovery that random pruning improves performance up to 70-80% sparsity',
+        status='Significant Results',
+        category=RESEARCH,
+        page_title='AFL Research - SGCX',
+        meta_description='Approximate Forgiveness Level in Neural Networks',
+    ),
+    Project(
+        slug='bonsai',
+        name='Project Bonsai',
+        tagline='Statistics-Informed Neural Network Pruning',
+        description='FANIM-based pruning with Wilcoxon statistical testing',
+        status='On Hold',
+        category=RESEARCH,
+        page_title='Project Bonsai - SGCX',
+        meta_description='Statistics-Informed Neural Network Pruning',
+    ),
+    # Interface projects
+    Project(
+        slug='clinical',
+        name='SGC-Clinical',
+        tagline='Statistical tools for clinical research',
+        description='Drag-and-drop clinical trial analysis with no coding required - upload data, configure analysis, download FDA-ready results',
+        status='Planned',
+        category=INTERFACE,
+        page_title='Clinical Interface - SGCX',
+        meta_description='Statistical tools for clinical research and biostatistics',
+    ),
+    Project(
+        slug='pharma',
+        name='SGC-Pharma',
+        tagline='Pharmaceutical statistical analysis',
+        description='No-code pharmaceutical statistical analysis with built-in regulatory compliance and automated FDA submission reports',
+        status='Planned',
+        category=INTERFACE,
+        page_title='Pharma Interface - SGCX',
+        meta_description='Pharmaceutical statistical analysis and regulatory compliance',
+    ),
+    Project(
+        slug='finance',
+        name='SGC-Finance',
+        tagline='Financial modeling and risk analysis',
+        description='Point-and-click financial risk modeling and portfolio analysis - no programming, just upload data and get professional reports',
+        status='Planned',
+        category=INTERFACE,
+        page_title='Finance Interface - SGCX',
+        meta_description='Financial modeling and risk analysis tools',
+    ),
+    Project(
+        slug='insurance',
+        name='SGC-Insurance',
+        tagline='Insurance analytics and risk modeling',
+        description='Intuitive actuarial analysis interface - drag-and-drop claims data for reserving, pricing, and regulatory reporting',
+        status='Planned',
+        category=INTERFACE,
+        page_title='Insurance Interface - SGCX',
+        meta_description='Insurance analytics and actuarial modeling tools',
+    ),
+)
+
+
+def _index(key):
+    index = {}
+    for project in PROJECTS:
+        index.setdefault(key(project), []).append(project)
+    return MappingProxyType({value: tuple(projects) for value, projects in index.items()})
+
+
+BY_SLUG = MappingProxyType({project.slug: project for project in PROJECTS})
+BY_CATEGORY = _index(lambda project: project.category)
+BY_STATUS = _index(lambda project: project.status)
+
+VERSION = hashlib.sha256(''.join(project.fingerprint for project in PROJECTS).encode()).hexdigest()[:16]
+
+
+def get(slug):
+    """The project for ``slug``, or ``None``."""
+    return BY_SLUG.get(slug)
@@ -0,0 +1,14 @@
+# projects/templatetags/project_cards.py
+from django import template
+
+from projects.themes import theme_for
+from sgcx_site.fragments import render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag
+def project_card(project, template_name):
+    """Render one project card per process and reuse it on every request."""
+    context = {'project': project, 'theme': theme_for(project.slug)}
+    return render_fragment(template_name, context, key=project)
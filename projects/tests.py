@@ -1,3 +1,70 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from . import catalog
+from .api import MAX_LIMIT, encode_cursor
+
+
+class ProjectPageTests(SimpleTestCase):
+    def get(self, path):
+        return self.client.get(path, secure=True, headers={'host': 'sgcx.org'})
+
+    def test_every_catalog_project_has_a_page(self):
+        for project in catalog.PROJECTS:
+            with self.subTest(slug=project.slug):
+                response = self.get(f'/projects/{project.slug}/')
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, f'<title>{project.page_title}</title>')
+
+    def test_unknown_project_gets_404(self):
+        self.assertEqual(self.get('/projects/no-such-project/').status_code, 404)
+
+
+class ProjectApiTests(SimpleTestCase):
+    def get(self, path, data=None, **headers):
+        return self.client.get(path, data, secure=True, headers={'host': 'sgcx.org', **headers})
+
+    def test_cursors_walk_the_catalog_in_order(self):
+        slugs = []
+        data = {'limit': 2, 'fields': 'slug'}
+        while True:
+            body = self.get('/api/projects/', data).json()
+            self.assertLessEqual(len(body['results']), 2)
+            slugs.extend(record['slug'] for record in body['results'])
+            if body['next'] is None:
+                break
+            data['cursor'] = body['next']
+        self.assertEqual(slugs, [project.slug for project in catalog.PROJECTS])
+
+    def test_fields_select_and_order_the_record(self):
+        project = catalog.PROJECTS[0]
+        body = self.get(f'/api/projects/{project.slug}/', {'fields': 'status,slug'}).json()
+        self.assertEqual(list(body), ['slug', 'status'])
+        self.assertEqual(body['status'], project.status)
+
+    def test_limit_is_clamped(self):
+        body = self.get('/api/projects/', {'limit': MAX_LIMIT * 10}).json()
+        self.assertEqual(len(body['results']), min(len(catalog.PROJECTS), MAX_LIMIT))
+
+    def test_bad_queries_get_400(self):
+        for data in (
+            {'fields': 'slug,secret'},
+            {'limit': 'many'},
+            {'cursor': '!!!'},
+            {'cursor': encode_cursor('no-such-project')},
+        ):
+            with self.subTest(**data):
+                response = self.get('/api/projects/', data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_unknown_project_gets_404(self):
+        self.assertEqual(self.get('/api/projects/nope/').status_code, 404)
+
+    def test_writes_get_405(self):
+        response = self.client.post('/api/projects/', secure=True, headers={'host': 'sgcx.org'})
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD')
+
+    def test_revalidation_gets_304(self):
+        etag = self.get('/api/projects/')['ETag']
+        self.assertEqual(self.get('/api/projects/', if_none_match=etag).status_code, 304)
@@ -0,0 +1,48 @@
+# projects/themes.py
+"""Inline styling for the research project cards on the projects page."""
+
+from collections import namedtuple
+
+CardTheme = namedtuple('CardTheme', [
+    'card_style',
+    'status_style',
+    'title_color',
+    'tagline_color',
+    'description_color',
+    'link_style',
+])
+
+_LIGHT_TEXT = dict(
+    status_style='background: rgba(255,255,255,0.2); color: white;',
+    title_color='white',
+    tagline_color='rgba(255,255,255,0.9)',
+    description_color='rgba(255,255,255,0.9)',
+    link_style='background: white; color: #333;',
+)
+
+
+def _gradient(start, end, color='white'):
+    return f'background: linear-gradient(135deg, {start} 0%, {end} 100%); color: {color}; border-left: none;'
+
+
+RESEARCH_THEMES = {
+    'lacuna': CardTheme(card_style=_gradient('#667eea', '#764ba2'), **_LIGHT_TEXT),
+    'blacklight': CardTheme(
+        card_style=_gradient('#2c3e50', '#34495e', '#87ceeb'),
+        status_style='background: rgba(135,206,235,0.2); color: #87ceeb;',
+        title_color='#87ceeb',
+        tagline_color='#b0e0e6',
+        description_color='#e6f3ff',
+        link_style='background: #87ceeb; color: #2c3e50;',
+    ),
+    'gradflow': CardTheme(card_style=_gradient('#1e3c72', '#2a5298'), **_LIGHT_TEXT),
+    'afl': CardTheme(card_style=_gradient('#e74c3c', '#c0392b'), **_LIGHT_TEXT),
+    'bonsai': CardTheme(card_style=_gradient('#27ae60', '#229954'), **_LIGHT_TEXT),
+}
+
+# Unknown research projects keep the default card and status backgrounds.
+DEFAULT_THEME = CardTheme(card_style='', **(_LIGHT_TEXT | {'status_style': ''}))
+
+
+def theme_for(slug):
+    return RESEARCH_THEMES.get(slug, DEFAULT_THEME)
@@ -1,20 +1,17 @@
 # projects/urls.py
 from django.urls import path
+
+from sgcx_site.cdn import cdn_cache
+
 from . import views
 
 app_name = 'projects'
 
+# Like the landing pages; a catalog change purges the projects it touches.
+page = cdn_cache(max_age=60, s_maxage=24 * 60 * 60, stale_while_revalidate=60 * 60, stale_if_error=7 * 24 * 60 * 60)
+
 urlpatterns = [
-    path('', views.project_list, name='project_list'),
-    # Research projects
-    path('lacuna/', views.lacuna, name='lacuna'),
-    path('blacklight/', views.blacklight, name='blacklight'),
-    path('gradflow/', views.gradflow, name='gradflow'),
-    path('afl/', views.afl, name='afl'),
-    path('bonsai/', views.bonsai, name='bonsai'),
-    # Interface projects (future subdomains)
-    path('clinical/', views.clinical, name='clinical'),
-    path('pharma/', views.pharma, name='pharma'),
-    path('finance/', views.finance, name='finance'),
-    path('insurance/', views.insurance, name='insurance'),
-]
\ No newline at end of file
+    path('', page(views.project_list), name='project_list'),
+    # Research and interface projects, looked up in projects.catalog
+    path('<slug:slug>/', page(views.project_detail), name='detail'),
+]
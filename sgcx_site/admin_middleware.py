@@ -0,0 +1,24 @@
+# sgcx_site/admin_middleware.py
+"""
+Event-loop versions of the auth and messages middleware (see
+``sgcx_site.middleware``).
+
+Kept apart because importing them imports ``django.contrib.auth``, which the
+public site profile does not install.
+"""
+
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+
+from .middleware import InlineAsyncMixin
+
+
+class AuthenticationMiddleware(InlineAsyncMixin, auth.AuthenticationMiddleware):
+    # Only installs a lazy request.user; loading the user is left to the view.
+    pass
+
+
+class MessageMiddleware(InlineAsyncMixin, messages.MessageMiddleware):
+    # Message storage writes cookies or the session object; the session
+    # middleware does the saving.
+    pass
@@ -0,0 +1,337 @@
+# sgcx_site/cdn.py
+"""
+Caching headers and targeted purges for a CDN in front of the site.
+
+Views declare their policy where they are routed, with ``cdn_cache``: how
+long browsers may keep a response (``max-age``), how long the CDN may
+(``s-maxage``), and for how long past that it may serve the stale copy while
+it refetches (``stale-while-revalidate``) or while the origin is failing
+(``stale-if-error``). Prerendered pages, which WhiteNoise serves without
+reaching a view, get the policy of the view that rendered them.
+
+Every response is also tagged with surrogate keys naming what it was made
+from:
+
+``page:<path>``
+    The page itself.
+``project:<slug>``
+    A catalog project shown on the page (``surrogate_keys`` on the view).
+``catalog``, ``api``
+    The catalog as a whole, and the JSON API's code.
+``base:<version>``
+    ``base.html`` and its partials, on every HTML page.
+
+Because the CDN can then keep pages for as long as they stay unchanged,
+``manage.py purge_cdn`` runs after each deploy: it fingerprints every key
+of the new build, compares them with the fingerprints recorded at the
+previous purge, and purges only the keys whose content changed. A change
+to ``base.html`` purges its old key, which covers every page at once.
+
+That purge runs in the release phase, while the previous release still
+serves, so the CDN may refetch an old page and keep it. The purged keys are
+therefore also recorded as pending, and purged once more by the first web
+dyno of the new release to boot (``purge_cdn --pending``, started from
+gunicorn's ``when_ready``).
+
+``CDN_BACKEND`` names the header the keys go in and sends the purges;
+``LocalBackend`` (the default) only records them.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+from collections import deque, namedtuple
+from functools import lru_cache, wraps
+from pathlib import Path
+from urllib.error import URLError
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+
+from projects import catalog
+
+from .redis_client import redis_client
+from .versioning import base_version
+
+logger = logging.getLogger(__name__)
+
+PAGE_PREFIX = 'page:'
+PROJECT_PREFIX = 'project:'
+BASE_PREFIX = 'base:'
+CATALOG_KEY = 'catalog'
+API_KEY = 'api'
+
+# Where the previous purge's fingerprints are kept when there is Redis.
+STATE_KEY = 'sgcx:cdn:keys'
+PENDING_KEY = 'sgcx:cdn:pending'
+
+
+def page_key(path):
+    return PAGE_PREFIX + path
+
+
+def project_key(slug):
+    return PROJECT_PREFIX + slug
+
+
+def base_key():
+    return BASE_PREFIX + base_version()
+
+
+class CachePolicy(namedtuple('CachePolicy', ['max_age', 's_maxage', 'stale_while_revalidate', 'stale_if_error'])):
+    __slots__ = ()
+
+    @property
+    def header(self):
+        directives = ['public', f'max-age={self.max_age}', f's-maxage={self.s_maxage}']
+        if self.stale_while_revalidate:
+            directives.append(f'stale-while-revalidate={self.stale_while_revalidate}')
+        if self.stale_if_error:
+            directives.append(f'stale-if-error={self.stale_if_error}')
+        return ', '.join(directives)
+
+
+def surrogate_keys(view_func, path, kwargs, html):
+    """The keys for a response of ``view_func`` at ``path``."""
+    keys = [page_key(path)]
+    view_keys = getattr(view_func, 'surrogate_keys', None)
+    if view_keys is not None:
+        keys.extend(view_keys(**kwargs))
+    if html:
+        keys.append(base_key())
+    return keys
+
+
+def cache_headers(view_func, path, kwargs, html):
+    """``{header: value}`` for a cacheable response of ``view_func``."""
+    backend = purge_backend()
+    return {
+        'Cache-Control': view_func.cache_policy.header,
+        backend.header: backend.separator.join(surrogate_keys(view_func, path, kwargs, html)),
+    }
+
+
+def _apply(view_func, request, kwargs, response, html):
+    # Errors are left to the CDN's defaults rather than kept for a day.
+    if response.status_code in (200, 304):
+        for name, value in cache_headers(view_func, request.path, kwargs, html).items():
+            response[name] = value
+    return response
+
+
+def cdn_cache(max_age, s_maxage, stale_while_revalidate=0, stale_if_error=0, html=True):
+    """
+    Set the CDN policy and surrogate keys on the view's successful responses.
+
+    Applied in the URLconf, outside the page cache and conditional GET, so
+    cached pages and 304s carry the headers too. ``html`` views render
+    ``base.html`` and are tagged with its key.
+    """
+    policy = CachePolicy(max_age, s_maxage, stale_while_revalidate, stale_if_error)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                response = await view_func(request, *args, **kwargs)
+                return _apply(_wrapped_view, request, kwargs, response, html)
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                response = view_func(request, *args, **kwargs)
+                return _apply(_wrapped_view, request, kwargs, response, html)
+
+        _wrapped_view.cache_policy = policy
+        return _wrapped_view
+
+    return decorator
+
+
+def prerendered_headers(path):
+    """``cache_headers`` for the prerendered page at ``path``, or ``{}``."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {}
+    if getattr(match.func, 'cache_policy', None) is None:
+        return {}
+    return cache_headers(match.func, path, match.kwargs, html=True)
+
+
+def key_manifest():
+    """
+    ``{key: fingerprint}`` for this build.
+
+    Pages are fingerprinted by ``prerender`` (templates, static files, view
+    and catalog entries), so only prerendered pages are listed.
+    """
+    from projects import api, api_urls
+
+    try:
+        pages = json.loads(Path(settings.PRERENDER_MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        pages = {}
+    keys = {page_key(path): entry['fingerprint'] for path, entry in pages.items()}
+    keys.update({project_key(project.slug): project.fingerprint for project in catalog.PROJECTS})
+    keys[CATALOG_KEY] = catalog.VERSION
+    api_digest = hashlib.sha256()
+    for module in (api, api_urls):
+        api_digest.update(Path(inspect.getsourcefile(module)).read_bytes())
+    keys[API_KEY] = api_digest.hexdigest()[:16]
+    keys[base_key()] = base_version()
+    return keys
+
+
+def stale_keys(previous, current):
+    """Keys of ``previous`` whose content changed or is gone in ``current``."""
+    stale = sorted(key for key, fingerprint in previous.items() if current.get(key) != fingerprint)
+    if any(key.startswith(BASE_PREFIX) for key in stale):
+        # Every page carries the base key, so purging it covers them all.
+        stale = [key for key in stale if not key.startswith(PAGE_PREFIX)]
+    return stale
+
+
+def load_state():
+    """The key manifest recorded by the last purge, or ``None``."""
+    client = redis_client()
+    if client is not None:
+        data = client.get(STATE_KEY)
+    else:
+        try:
+            data = Path(settings.CDN_STATE_FILE).read_bytes()
+        except FileNotFoundError:
+            data = None
+    return json.loads(data) if data else None
+
+
+def save_state(keys):
+    data = json.dumps(keys, sort_keys=True)
+    client = redis_client()
+    if client is not None:
+        client.set(STATE_KEY, data)
+    else:
+        path = Path(settings.CDN_STATE_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(data)
+
+
+def _pending_file():
+    return Path(settings.CDN_STATE_FILE).with_suffix('.pending.json')
+
+
+def save_pending(keys):
+    """Record ``keys`` to be purged again once the new release serves."""
+    data = json.dumps(sorted(keys))
+    client = redis_client()
+    if client is not None:
+        client.set(PENDING_KEY, data)
+    else:
+        path = _pending_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(data)
+
+
+def take_pending():
+    """The pending keys, which are no longer recorded: of several dynos, one gets them."""
+    client = redis_client()
+    if client is not None:
+        with client.pipeline() as pipe:
+            pipe.get(PENDING_KEY)
+            pipe.delete(PENDING_KEY)
+            data, _ = pipe.execute()
+    else:
+        try:
+            data = _pending_file().read_bytes()
+        except FileNotFoundError:
+            data = None
+        _pending_file().unlink(missing_ok=True)
+    return json.loads(data) if data else []
+
+
+class PurgeError(Exception):
+    pass
+
+
+class PurgeBackend:
+    """
+    A CDN's surrogate key header and purge API.
+
+    ``purge`` is called with at most ``batch_size`` keys at a time.
+    """
+
+    header = 'Surrogate-Key'
+    separator = ' '
+    batch_size = 256
+
+    def __init__(self, api_token='', service=''):
+        self.api_token = api_token
+        self.service = service
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+    def _post(self, url, headers, data=None):
+        # Only purge_cdn sends requests; web dynos never import the HTTP client.
+        import urllib.request
+
+        request = urllib.request.Request(url, data=data, headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except URLError as error:
+            raise PurgeError(f'Purging {url} failed: {error}') from error
+
+
+# The most recently purged keys, for tests and for a look at what a deploy
+# would purge.
+purged = deque(maxlen=1024)
+
+
+class LocalBackend(PurgeBackend):
+    """No CDN: record purged keys in ``purged`` and the log."""
+
+    def purge(self, keys):
+        purged.extend(keys)
+        logger.info('Purged surrogate keys: %s', ' '.join(keys))
+
+
+class FastlyBackend(PurgeBackend):
+    """Fastly; ``service`` is the service ID. Purges are soft, so stale copies stay usable."""
+
+    def purge(self, keys):
+        self._post(f'https://api.fastly.com/service/{self.service}/purge', {
+            'Fastly-Key': self.api_token,
+            'Fastly-Soft-Purge': '1',
+            'Surrogate-Key': ' '.join(keys),
+        })
+
+
+class CloudflareBackend(PurgeBackend):
+    """Cloudflare cache tags; ``service`` is the zone ID."""
+
+    header = 'Cache-Tag'
+    separator = ','
+    batch_size = 30
+
+    def purge(self, keys):
+        self._post(f'https://api.cloudflare.com/client/v4/zones/{self.service}/purge_cache', {
+            'Authorization': f'Bearer {self.api_token}',
+            'Content-Type': 'application/json',
+        }, json.dumps({'tags': list(keys)}).encode())
+
+
+@lru_cache(maxsize=None)
+def purge_backend():
+    """The ``CDN_BACKEND`` instance."""
+    return import_string(settings.CDN_BACKEND)(**settings.CDN_OPTIONS)
+
+
+def purge(keys):
+    """Purge ``keys`` in batches the backend accepts."""
+    backend = purge_backend()
+    keys = list(keys)
+    for start in range(0, len(keys), backend.batch_size):
+        backend.purge(keys[start:start + backend.batch_size])
@@ -0,0 +1,73 @@
+# sgcx_site/compression.py
+"""
+Precompressed response bodies and ``Accept-Encoding`` negotiation.
+
+Pages are compressed once, at the highest Brotli and gzip levels, when they
+enter a cache; requests then only pick a stored variant. Brotli support is
+optional and depends on the ``brotli`` package being installed.
+"""
+
+import gzip
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Variants that save less than this fraction of the body are not kept.
+MIN_SAVING = 0.05
+
+
+def compress_variants(content):
+    """Compressed encodings of ``content`` worth serving, keyed by coding."""
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    limit = len(content) * (1 - MIN_SAVING)
+    return {coding: data for coding, data in variants.items() if len(data) < limit}
+
+
+@lru_cache(maxsize=256)
+def _parse_accept_encoding(header):
+    codings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding, available=ENCODINGS):
+    """
+    The coding from ``available`` to use for an ``Accept-Encoding`` header.
+
+    Returns ``None`` when the identity body should be sent.
+    """
+    if not accept_encoding:
+        return None
+    codings = _parse_accept_encoding(accept_encoding)
+    wildcard = codings.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = codings.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def request_encoding(request):
+    return negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
@@ -0,0 +1,101 @@
+# sgcx_site/conditional.py
+"""
+Conditional GET for the public pages.
+
+Validators are derived from the content version rather than the response
+body, so a matching ``If-None-Match`` or ``If-Modified-Since`` is answered
+with 304 before the page cache or the template engine is consulted.
+
+Each content coding is a different representation, so the ETag of a
+compressed response names its coding (``"<tag>-br"``), and the identity body
+has the bare tag. Whether a page has a compressed variant is only known once
+it is rendered, so before that a client's tag matches if it names this page
+and version in any coding the client accepts: the copy it holds is current
+and it can decode it. Validators are only sent with successful responses.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .compression import ENCODINGS, negotiate_encoding
+from .versioning import content_last_modified, content_version
+
+
+def page_etag(request):
+    """Strong ETag (unquoted, without a coding) for the page at this host and path in this content version."""
+    key = f'{content_version()}:{request.get_host()}:{request.path}'
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def current_etags(request, etag):
+    """Quoted tags of the current page in the codings the client accepts."""
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    tags = {f'"{etag}"'}
+    tags.update(
+        f'"{etag}-{coding}"' for coding in ENCODINGS if negotiate_encoding(accept_encoding, (coding,))
+    )
+    return tags
+
+
+def not_modified(request):
+    """A 304 if the client's copy of the page is current, else ``None``."""
+    last_modified = content_last_modified()
+    held = request.META.get('HTTP_IF_NONE_MATCH')
+    if held:
+        # If-None-Match takes precedence; it is compared weakly.
+        held = {tag.removeprefix('W/') for tag in parse_etags(held)}
+        current = current_etags(request, page_etag(request))
+        matches = held & current
+        if not matches and '*' not in held:
+            return None
+        etag = min(matches) if matches else None
+    else:
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if since is None or last_modified.timestamp() > since:
+            return None
+        etag = None
+    response = HttpResponseNotModified()
+    if etag:
+        response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def set_validators(request, response):
+    """Tag a successful page response with the ETag of the coding it was sent in."""
+    if response.status_code == 200:
+        etag = page_etag(request)
+        encoding = response.get('Content-Encoding')
+        response['ETag'] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+        response['Last-Modified'] = http_date(content_last_modified().timestamp())
+    return response
+
+
+def conditional_page(view_func):
+    """Answer GET/HEAD revalidations of the page with 304 before ``view_func`` runs."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view_func(request, *args, **kwargs)
+            response = not_modified(request)
+            if response is not None:
+                return response
+            return set_validators(request, await view_func(request, *args, **kwargs))
+    else:
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            response = not_modified(request)
+            if response is not None:
+                return response
+            return set_validators(request, view_func(request, *args, **kwargs))
+
+    return _wrapped_view
@@ -0,0 +1,164 @@
+# sgcx_site/critical_css.py
+"""
+Critical CSS: the part of a stylesheet a page needs for first paint.
+
+``manage.py build_critical_css`` renders every public route, keeps the rules
+of the stylesheet whose selectors can match the rendered HTML and stores the
+result per page template. Matching is deliberately conservative: a selector
+is kept when every compound in it (``div.card``, ``#nav``, ...) matches some
+element, ignoring combinators and pseudo-classes. That can keep a few unused
+rules but never drops one the page needs.
+
+Results are cached under ``CRITICAL_CSS_ROOT`` by a key over the page's
+template closure and the stylesheet, so a rebuild only recomputes pages whose
+templates or CSS changed.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from .versioning import dependency_fingerprint
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?')
+_COMBINATOR = re.compile(r'\s*[>+~]\s*|\s+')
+_TAG = re.compile(r'^([\w-]+|\*)')
+_ID = re.compile(r'#([\w-]+)')
+_CLASS = re.compile(r'\.([\w-]+)')
+_ATTRIBUTE = re.compile(r'\[\s*([\w-]+)')
+_WHITESPACE = re.compile(r'\s+')
+
+# At-rules whose bodies are lists of style rules to filter.
+GROUPING_AT_RULES = ('@media', '@supports')
+
+
+class _ElementCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.elements = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self.elements.append((
+            tag,
+            attrs.get('id'),
+            frozenset((attrs.get('class') or '').split()),
+            frozenset(attrs),
+        ))
+
+
+def document_elements(html):
+    collector = _ElementCollector()
+    collector.feed(html)
+    return collector.elements
+
+
+def _compound_matches(compound, elements):
+    tag = _TAG.match(compound)
+    tag = tag.group(1).lower() if tag and tag.group(1) != '*' else None
+    ids = _ID.findall(compound)
+    classes = set(_CLASS.findall(compound))
+    attributes = set(_ATTRIBUTE.findall(compound))
+    for element_tag, element_id, element_classes, element_attributes in elements:
+        if tag and tag != element_tag:
+            continue
+        if ids and (len(ids) > 1 or ids[0] != element_id):
+            continue
+        if classes <= element_classes and attributes <= element_attributes:
+            return True
+    return False
+
+
+def selector_matches(selector, elements):
+    compounds = _COMBINATOR.split(_PSEUDO.sub('', selector).strip())
+    return all(_compound_matches(compound, elements) for compound in compounds if compound)
+
+
+def parse_blocks(css):
+    """Split CSS into top-level ``(prelude, body)`` pairs."""
+    blocks = []
+    position = 0
+    while True:
+        start = css.find('{', position)
+        if start == -1:
+            return blocks
+        depth = 1
+        end = start + 1
+        while depth and end < len(css):
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+            end += 1
+        blocks.append((css[position:start].strip(), css[start + 1:end - 1]))
+        position = end
+
+
+def _compact(text):
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def critical_rules(css, elements):
+    """The rules of ``css`` that can apply to ``elements``, minified."""
+    output = []
+    for prelude, body in parse_blocks(_COMMENT.sub('', css)):
+        if prelude.startswith(GROUPING_AT_RULES):
+            inner = critical_rules(body, elements)
+            if inner:
+                output.append(f'{_compact(prelude)}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{_compact(prelude)}{{{_compact(body)}}}')
+        else:
+            selectors = [_compact(s) for s in prelude.split(',')]
+            kept = [s for s in selectors if selector_matches(s, elements)]
+            if kept:
+                output.append(f"{','.join(kept)}{{{_compact(body)}}}")
+    return ''.join(output)
+
+
+def stylesheet_source(name):
+    return Path(finders.find(name)).read_text(encoding='utf-8')
+
+
+def cache_key(template_name, stylesheet):
+    """Key over the template closure of a page and the stylesheet source."""
+    digest = hashlib.sha256(dependency_fingerprint([template_name]).encode())
+    digest.update(stylesheet.encode())
+    return digest.hexdigest()[:20]
+
+
+def _index_path():
+    return Path(settings.CRITICAL_CSS_ROOT) / 'index.json'
+
+
+def write_index(index):
+    path = _index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(index, indent=2, sort_keys=True))
+
+
+@lru_cache(maxsize=None)
+def _index():
+    try:
+        return json.loads(_index_path().read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+@lru_cache(maxsize=None)
+def critical_css_for(template_name, stylesheet_name):
+    """Inlinable CSS for a page template, or ``None`` if none was built."""
+    key = _index().get(stylesheet_name, {}).get(template_name)
+    if key is None:
+        return None
+    try:
+        return (Path(settings.CRITICAL_CSS_ROOT) / f'{key}.css').read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return None
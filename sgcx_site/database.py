@@ -0,0 +1,120 @@
+# sgcx_site/database.py
+"""
+``DATABASES['default']`` from a ``DATABASE_URL``.
+
+PostgreSQL (``postgres://`` or ``postgresql://``, as Heroku Postgres sets it)
+uses psycopg 3. By default each process keeps a psycopg connection pool sized
+to the threads that can use a connection at once; with pooling off it keeps
+persistent connections instead (``CONN_MAX_AGE``), checked before reuse.
+
+Without a URL, or with ``sqlite:///path``, SQLite is tuned for a single node:
+WAL so readers do not block the writer, a busy timeout instead of immediate
+"database is locked" errors, IMMEDIATE transactions so writers queue rather
+than deadlock, and memory-mapped reads.
+"""
+
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+POSTGRES_SCHEMES = ('postgres', 'postgresql', 'pgsql')
+
+# Seconds a persistent connection is reused before Django reopens it.
+CONN_MAX_AGE = 600
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    # WAL keeps the database consistent on a crash with NORMAL; FULL also
+    # survives power loss at the cost of an fsync per commit.
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=134217728',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+)
+SQLITE_BUSY_TIMEOUT = 20
+
+
+def pool_size(workers, threads, max_connections=None):
+    """
+    Connections per process: one per thread, within the server's share.
+
+    ``max_connections`` is how many connections this server may hold in
+    total; its ``workers`` processes split it evenly.
+    """
+    size = threads
+    if max_connections:
+        size = min(size, max_connections // max(workers, 1))
+    return max(size, 1)
+
+
+def pool_options(max_size):
+    """psycopg_pool options for a pool of up to ``max_size`` connections."""
+    return {
+        'min_size': 1,
+        'max_size': max_size,
+        # Seconds a request waits for a free connection before failing.
+        'timeout': 10,
+        'max_idle': CONN_MAX_AGE,
+        'max_lifetime': 60 * 60,
+    }
+
+
+def sqlite_config(path):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+        },
+    }
+
+
+def postgres_config(url, pool_size=None, conn_max_age=CONN_MAX_AGE):
+    """
+    Settings for a PostgreSQL URL.
+
+    With ``pool_size`` each process keeps a pool of up to that many
+    connections; without it, persistent connections without a pool.
+    """
+    parts = urlsplit(url)
+    options = dict(parse_qsl(parts.query))
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': unquote(parts.path.lstrip('/')),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': parts.hostname or '',
+        'PORT': str(parts.port or ''),
+        'OPTIONS': options,
+    }
+    if pool_size:
+        # Django returns connections to the pool at the end of each request;
+        # it refuses persistent connections on top of a pool.
+        options['pool'] = pool_options(pool_size)
+        config['CONN_MAX_AGE'] = 0
+    else:
+        config['CONN_MAX_AGE'] = conn_max_age
+    # With a pool, Django checks each connection as the pool hands it out.
+    config['CONN_HEALTH_CHECKS'] = True
+    return config
+
+
+def database_config(url, default_sqlite_path, pool_size=None, conn_max_age=CONN_MAX_AGE, require_ssl=False):
+    """The ``default`` database for ``url``, or tuned SQLite when it is empty."""
+    if not url:
+        return sqlite_config(default_sqlite_path)
+    scheme = urlsplit(url).scheme
+    if scheme == 'sqlite':
+        path = urlsplit(url).path
+        # sqlite:///relative.db and sqlite:////absolute/path.db
+        return sqlite_config(path[1:] if path.startswith('//') else path.lstrip('/') or default_sqlite_path)
+    if scheme in POSTGRES_SCHEMES:
+        config = postgres_config(url, pool_size=pool_size, conn_max_age=conn_max_age)
+        if require_ssl:
+            config['OPTIONS'].setdefault('sslmode', 'require')
+        return config
+    raise ImproperlyConfigured(f'Unsupported DATABASE_URL scheme {scheme!r}')
@@ -0,0 +1,59 @@
+# sgcx_site/fragments.py
+"""
+Process-level memoization for template fragments and URL reversing.
+
+The nav, footer and project cards do not depend on the request, so each is
+rendered once per content version and the resulting HTML is reused by every
+page that includes it. The content version covers the template tag and theme
+code as well as the templates, so a change to either renders them afresh.
+
+Workers serve requests from several threads, so the cache is swapped and
+filled under a lock; fragments are rendered outside it.
+"""
+
+from functools import lru_cache
+from threading import Lock
+
+from django.template.loader import render_to_string
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils.safestring import mark_safe
+
+from .versioning import content_version
+
+_fragments = {}
+_fragments_version = None
+_fragments_lock = Lock()
+
+
+def render_fragment(template_name, context=None, key=None):
+    """
+    Render ``template_name`` once and return the cached HTML afterwards.
+
+    ``key`` must identify ``context`` when one is given; fragments rendered
+    without context are keyed by template name alone.
+    """
+    global _fragments_version
+    version = content_version()
+    cache_key = (template_name, key)
+    with _fragments_lock:
+        if version != _fragments_version:
+            _fragments.clear()
+            _fragments_version = version
+        html = _fragments.get(cache_key)
+    if html is None:
+        html = mark_safe(render_to_string(template_name, context))
+        with _fragments_lock:
+            # Another thread may have moved on to a newer version meanwhile.
+            if version == _fragments_version:
+                html = _fragments.setdefault(cache_key, html)
+    return html
+
+
+@lru_cache(maxsize=512)
+def _reverse(viewname, args, kwargs, urlconf, prefix):
+    return reverse(viewname, urlconf=urlconf, args=args, kwargs=dict(kwargs))
+
+
+def cached_reverse(viewname, *args, **kwargs):
+    """Memoized ``reverse()``; keyed on the active URLconf and script prefix."""
+    return _reverse(viewname, args, tuple(sorted(kwargs.items())), get_urlconf(), get_script_prefix())
@@ -0,0 +1,136 @@
+# sgcx_site/images.py
+"""
+Responsive image variants for the static images.
+
+``manage.py build_images`` resizes every image in ``landing/static/images`` to
+1x/2x/3x of its display size and encodes each size as PNG, WebP and (when
+Pillow has AVIF support) AVIF under ``images/variants/``. Because the variants
+live in a static directory, collectstatic content-hashes them into the
+manifest like any other asset.
+
+An index of what was built is written next to the variants; the
+``{% picture %}`` tag reads it to emit a ``<source type=...>`` per format,
+whose ``srcset`` names each variant by its own hashed URL. The browser picks
+the format and density, so the original image's URL only ever serves the
+original bytes and caches need no ``Vary: Accept``.
+"""
+
+import json
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+SOURCE_DIR = 'images'
+VARIANT_DIR = 'images/variants'
+INDEX_NAME = f'{VARIANT_DIR}/index.json'
+
+DENSITIES = (1, 2, 3)
+SOURCE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+
+# Modern formats, best first: that is the order <picture> sources are tried
+# in. Only the ones Pillow can encode are built (see encodable_formats).
+FORMATS = (('image/avif', 'avif'), ('image/webp', 'webp'))
+
+
+def encodable_formats():
+    # Pillow is only needed to build variants, so serving never imports it.
+    from PIL import features
+
+    return [(mime, extension) for mime, extension in FORMATS
+            if extension != 'avif' or features.check('avif')]
+
+
+def _encode(image, extension):
+    buffer = BytesIO()
+    if extension == 'avif':
+        image.save(buffer, 'AVIF', quality=80)
+    elif extension == 'webp':
+        # Logos are flat artwork, where lossless WebP is usually smallest.
+        image.save(buffer, 'WEBP', lossless=True, method=6)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def variant_sizes(source_size, display_height):
+    """``(density, width, height)`` for each density, never upscaling the source."""
+    width, height = source_size
+    sizes = []
+    for density in DENSITIES:
+        target = display_height * density
+        if target >= height - 0.5:
+            # Cap at the source; its real density goes in the srcset.
+            if not sizes or sizes[-1][2] < height:
+                sizes.append((round(height / display_height, 2), width, height))
+            break
+        sizes.append((density, round(width * target / height), round(target)))
+    return sizes
+
+
+def _display_height(name, source_height):
+    # Images without a declared CSS height are treated as their own 3x asset.
+    return settings.RESPONSIVE_IMAGE_HEIGHTS.get(name, source_height / DENSITIES[-1])
+
+
+def build_variants(source_root, force=False, log=print):
+    """
+    Build variants for every image under ``source_root/images``.
+
+    Returns the index that was written. Existing outputs newer than their
+    source are reused unless ``force`` is set.
+    """
+    from PIL import Image
+
+    source_root = Path(source_root)
+    formats = encodable_formats() + [('image/png', 'png')]
+    variant_root = source_root / VARIANT_DIR
+    variant_root.mkdir(parents=True, exist_ok=True)
+    index = {}
+
+    for source in sorted((source_root / SOURCE_DIR).iterdir()):
+        if source.suffix.lower() not in SOURCE_SUFFIXES:
+            continue
+        name = f'{SOURCE_DIR}/{source.name}'
+        with Image.open(source) as image:
+            image.load()
+            source_size = image.size
+            display_height = _display_height(name, image.height)
+            entries = []
+            for density, width, height in variant_sizes(source_size, display_height):
+                resized = None
+                for mime, extension in formats:
+                    variant = f'{VARIANT_DIR}/{source.stem}-{density:g}x.{extension}'
+                    target = source_root / variant
+                    if force or not target.exists() or target.stat().st_mtime < source.stat().st_mtime:
+                        if resized is None:
+                            resized = image.resize((width, height), Image.LANCZOS)
+                        target.write_bytes(_encode(resized, extension))
+                        log(f'Built {variant} ({width}x{height})')
+                    entries.append({
+                        'name': variant,
+                        'type': mime,
+                        'density': density,
+                        'width': width,
+                        'height': height,
+                    })
+        index[name] = {'width': source_size[0], 'height': source_size[1], 'variants': entries}
+
+    (source_root / INDEX_NAME).write_text(json.dumps(index, indent=2, sort_keys=True))
+    return index
+
+
+@lru_cache(maxsize=None)
+def variant_index():
+    """The index written by ``build_variants``; empty if images were not built."""
+    path = finders.find(INDEX_NAME)
+    if not path:
+        return {}
+    return json.loads(Path(path).read_text())
+
+
+def variants_for(name):
+    return variant_index().get(name, {}).get('variants', [])
+
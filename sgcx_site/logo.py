@@ -0,0 +1,47 @@
+# sgcx_site/logo.py
+"""
+The SGCX logo as an inline SVG symbol.
+
+The nav logo is drawn from the main white SVG that ``logo_gen.py`` generates rather than
+fetched as an image, so it costs no request and is never the last thing on
+the critical path. Pages define the symbol once and draw it with ``<use>``.
+"""
+
+import re
+from functools import lru_cache
+
+import logo_gen
+
+SYMBOL_ID = 'sgcx-logo'
+
+_SVG = re.compile(r'<svg\b([^>]*)>(.*)</svg>', re.S)
+_VIEW_BOX = re.compile(r'viewBox="([^"]+)"')
+_COMMENT = re.compile(r'<!--.*?-->', re.S)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def parse_svg(svg):
+    """``(view_box, inner markup)`` of an SVG document, with comments removed."""
+    match = _SVG.search(svg)
+    if match is None:
+        raise ValueError('Not an SVG document')
+    view_box = _VIEW_BOX.search(match.group(1)).group(1)
+    inner = _WHITESPACE.sub(' ', _COMMENT.sub('', match.group(2)))
+    return view_box, inner.replace('> <', '><').strip()
+
+
+@lru_cache(maxsize=None)
+def logo_symbol():
+    """``<svg>`` sprite defining the white logo as ``#sgcx-logo``."""
+    view_box, inner = parse_svg(logo_gen.svg('main', 'white'))
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" aria-hidden="true" style="display:none">'
+        f'<symbol id="{SYMBOL_ID}" viewBox="{view_box}">{inner}</symbol></svg>'
+    )
+
+
+@lru_cache(maxsize=None)
+def logo_size(height):
+    """``(width, height)`` of the logo drawn ``height`` pixels tall."""
+    _, _, width, view_height = (float(value) for value in parse_svg(logo_gen.svg('main', 'white'))[0].split())
+    return round(width * height / view_height), height
@@ -0,0 +1,383 @@
+# sgcx_site/metrics.py
+"""
+Request timing: ``Server-Timing`` headers and Prometheus-format metrics.
+
+``TimingMiddleware`` (outermost) and ``ViewTimingMiddleware`` (innermost)
+split each request into middleware time and view time; the
+``TimedDjangoTemplates`` backend adds the time spent rendering templates.
+Each request records per-route histograms of total, render and middleware
+time and of response bytes, and gets a ``Server-Timing`` header that browser
+devtools display.
+
+Recording is lock-free on the hot path: every thread writes to its own shard
+and shards are only summed when ``/internal/metrics/`` is scraped. With
+``METRICS_DIR`` set, each process also snapshots its totals to a file there
+at most once per ``METRICS_FLUSH_INTERVAL``, and a scrape merges the files of
+every process, so one gunicorn worker reports for all of them. When a worker
+exits, gunicorn's arbiter folds its last snapshot into ``metrics-retired.json``
+(``retire``), so the counters keep counting and the directory holds one file
+per live worker.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    'sgcx_request_duration_seconds': ('Total time spent handling a request.', DURATION_BUCKETS),
+    'sgcx_middleware_duration_seconds': ('Time spent in middleware, outside the view.', DURATION_BUCKETS),
+    'sgcx_render_duration_seconds': ('Time spent rendering templates.', DURATION_BUCKETS),
+    'sgcx_response_bytes': ('Size of response bodies.', BYTES_BUCKETS),
+}
+COUNTERS = {
+    'sgcx_requests_total': ('Requests handled, by route, method and status.', ('route', 'method', 'status')),
+    'sgcx_ratelimit_requests_total': (
+        'Rate limit decisions, by client class (client or bot) and outcome.', ('class', 'decision'),
+    ),
+    'sgcx_ratelimit_sync_errors_total': ('Failed syncs of rate limit counts with Redis.', ()),
+}
+
+
+class _Shard:
+    """Metrics recorded by one thread; only that thread writes to it."""
+
+    __slots__ = ('histograms', 'counters')
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+
+
+class Registry:
+    """Per-thread shards, summed on demand."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        histograms = self._shard().histograms
+        key = (name, labels)
+        series = histograms.get(key)
+        if series is None:
+            # Bucket counts (the last one is +Inf), then sum.
+            series = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def increment(self, name, labels, amount=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def snapshot(self):
+        """Totals over every shard of this process, as a JSON-able dict."""
+        with self._lock:
+            shards = list(self._shards)
+        histograms, counters = {}, {}
+        for shard in shards:
+            for key, series in list(shard.histograms.items()):
+                total = histograms.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+        return _as_snapshot(histograms, counters)
+
+    def maybe_flush(self):
+        """Write this process's snapshot to ``METRICS_DIR`` if one is due."""
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not directory or now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        self.flush(directory)
+
+    def flush(self, directory):
+        _write_snapshot(Path(directory) / f'metrics-{os.getpid()}.json', self.snapshot())
+
+
+def _as_snapshot(histograms, counters):
+    return {
+        'histograms': [[name, list(labels), series] for (name, labels), series in histograms.items()],
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+    }
+
+
+def _write_snapshot(path, snapshot):
+    temporary = path.with_suffix('.tmp')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def merge(snapshots):
+    """``(histograms, counters)`` summed over ``snapshots``, keyed by ``(name, labels)``."""
+    histograms, counters = {}, {}
+    for snapshot in snapshots:
+        for name, labels, series in snapshot['histograms']:
+            total = histograms.setdefault((name, tuple(labels)), [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def retire(directory, pid):
+    """Fold the snapshot of exited process ``pid`` into ``metrics-retired.json``."""
+    path = Path(directory) / f'metrics-{pid}.json'
+    retired_path = Path(directory) / 'metrics-retired.json'
+    snapshots = []
+    for source in (retired_path, path):
+        try:
+            snapshots.append(json.loads(source.read_text()))
+        except (FileNotFoundError, ValueError):
+            continue
+    if not snapshots:
+        return
+    _write_snapshot(retired_path, _as_snapshot(*merge(snapshots)))
+    path.unlink(missing_ok=True)
+
+
+def merged_snapshots():
+    """Snapshots of every process: files in ``METRICS_DIR``, or this process only."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return [registry.snapshot()]
+    registry.flush(directory)
+    snapshots = []
+    for path in sorted(Path(directory).glob('metrics-*.json')):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (FileNotFoundError, ValueError):
+            continue
+    return snapshots
+
+
+def _label_text(names, values):
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+        pairs.append(f'{name}="{value}"')
+    return ','.join(pairs)
+
+
+def _format_le(bound):
+    return '+Inf' if bound is None else repr(float(bound))
+
+
+def exposition(snapshots):
+    """Render snapshots in the Prometheus text exposition format."""
+    histograms, counters = merge(snapshots)
+
+    lines = []
+    for name, (help_text, label_names) in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f"{name}{{{_label_text(label_names, labels)}}} {value}" if labels else f'{name} {value}')
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            route = _label_text(('route',), labels)
+            cumulative = 0
+            for bound, count in zip((*buckets, None), series[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{route},le="{_format_le(bound)}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{route}}} {series[-1]}')
+            lines.append(f'{name}_count{{{route}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+# Per-request timing state: [render seconds, template nesting depth, view seconds].
+_request_timing = ContextVar('sgcx_request_timing', default=None)
+
+
+class TimedTemplate(Template):
+    """Backend template that adds its render time to the current request."""
+
+    def render(self, context=None, request=None):
+        timing = _request_timing.get()
+        if timing is None:
+            return super().render(context, request)
+        # Fragments rendered inside a page are already part of its time.
+        timing[1] += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing[1] -= 1
+            if not timing[1]:
+                timing[0] += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every top-level render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _route_label(request, response):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name
+    # Only the static file and rate limit middleware answer without
+    # resolving a URL.
+    if response.status_code < 300 or response.status_code == 304:
+        return 'static'
+    if response.status_code == 429:
+        return 'ratelimited'
+    return 'unresolved'
+
+
+def _response_bytes(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+
+class TimingMiddleware:
+    """
+    Outermost middleware: times the whole request and records its metrics.
+
+    Must be first in ``MIDDLEWARE``, with ``ViewTimingMiddleware`` last.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = [0.0, 0, 0.0]
+        token = _request_timing.set(timing)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timing.reset(token)
+        return self.record(request, response, timing, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timing = [0.0, 0, 0.0]
+        token = _request_timing.set(timing)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_timing.reset(token)
+        return self.record(request, response, timing, time.perf_counter() - start)
+
+    def record(self, request, response, timing, total):
+        render, view = timing[0], timing[2]
+        middleware = max(total - view, 0.0)
+
+        route = (_route_label(request, response),)
+        registry.increment('sgcx_requests_total', (*route, request.method, str(response.status_code)))
+        registry.observe('sgcx_request_duration_seconds', route, total)
+        registry.observe('sgcx_middleware_duration_seconds', route, middleware)
+        registry.observe('sgcx_render_duration_seconds', route, render)
+        size = _response_bytes(response)
+        if size is not None:
+            registry.observe('sgcx_response_bytes', route, size)
+        registry.maybe_flush()
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'mw;dur={middleware * 1000:.2f}, view;dur={view * 1000:.2f}, '
+                f'render;dur={render * 1000:.2f}, total;dur={total * 1000:.2f}'
+            )
+        return response
+
+
+class ViewTimingMiddleware:
+    """Innermost middleware: times URL resolution and the view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = _request_timing.get()
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            if timing is not None:
+                timing[2] += time.perf_counter() - start
+
+    async def __acall__(self, request):
+        timing = _request_timing.get()
+        start = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            if timing is not None:
+                timing[2] += time.perf_counter() - start
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    Requires ``Authorization: Bearer $METRICS_TOKEN`` when a token is
+    configured; without one it only answers in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        if not constant_time_compare(authorization, f'Bearer {token}'):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+    response = HttpResponse(exposition(merged_snapshots()), content_type='text/plain; version=0.0.4')
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,285 @@
+# sgcx_site/middleware.py
+"""
+Middleware that runs natively in both WSGI and ASGI mode.
+
+Django adapts sync middleware under ASGI by running it through
+``sync_to_async``; ``MiddlewareMixin`` does the same for every
+``process_request``/``process_response`` call. Each such call queues on the
+one thread Django keeps for sync code, so a stack of them serializes every
+request on the dyno. The middleware here instead runs on the event loop.
+"""
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware import clickjacking, common, csrf, security
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .cdn import prerendered_headers
+from .preload import preload_links
+
+
+class InlineAsyncMixin:
+    """
+    Run a ``MiddlewareMixin`` subclass's hooks directly on the event loop.
+
+    Only for middleware whose hooks do no I/O: they are then cheaper to run
+    inline than to hand to a thread.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and hasattr(self, 'process_view'):
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            self.process_view = aprocess_view
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+class SecurityMiddleware(InlineAsyncMixin, security.SecurityMiddleware):
+    pass
+
+
+class CommonMiddleware(InlineAsyncMixin, common.CommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(InlineAsyncMixin, csrf.CsrfViewMiddleware):
+    # Under ASGI the request body has already been read into memory or a
+    # temporary file by the time process_view looks at POST data.
+    pass
+
+
+class XFrameOptionsMiddleware(InlineAsyncMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+class _AsyncFileIterator:
+    """Read a static file off the event loop, in blocks."""
+
+    block_size = 64 * 1024
+
+    def __init__(self, file):
+        self.file = file
+
+    async def __aiter__(self):
+        read = sync_to_async(self.file.read, thread_sensitive=False)
+        while chunk := await read(self.block_size):
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, natively in both modes.
+
+    Under ASGI files are streamed through an async iterator rather than
+    WhiteNoise's file response, which Django would read whole in a thread.
+
+    Prerendered pages get the same ``Link: rel=preload``, ``Cache-Control``
+    and surrogate key headers as pages rendered by Django (see
+    ``sgcx_site.preload`` and ``sgcx_site.cdn``).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def add_cache_headers(self, headers, path, url):
+        super().add_cache_headers(headers, path, url)
+        # Prerendered pages (WHITENOISE_INDEX_FILE) never reach PreloadMiddleware;
+        # their headers are fixed here, once, when WhiteNoise indexes them.
+        if url.endswith('/') and path.endswith('.html'):
+            links = preload_links(url)
+            if links:
+                headers['Link'] = ', '.join(links)
+            for name, value in prerendered_headers(url).items():
+                headers[name] = value
+
+    def static_file_for(self, request):
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.static_file_for(request)
+        if static_file is None:
+            return self.get_response(request)
+        return self.serve(static_file, request)
+
+    async def __acall__(self, request):
+        static_file = self.static_file_for(request)
+        if static_file is None:
+            return await self.get_response(request)
+        return self.aserve(static_file, request)
+
+    @staticmethod
+    def aserve(static_file, request):
+        served = static_file.get_response(request.method, request.META)
+        if served.file is None:
+            # HEAD requests and 304s have no body to stream.
+            response = HttpResponse(status=int(served.status))
+        else:
+            response = StreamingHttpResponse(_AsyncFileIterator(served.file), status=int(served.status))
+        del response['Content-Type']
+        for key, value in served.headers:
+            response[key] = value
+        return response
+
+
+def _adapt(is_async, handler, handler_is_async):
+    if is_async and not handler_is_async:
+        return sync_to_async(handler, thread_sensitive=True)
+    if not is_async and handler_is_async:
+        return async_to_sync(handler)
+    return handler
+
+
+class _ProfileChain:
+    """One profile's middleware wrapped around the rest of the stack."""
+
+    def __init__(self, paths, get_response, is_async):
+        self.view_hooks = []
+        self.template_response_hooks = []
+        self.exception_hooks = []
+
+        handler, handler_is_async = get_response, is_async
+        for path in reversed(paths):
+            middleware = import_string(path)
+            if is_async:
+                middleware_is_async = getattr(middleware, 'async_capable', False)
+            else:
+                middleware_is_async = not getattr(middleware, 'sync_capable', True)
+            adapted = _adapt(middleware_is_async, handler, handler_is_async)
+            try:
+                instance = middleware(adapted)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(instance, 'process_view'):
+                self.view_hooks.insert(0, _adapt(is_async, instance.process_view,
+                                                 iscoroutinefunction(instance.process_view)))
+            if hasattr(instance, 'process_template_response'):
+                hook = instance.process_template_response
+                self.template_response_hooks.append(_adapt(is_async, hook, iscoroutinefunction(hook)))
+            if hasattr(instance, 'process_exception'):
+                hook = instance.process_exception
+                self.exception_hooks.append(_adapt(False, hook, iscoroutinefunction(hook)))
+            handler, handler_is_async = convert_exception_to_response(instance), middleware_is_async
+        self.handler = _adapt(is_async, handler, handler_is_async)
+
+
+class RouteProfileMiddleware:
+    """
+    Run a different middleware chain per URL namespace.
+
+    ``MIDDLEWARE_PROFILES`` maps profile names to lists of middleware, and
+    ``MIDDLEWARE_PROFILE_NAMESPACES`` maps top-level URL namespaces to a
+    profile; every other request gets ``MIDDLEWARE_DEFAULT_PROFILE``. The
+    profile is picked from the path prefix the namespace is included under,
+    before URL resolution, and the profile's ``process_view``,
+    ``process_template_response`` and ``process_exception`` hooks are
+    forwarded from this middleware.
+
+    The public pages use sessions, users, messages and CSRF nowhere, so their
+    profile leaves those out and an anonymous page view never reaches the
+    session store; only ``/admin/`` pays for them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+        self.chains = {
+            name: _ProfileChain(paths, get_response, self.is_async)
+            for name, paths in settings.MIDDLEWARE_PROFILES.items()
+        }
+        self.default = self.chains[settings.MIDDLEWARE_DEFAULT_PROFILE]
+        self._prefixes = None
+
+    def prefixes(self):
+        """``(path prefix, chain)`` for each profiled namespace, longest first."""
+        if self._prefixes is None:
+            prefixes = []
+            for entry in get_resolver().url_patterns:
+                profile = settings.MIDDLEWARE_PROFILE_NAMESPACES.get(getattr(entry, 'namespace', None))
+                if isinstance(entry, URLResolver) and profile:
+                    prefixes.append(('/' + str(entry.pattern), self.chains[profile]))
+            self._prefixes = sorted(prefixes, key=lambda item: len(item[0]), reverse=True)
+        return self._prefixes
+
+    def chain_for(self, request):
+        path = request.path_info
+        for prefix, chain in self.prefixes():
+            if path.startswith(prefix):
+                return chain
+        return self.default
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request._route_profile = chain = self.chain_for(request)
+        return chain.handler(request)
+
+    async def __acall__(self, request):
+        request._route_profile = chain = self.chain_for(request)
+        return await chain.handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for hook in request._route_profile.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        for hook in request._route_profile.view_hooks:
+            response = await hook(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        for hook in request._route_profile.template_response_hooks:
+            response = hook(request, response)
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        for hook in request._route_profile.template_response_hooks:
+            response = await hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        for hook in request._route_profile.exception_hooks:
+            response = hook(request, exception)
+            if response:
+                return response
+        return None
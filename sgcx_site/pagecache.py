@@ -0,0 +1,192 @@
+# sgcx_site/pagecache.py
+"""
+Full-page cache for the public views.
+
+Rendered responses are stored in the ``pages`` cache (Redis in production)
+under a key made of the content version, host and path. A deploy changes the
+content version, so entries from the previous release are never read again
+and simply age out. A small per-process LRU sits in front of the shared cache
+so repeat hits on a worker skip the network round trip as well as the
+template engine.
+
+Each entry holds the identity body plus Brotli and gzip variants compressed
+once when the page is stored; requests pick a variant by ``Accept-Encoding``
+without spending any compression CPU.
+
+With ``ASYNC_VIEWS`` (set when serving through ``sgcx_site.asgi``) the
+decorated view is a coroutine: hits are answered on the event loop, and a
+miss renders and compresses the page in a worker thread so one expensive
+render never stalls the other connections.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .compression import compress_variants, request_encoding
+from .versioning import content_version
+
+# Bumped whenever the shape of a cache entry changes, so a deploy never reads
+# entries written by the previous release's code.
+ENTRY_FORMAT = 2
+
+# Headers that are safe to replay from the cache.
+STORED_HEADERS = ('Content-Type', 'Content-Language', 'Vary')
+
+
+class LocalPageCache:
+    """Bounded in-process LRU of cached page entries."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_pages = LocalPageCache(getattr(settings, 'PAGE_CACHE_LOCAL_ENTRIES', 256))
+
+
+def page_cache_key(request):
+    """Cache key for a request: content version, host and path."""
+    return 'page:%d:%s:%s:%s' % (ENTRY_FORMAT, content_version(), request.get_host(), request.path)
+
+
+def _is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header('Cache-Control')
+    )
+
+
+def _entry_from_response(response):
+    headers = tuple(
+        (name, response[name]) for name in STORED_HEADERS if response.has_header(name)
+    )
+    bodies = compress_variants(response.content)
+    bodies[None] = response.content
+    return (response.status_code, headers, bodies)
+
+
+def _response_from_entry(entry, encoding):
+    status, headers, bodies = entry
+    if encoding not in bodies:
+        encoding = None
+    response = HttpResponse(bodies[encoding], status=status)
+    for name, value in headers:
+        response[name] = value
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def prime(request, response):
+    """Keep a freshly rendered ``response`` in this process only; ``True`` if it was cacheable."""
+    if not _is_cacheable(response):
+        return False
+    local_pages.set(page_cache_key(request), _entry_from_response(response))
+    return True
+
+
+def cached_page(view_func):
+    """
+    Serve GET/HEAD requests for ``view_func`` from the page cache.
+
+    Returns a coroutine function when ``view_func`` is one or when
+    ``ASYNC_VIEWS`` is set; synchronous views are then run in a thread.
+    """
+    if iscoroutinefunction(view_func) or settings.ASYNC_VIEWS:
+        return _async_cached_page(view_func)
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        entry = local_pages.get(key)
+        if entry is None:
+            entry = caches[settings.PAGE_CACHE_ALIAS].get(key)
+            if entry is not None:
+                local_pages.set(key, entry)
+        if entry is not None:
+            return _response_from_entry(entry, request_encoding(request))
+
+        response = view_func(request, *args, **kwargs)
+        if not _is_cacheable(response):
+            return response
+        entry = _entry_from_response(response)
+        caches[settings.PAGE_CACHE_ALIAS].set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+        local_pages.set(key, entry)
+        return _response_from_entry(entry, request_encoding(request))
+
+    return _wrapped_view
+
+
+def _async_cached_page(view_func):
+    if iscoroutinefunction(view_func):
+        call_view = view_func
+        compress = sync_to_async(_entry_from_response, thread_sensitive=False)
+
+        async def render(request, *args, **kwargs):
+            response = await view_func(request, *args, **kwargs)
+            return response, (await compress(response) if _is_cacheable(response) else None)
+    else:
+        # Other methods may touch the database, which must stay on the
+        # thread Django runs sync code on.
+        call_view = sync_to_async(view_func)
+
+        def _render(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            return response, (_entry_from_response(response) if _is_cacheable(response) else None)
+
+        render = sync_to_async(_render, thread_sensitive=False)
+
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await call_view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        entry = local_pages.get(key)
+        if entry is None:
+            entry = await caches[settings.PAGE_CACHE_ALIAS].aget(key)
+            if entry is not None:
+                local_pages.set(key, entry)
+        if entry is not None:
+            return _response_from_entry(entry, request_encoding(request))
+
+        response, entry = await render(request, *args, **kwargs)
+        if entry is None:
+            return response
+        await caches[settings.PAGE_CACHE_ALIAS].aset(key, entry, settings.PAGE_CACHE_TIMEOUT)
+        local_pages.set(key, entry)
+        return _response_from_entry(entry, request_encoding(request))
+
+    return _wrapped_view
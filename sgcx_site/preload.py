@@ -0,0 +1,119 @@
+# sgcx_site/preload.py
+"""
+``Link: rel=preload`` headers for each page's critical assets.
+
+A page's critical assets are the stylesheets, scripts and fonts referenced by
+the templates it renders: ``base.html`` and its partials plus the page's own
+template, as recorded by ``prerender`` (pages it has not seen fall back to
+``base.html``). URLs come from the static storage, so they carry the hashed
+names of the collectstatic manifest. The header is worked out once per path
+and content version.
+
+``PreloadMiddleware`` adds the header to pages rendered by Django, and
+``StaticFilesMiddleware`` to prerendered pages. Neither gunicorn nor
+uvicorn sends 103 Early Hints, so the header on the response is what the
+browser (or a CDN that turns it into Early Hints) acts on.
+"""
+
+import json
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.templatetags.static import static
+
+from .versioning import content_version, template_dependencies
+
+# Templates every page renders, for paths prerender has not recorded.
+BASE_TEMPLATES = ('base.html',)
+
+# Preload destinations by file suffix. Images are left out: {% picture %}
+# lets the browser pick a format and density, which a preload cannot.
+DESTINATIONS = {
+    '.css': 'style',
+    '.js': 'script',
+    '.woff2': 'font',
+}
+
+_links = {}
+_links_version = None
+_manifest = None
+
+
+def _page_templates(path):
+    global _manifest
+    if _manifest is None:
+        try:
+            _manifest = json.loads(Path(settings.PRERENDER_MANIFEST).read_text())
+        except (FileNotFoundError, ValueError):
+            _manifest = {}
+    entry = _manifest.get(path)
+    return entry['templates'] if entry else BASE_TEMPLATES
+
+
+def critical_links(template_names):
+    """``Link`` values preloading the critical assets of ``template_names``."""
+    _, statics = template_dependencies(template_names)
+    links = []
+    for name in statics:
+        destination = DESTINATIONS.get(Path(name).suffix)
+        if destination is None:
+            continue
+        link = f'<{static(name)}>; rel=preload; as={destination}'
+        if destination == 'font':
+            link += '; crossorigin'
+        links.append(link)
+    return links
+
+
+def _current_links():
+    global _links_version, _manifest
+    version = content_version()
+    if version != _links_version:
+        _links.clear()
+        _manifest = None
+        _links_version = version
+    return _links
+
+
+def preload_links(path):
+    """``Link`` values for the page at ``path``, computed on first use."""
+    links = _current_links()
+    if path not in links:
+        links[path] = critical_links(_page_templates(path))
+    return links[path]
+
+
+def _is_page(response):
+    return response.status_code == 200 and response.get('Content-Type', '').startswith('text/html')
+
+
+class PreloadMiddleware:
+    """Add ``Link: rel=preload`` headers for the critical assets of HTML pages."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.add_links(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_links(request, await self.get_response(request))
+
+    @staticmethod
+    def add_links(request, response):
+        # Only successful pages are remembered, so unknown paths cannot grow
+        # the per-path table.
+        if _is_page(response) and not response.has_header('Link'):
+            links = preload_links(request.path_info)
+            if links:
+                response['Link'] = ', '.join(links)
+        return response
+
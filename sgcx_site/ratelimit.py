@@ -0,0 +1,348 @@
+# sgcx_site/ratelimit.py
+"""
+Token-bucket rate limiting per client.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; each request takes one, and a request that finds the bucket empty
+is refused with 429 and a ``Retry-After`` of the time until the next token.
+Buckets live in a bounded per-process table keyed by client IP, so a flood
+of distinct clients cannot grow memory without limit; the least recently
+seen client is forgotten first and simply starts again with a full bucket.
+
+``RateLimitMiddleware`` applies ``RATE_LIMITS`` to every request before URL
+resolution, keyed by client address alone. A client whose user agent names
+a known search engine crawler gets the more generous ``bot`` limits only
+once its address is verified: its reverse DNS name must be in the
+crawler's published domains and resolve back to the address. Lookups run
+in a background thread, so until one completes (and forever, for a spoofed
+user agent) the client has the ordinary limits.
+
+Each worker decides from its own buckets, so the decision costs a dictionary
+lookup and a little arithmetic; with ``REDIS_URL`` set, a background thread
+also adds the worker's request counts to per-window counters in Redis once
+every ``RATE_LIMIT_SYNC_INTERVAL`` and blocks, for the rest of the window,
+clients that exceeded the limit across all workers and dynos together.
+"""
+
+import logging
+import math
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from .metrics import registry
+from .redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Crawlers that may get the 'bot' limits, by the name in their User-Agent,
+# with the domains their addresses' reverse DNS names end in.
+CRAWLER_DOMAINS = {
+    'googlebot': ('.googlebot.com', '.google.com', '.googleusercontent.com'),
+    'google-inspectiontool': ('.googlebot.com', '.google.com'),
+    'bingbot': ('.search.msn.com',),
+    'applebot': ('.applebot.apple.com',),
+    'yandexbot': ('.yandex.ru', '.yandex.net', '.yandex.com'),
+    'baiduspider': ('.baidu.com', '.baidu.jp'),
+    'slurp': ('.crawl.yahoo.net',),
+}
+GOOD_BOTS = re.compile('(' + '|'.join(map(re.escape, CRAWLER_DOMAINS)) + ')', re.IGNORECASE)
+
+
+def client_ip(request):
+    """
+    The address of the client, not of the proxy in front of the dyno.
+
+    Heroku's router, and a CDN in front of it, each append the address they
+    saw to ``X-Forwarded-For``, so with ``TRUSTED_PROXY_HOPS`` proxies the
+    client is that many entries from the right; anything further left was
+    supplied by the client itself.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        if len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate, burst, now):
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / rate
+
+
+class RateLimiter:
+    """``rate`` requests per second per key, in bursts of up to ``burst``."""
+
+    def __init__(self, rate, burst, max_keys=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key):
+        """0 if ``key`` may proceed, else the seconds it should wait."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.burst, now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(self.rate, self.burst, now)
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse('Too many requests, please try again later.\n', status=429,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def rate_limit(limiter, methods=('POST',)):
+    """Refuse ``methods`` requests to the view with 429 once a client's bucket is empty."""
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = limiter.acquire(client_ip(request))
+                if retry_after:
+                    return too_many_requests(retry_after)
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
+
+
+@lru_cache(maxsize=1024)
+def client_class(user_agent):
+    """``('bot', name)`` for a known good crawler, else ``('client', '')``."""
+    match = GOOD_BOTS.search(user_agent)
+    return ('bot', match.group(1).lower()) if match else ('client', '')
+
+
+def forward_confirmed(address, domains):
+    """Whether ``address``'s reverse DNS name is in ``domains`` and resolves back to it."""
+    try:
+        host = socket.gethostbyaddr(address)[0].lower().rstrip('.')
+        if not host.endswith(domains):
+            return False
+        return address in {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except OSError:
+        return False
+
+
+class CrawlerVerifier:
+    """
+    Remembers which addresses are verified crawlers, checking new ones in the background.
+
+    ``verified`` never blocks: an address it has not checked yet is queued
+    for a lookup and counts as unverified meanwhile.
+    """
+
+    def __init__(self, max_entries=4096, check=forward_confirmed):
+        self.max_entries = max_entries
+        self.check = check
+        self._results = OrderedDict()
+        self._queue = queue.Queue(maxsize=256)
+        self._pending = set()
+        self._lock = Lock()
+        self._thread = None
+        # Threads do not survive gunicorn's fork; each worker starts its own.
+        os.register_at_fork(after_in_child=self._forget_thread)
+
+    def verified(self, address, crawler):
+        key = (address, crawler)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+        with self._lock:
+            if key in self._pending or key in self._results:
+                return False
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                return False
+            self._pending.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._lookup_forever, name='crawler-dns', daemon=True)
+                self._thread.start()
+        return False
+
+    def _lookup_forever(self):
+        while True:
+            address, crawler = key = self._queue.get()
+            result = self.check(address, CRAWLER_DOMAINS[crawler])
+            with self._lock:
+                self._pending.discard(key)
+                self._results[key] = result
+                if len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+            self._queue.task_done()
+
+    def _forget_thread(self):
+        self._thread = None
+        self._lock = Lock()
+        self._pending = set()
+        self._queue = queue.Queue(maxsize=256)
+
+
+class SharedCounts:
+    """
+    Per-window request counts shared through Redis.
+
+    Requests are counted locally and added to Redis in one pipeline per
+    sync; a key whose cluster-wide count for the current window exceeds its
+    limit is blocked locally until the window ends.
+    """
+
+    def __init__(self, client, limits, window, prefix='sgcx:ratelimit'):
+        self.client = client
+        self.limits = limits  # class -> requests allowed per window
+        self.window = window
+        self.prefix = prefix
+        self._pending = {}
+        self._blocked = {}
+        self._lock = Lock()
+
+    def record(self, cls, key):
+        with self._lock:
+            self._pending[(cls, key)] = self._pending.get((cls, key), 0) + 1
+
+    def blocked_for(self, key, now):
+        """Seconds ``key`` stays blocked, or 0."""
+        until = self._blocked.get(key)
+        if until is None or until <= now:
+            return 0
+        return until - now
+
+    def sync(self, now=None):
+        """Add the local counts to Redis and block the keys over their limit."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        now = now or time.time()
+        window = int(now // self.window)
+        blocked = {key: until for key, until in self._blocked.items() if until > now}
+        if pending:
+            with self.client.pipeline(transaction=False) as pipe:
+                for (cls, key), count in pending.items():
+                    name = f'{self.prefix}:{window}:{cls}:{key}'
+                    pipe.incrby(name, count)
+                    pipe.expire(name, self.window * 2)
+                totals = pipe.execute()[::2]
+            for ((cls, key), _), total in zip(pending.items(), totals):
+                if total > self.limits[cls]:
+                    blocked[key] = (window + 1) * self.window
+        # Swapped whole, so request threads never see a dict being resized.
+        self._blocked = blocked
+
+
+class RateLimitMiddleware:
+    """Answer clients over ``RATE_LIMITS`` with 429 before any other work."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.RATE_LIMIT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.exempt = tuple(settings.RATE_LIMIT_EXEMPT)
+        self.crawlers = CrawlerVerifier()
+        self.limiters = {
+            cls: RateLimiter(rate, burst) for cls, (rate, burst) in settings.RATE_LIMITS.items()
+        }
+        client = redis_client()
+        window = settings.RATE_LIMIT_WINDOW
+        self.shared = None if client is None else SharedCounts(client, {
+            cls: rate * window + burst for cls, (rate, burst) in settings.RATE_LIMITS.items()
+        }, window)
+        self._syncer = None
+        self._syncer_lock = Lock()
+        # Threads do not survive gunicorn's fork; each worker starts its own.
+        os.register_at_fork(after_in_child=self._forget_syncer)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.check(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.check(request) or await self.get_response(request)
+
+    def check(self, request):
+        """A 429 response if the client is over its limit, else ``None``."""
+        if request.path_info.startswith(self.exempt):
+            return None
+        cls, bot = client_class(request.META.get('HTTP_USER_AGENT', ''))
+        key = client_ip(request)
+        if bot and not self.crawlers.verified(key, bot):
+            cls = 'client'
+        if self.shared is not None:
+            self._ensure_syncer()
+            blocked = self.shared.blocked_for(key, time.time())
+            if blocked:
+                registry.increment('sgcx_ratelimit_requests_total', (cls, 'cluster_limited'))
+                return too_many_requests(blocked)
+        retry_after = self.limiters[cls].acquire(key)
+        if retry_after:
+            registry.increment('sgcx_ratelimit_requests_total', (cls, 'limited'))
+            return too_many_requests(retry_after)
+        registry.increment('sgcx_ratelimit_requests_total', (cls, 'allowed'))
+        if self.shared is not None:
+            self.shared.record(cls, key)
+        return None
+
+    def _ensure_syncer(self):
+        if self._syncer is not None:
+            return
+        with self._syncer_lock:
+            if self._syncer is None:
+                self._syncer = threading.Thread(target=self._sync_forever, name='ratelimit-sync', daemon=True)
+                self._syncer.start()
+
+    def _forget_syncer(self):
+        self._syncer = None
+        self._syncer_lock = Lock()
+
+    def _sync_forever(self):
+        while True:
+            time.sleep(settings.RATE_LIMIT_SYNC_INTERVAL)
+            try:
+                self.shared.sync()
+            except Exception:
+                # Local buckets keep limiting while Redis is unreachable.
+                registry.increment('sgcx_ratelimit_sync_errors_total', ())
+                logger.warning('Could not sync rate limit counts with Redis', exc_info=True)
@@ -0,0 +1,31 @@
+# sgcx_site/redis_client.py
+"""
+The shared Redis connection for queues and counters.
+
+The page cache talks to Redis through Django's cache framework; code that
+needs lists or atomic commands uses this client instead. It is created once
+per process from ``REDIS_URL``, and is ``None`` without one (locally), so
+callers can fall back to something that needs no server.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+
+# Seconds a command may wait for its reply; blocking commands must time out
+# on the server sooner than this.
+SOCKET_TIMEOUT = 10
+
+
+@lru_cache(maxsize=None)
+def redis_client():
+    """A ``redis.Redis`` for ``REDIS_URL``, or ``None`` when it is not set."""
+    if not settings.REDIS_URL:
+        return None
+    import redis
+
+    options = {'health_check_interval': 30, 'socket_timeout': SOCKET_TIMEOUT}
+    if settings.REDIS_URL.startswith('rediss://'):
+        # Heroku Redis uses self-signed certificates.
+        options['ssl_cert_reqs'] = None
+    return redis.Redis.from_url(settings.REDIS_URL, **options)
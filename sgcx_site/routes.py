@@ -0,0 +1,81 @@
+# sgcx_site/routes.py
+"""
+Enumerate the public routes of the site from the URLconf.
+
+Build steps (prerendering, warm-up, sitemaps) need every concrete URL the
+public apps serve. Routes are discovered by walking the resolver rather than
+listed by hand, so a new ``path()`` in ``landing/urls.py`` or
+``projects/urls.py`` is picked up automatically.
+
+Parameterized views list the arguments they serve through a ``route_kwargs``
+callable attribute, and may expose ``content_fingerprint(**kwargs)`` so build
+steps can tell when the data behind one page changed.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template import Template
+from django.test import Client, override_settings
+from django.test.utils import instrumented_test_render
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from .pagecache import local_pages
+
+PUBLIC_NAMESPACES = ('landing', 'projects')
+
+Route = namedtuple('Route', ['name', 'path', 'callback', 'kwargs'])
+
+
+def _walk(patterns, namespace):
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            inner = entry.namespace or namespace
+            if inner in PUBLIC_NAMESPACES:
+                yield from _walk(entry.url_patterns, inner)
+        elif isinstance(entry, URLPattern) and namespace and entry.name:
+            yield namespace, entry
+
+
+def public_routes():
+    """Every concrete route in the public namespaces, in URLconf order."""
+    routes = []
+    for namespace, pattern in _walk(get_resolver().url_patterns, None):
+        name = f'{namespace}:{pattern.name}'
+        if not pattern.pattern.converters:
+            routes.append(Route(name, reverse(name), pattern.callback, {}))
+            continue
+        route_kwargs = getattr(pattern.callback, 'route_kwargs', None)
+        for kwargs in route_kwargs() if route_kwargs else ():
+            routes.append(Route(name, reverse(name, kwargs=kwargs), pattern.callback, kwargs))
+    return routes
+
+
+def route_fingerprint(route):
+    """Fingerprint of the data behind ``route``, if its view declares one."""
+    content_fingerprint = getattr(route.callback, 'content_fingerprint', None)
+    if content_fingerprint is None:
+        return ''
+    return content_fingerprint(**route.kwargs)
+
+
+@contextmanager
+def rendering_client():
+    """
+    Test client for build steps that need freshly rendered pages.
+
+    The page cache is bypassed so every request reaches its view, and
+    ``response.templates`` lists the templates the view rendered.
+    """
+    caches = {**settings.CACHES, settings.PAGE_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }}
+    original_render = Template._render
+    local_pages.clear()
+    Template._render = instrumented_test_render
+    try:
+        with override_settings(CACHES=caches):
+            yield Client(HTTP_HOST=settings.PRERENDER_HOST, raise_request_exception=False)
+    finally:
+        Template._render = original_render
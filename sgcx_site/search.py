@@ -0,0 +1,297 @@
+# sgcx_site/search.py
+"""
+Site search: an in-memory inverted index with BM25 ranking and typeahead.
+
+Documents are the public pages, one per URL. Each public route is rendered
+by calling its view without decorators or middleware, as warm-up does, and
+the page's text is taken from the HTML (title, description, headings and
+body, without the nav, footer and scripts), so the index never depends on
+a prerendered site. Catalog projects add their name, tagline, description
+and status to their detail page, and the tagline is what their results
+show. Fields are weighted (BM25F-style) so a match in a title counts for
+more than one in the body.
+
+The index is built once per content version, and every posting already
+holds its BM25 score, so a query is a few dictionary lookups and a sum: it
+never touches the database or the template engine. The last word of a query
+is treated as a prefix, so ``/search/?q=miss`` finds "missing" while the
+visitor is still typing, and the response suggests completions for it.
+"""
+
+import inspect
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache, wraps
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.views.decorators.cache import cache_control
+
+from projects import catalog
+
+from .routes import public_routes
+from .versioning import content_version
+
+# BM25 parameters: term frequency saturation and length normalization.
+K1 = 1.2
+B = 0.75
+
+# How much one occurrence in each field counts towards a term's frequency.
+FIELD_WEIGHTS = {
+    'title': 4,
+    'description': 2,
+    'headings': 2,
+    'body': 1,
+}
+
+# Words too common to help ranking; dropped unless they are being typed.
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the this to was we with'.split()
+)
+
+# A prefix expands to at most this many of its most frequent completions.
+MAX_EXPANSIONS = 32
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+MAX_QUERY_LENGTH = 100
+SUGGESTIONS = 5
+
+# Browsers and shared caches may reuse a result for five minutes.
+MAX_AGE = 60 * 5
+
+# Elements whose text is not page content.
+SKIPPED_TAGS = frozenset({'nav', 'footer', 'script', 'style', 'svg', 'noscript', 'template'})
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4'})
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+Document = namedtuple('Document', ['url', 'title', 'snippet'])
+
+
+def tokenize(text):
+    """Lowercase ASCII-folded words of ``text``."""
+    folded = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return _WORD.findall(folded.lower())
+
+
+def terms(text):
+    return [token for token in tokenize(text) if token not in STOP_WORDS]
+
+
+class PageTextParser(HTMLParser):
+    """Collect the searchable fields of a rendered page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields = defaultdict(list)
+        self._skipping = 0
+        self._field = 'body'
+        self._in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self._in_body = True
+        elif tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag == 'title':
+            self._field = 'title'
+        elif tag in HEADING_TAGS:
+            self._field = 'headings'
+        elif tag == 'meta' and dict(attrs).get('name') == 'description':
+            self.fields['description'].append(dict(attrs).get('content') or '')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag == 'title' or tag in HEADING_TAGS:
+            self._field = 'body'
+
+    def handle_data(self, data):
+        if self._skipping or not data.strip():
+            return
+        if self._field == 'title' or self._in_body:
+            self.fields[self._field].append(data.strip())
+
+
+def page_fields(markup):
+    """``{field: text}`` for the rendered page ``markup``."""
+    parser = PageTextParser()
+    parser.feed(markup)
+    parser.close()
+    return {field: ' '.join(parts) for field, parts in parser.fields.items()}
+
+
+def rendered_pages():
+    """``{path: fields}`` for every public route that renders a page."""
+    factory = RequestFactory(HTTP_HOST=settings.PRERENDER_HOST)
+    pages = {}
+    for route in public_routes():
+        response = inspect.unwrap(route.callback)(factory.get(route.path, secure=True), **route.kwargs)
+        if response.status_code == 200 and response.get('Content-Type', '').startswith('text/html'):
+            pages[route.path] = page_fields(response.content.decode(response.charset))
+    return pages
+
+
+def catalog_documents():
+    """``{path: fields}`` for the detail page of every catalog project."""
+    return {
+        f'/projects/{project.slug}/': {
+            'title': project.name,
+            'description': project.tagline,
+            'body': f'{project.description} {project.status}',
+        }
+        for project in catalog.PROJECTS
+    }
+
+
+def _title(fields):
+    # Page titles end in " - SGCX"; the site name is no help in a result list.
+    title = fields.get('title', '').strip()
+    return title.removesuffix(' - SGCX') or title
+
+
+class SearchIndex:
+    """Inverted index over ``{path: {field: text}}`` with precomputed BM25 scores."""
+
+    def __init__(self, pages):
+        self.documents = []
+        frequencies = []
+        for path, fields in sorted(pages.items()):
+            counts = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in terms(fields.get(field, '')):
+                    counts[term] += weight
+            snippet = fields.get('description') or fields.get('body', '')
+            self.documents.append(Document(path, _title(fields) or path, snippet[:200]))
+            frequencies.append(counts)
+
+        lengths = [sum(counts.values()) for counts in frequencies]
+        average_length = sum(lengths) / len(lengths) if lengths else 0
+        postings = defaultdict(list)
+        for doc_id, counts in enumerate(frequencies):
+            norm = K1 * (1 - B + B * lengths[doc_id] / average_length)
+            for term, frequency in counts.items():
+                postings[term].append((doc_id, frequency * (K1 + 1) / (frequency + norm)))
+
+        count = len(self.documents)
+        self.postings = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.postings[term] = {doc_id: idf * score for doc_id, score in entries}
+        self.vocabulary = sorted(self.postings)
+
+    def completions(self, prefix):
+        """Indexed terms starting with ``prefix``, most frequent first."""
+        # Every term with the prefix sorts before prefix + '{' ('z' + 1).
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + '{', start)
+        matches = self.vocabulary[start:end]
+        matches.sort(key=lambda term: (-len(self.postings[term]), term))
+        return matches[:MAX_EXPANSIONS]
+
+    def _prefix_scores(self, prefix):
+        # A document scores for its best completion of the prefix, so
+        # "project" and "projects" do not count twice.
+        scores = {}
+        for term in self.completions(prefix):
+            for doc_id, score in self.postings[term].items():
+                if score > scores.get(doc_id, 0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """``(results, suggestions)`` for ``query``; every word must match."""
+        tokens = tokenize(query[:MAX_QUERY_LENGTH])
+        if not tokens:
+            return [], []
+        typing = not query[-1:].isspace()
+        prefix = tokens.pop() if typing else None
+        words = [token for token in tokens if token not in STOP_WORDS]
+
+        matches = [self.postings.get(word, {}) for word in words]
+        suggestions = []
+        if prefix is not None:
+            completions = self.completions(prefix)
+            suggestions = completions[:SUGGESTIONS]
+            # A stop word being typed only narrows the results on its own.
+            if prefix not in STOP_WORDS or not matches:
+                matches.append(self._prefix_scores(prefix))
+        if not matches:
+            return [], suggestions
+
+        matches.sort(key=len)
+        totals = dict(matches[0])
+        for scores in matches[1:]:
+            totals = {doc_id: total + scores[doc_id] for doc_id, total in totals.items() if doc_id in scores}
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        results = [(self.documents[doc_id], score) for doc_id, score in ranked]
+        return results, suggestions
+
+
+_index = None
+_index_version = None
+
+
+def search_index():
+    """The index for the current content version, built on first use."""
+    global _index, _index_version
+    version = content_version()
+    if version != _index_version:
+        pages = rendered_pages()
+        for path, fields in catalog_documents().items():
+            page = pages.setdefault(path, {})
+            # The name and tagline replace the page's title and description.
+            for field, text in fields.items():
+                page[field] = f'{page[field]} {text}' if field == 'body' and page.get(field) else text
+        _index = SearchIndex(pages)
+        _index_version = version
+        _cached_search.cache_clear()
+    return _index
+
+
+@lru_cache(maxsize=1024)
+def _cached_search(query, limit):
+    results, suggestions = _index.search(query, limit)
+    return {
+        'query': query,
+        'results': [
+            {'url': document.url, 'title': document.title, 'snippet': document.snippet, 'score': round(score, 3)}
+            for document, score in results
+        ],
+        'suggestions': suggestions,
+    }
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    """JSON-ready results for ``query``; repeated queries are answered from a cache."""
+    search_index()
+    return _cached_search(query.lstrip()[:MAX_QUERY_LENGTH], limit)
+
+
+def _limit(request):
+    try:
+        return min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+@cache_control(public=True, max_age=MAX_AGE)
+def search_view(request):
+    """``/search/?q=<query>[&limit=N]``: ranked pages and completions as JSON."""
+    return JsonResponse(search(request.GET.get('q', ''), _limit(request)))
+
+
+# Answering from memory never blocks, so under ASGI the view runs on the
+# event loop rather than hopping to a worker thread for every keystroke.
+if settings.ASYNC_VIEWS:
+    _search_view = search_view
+
+    @wraps(_search_view)
+    async def search_view(request):
+        return _search_view(request)
@@ -0,0 +1,127 @@
+# sgcx_site/serving.py
+"""
+Gunicorn server profiles, sized from the machine the dyno runs on.
+
+``gunicorn.conf.py`` calls ``server_config()`` and applies the result. The
+profile is chosen with ``GUNICORN_PROFILE``:
+
+``sync``
+    One request per worker process. Simple, but a slow client holds a whole
+    worker for as long as it takes to send its request.
+``gthread`` (default)
+    Several threads per worker. Slow clients only hold a thread, and the
+    memory cost per extra request slot is a thread stack, not a process.
+``uvicorn``
+    The ASGI application under uvicorn's event loop, one loop per worker.
+
+Workers are the smaller of what the CPUs warrant and what memory allows at
+``WORKER_MEMORY_MB`` per worker. ``WEB_CONCURRENCY`` (set by Heroku per dyno
+size) and ``GUNICORN_THREADS`` override the computed values.
+
+This module does not import Django, so the config file can load it before
+the application is imported.
+"""
+
+import os
+from pathlib import Path
+
+PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'wsgi_app': 'sgcx_site.wsgi:application',
+        'threads': 1,
+    },
+    'gthread': {
+        'worker_class': 'gthread',
+        'wsgi_app': 'sgcx_site.wsgi:application',
+        'threads': 4,
+    },
+    'uvicorn': {
+        'worker_class': 'uvicorn_worker.UvicornWorker',
+        'wsgi_app': 'sgcx_site.asgi:application',
+        'threads': 1,
+    },
+}
+DEFAULT_PROFILE = 'gthread'
+
+# Resident size of one worker after serving every page, with some headroom.
+WORKER_MEMORY_MB = 96
+
+# Workers serve this many requests (plus up to the jitter) before they are
+# replaced, so slow leaks are bounded and workers do not all restart at once.
+MAX_REQUESTS = 2000
+MAX_REQUESTS_JITTER = 200
+
+
+def available_cpus():
+    """CPUs this process may use, honouring affinity and cgroup quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_mb():
+    """Memory available to this container in MB, or ``None`` if unknown."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            limit = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number.
+        if limit != 'max' and int(limit) < 1 << 50:
+            return int(limit) // (1024 * 1024)
+    try:
+        for line in Path('/proc/meminfo').read_text().splitlines():
+            if line.startswith('MemTotal:'):
+                return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def worker_count(profile, cpus, memory_mb, worker_memory_mb=WORKER_MEMORY_MB):
+    """Workers for ``profile`` on a machine with ``cpus`` and ``memory_mb``."""
+    if profile == 'sync':
+        # Sync workers block on I/O, so run more of them than there are CPUs.
+        workers = 2 * cpus + 1
+    elif profile == 'gthread':
+        workers = cpus + 1
+    else:
+        workers = cpus
+    if memory_mb:
+        workers = min(workers, memory_mb // worker_memory_mb)
+    return max(1, workers)
+
+
+def server_config(environ=os.environ):
+    """Gunicorn settings for the profile named by ``GUNICORN_PROFILE``."""
+    name = environ.get('GUNICORN_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f'Unknown GUNICORN_PROFILE {name!r}; choose from {", ".join(PROFILES)}')
+    profile = PROFILES[name]
+
+    workers = environ.get('WEB_CONCURRENCY')
+    if workers:
+        workers = int(workers)
+    else:
+        worker_memory_mb = int(environ.get('WORKER_MEMORY_MB', WORKER_MEMORY_MB))
+        workers = worker_count(name, available_cpus(), available_memory_mb(), worker_memory_mb)
+    threads = int(environ.get('GUNICORN_THREADS', profile['threads']))
+
+    return {
+        'profile': name,
+        'wsgi_app': profile['wsgi_app'],
+        'worker_class': profile['worker_class'],
+        'workers': workers,
+        'threads': threads,
+        'max_requests': MAX_REQUESTS,
+        'max_requests_jitter': MAX_REQUESTS_JITTER,
+    }
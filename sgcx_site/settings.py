@@ -13,6 +13,12 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+from sgcx_site.database import database_config, pool_size
+from sgcx_site.serving import server_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -20,16 +26,22 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-5evif9ch5oqf**b#fp$vsc+lf4pn3x*8leo^k6z2c2cf_ytn9e'
+IS_HEROKU = 'DYNO' in os.environ
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Read from the environment (or a .env file); off unless turned on, so a
+# deployment that forgets it never shows tracebacks.
+DEBUG = config('DEBUG', default=False, cast=bool)
+
+# SECURITY WARNING: keep the secret key used in production secret!
+if DEBUG:
+    SECRET_KEY = config('SECRET_KEY', default='django-insecure-5evif9ch5oqf**b#fp$vsc+lf4pn3x*8leo^k6z2c2cf_ytn9e')
+else:
+    SECRET_KEY = config('SECRET_KEY')
 
 ALLOWED_HOSTS = ['ertihan.herokuapp.com', 'sgcx.org', 'www.sgcx.org', 'localhost', '127.0.0.1']
 
 # Force HTTPS only in production (when DEBUG=False or on Heroku)
-IS_HEROKU = 'DYNO' in os.environ
 if not DEBUG or IS_HEROKU:
     SECURE_SSL_REDIRECT = True
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -37,41 +49,83 @@ if not DEBUG or IS_HEROKU:
 
 # Application definition
 
-INSTALLED_APPS = [
+# 'full' serves /admin/. 'public' installs only what the public pages use, so
+# a web dyno boots without importing admin, auth, contenttypes, sessions or
+# messages; run management commands that need them with SITE_PROFILE=full.
+SITE_PROFILE = config('SITE_PROFILE', default='full')
+if SITE_PROFILE not in ('full', 'public'):
+    raise ImproperlyConfigured(f"SITE_PROFILE must be 'full' or 'public', not {SITE_PROFILE!r}")
+ADMIN_ENABLED = SITE_PROFILE == 'full'
+
+ADMIN_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+]
+
+INSTALLED_APPS = [
+    *(ADMIN_APPS if ADMIN_ENABLED else []),
+    'landing',  # Landing page app; before staticfiles to extend collectstatic
     'django.contrib.staticfiles',
-    'landing',  # Landing page app
     'projects', # projects app
 ]
 
+# The sgcx_site.middleware versions of Django's middleware run on the event
+# loop under ASGI instead of hopping to a thread for every hook (see there).
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sgcx_site.metrics.TimingMiddleware',  # Keep first: times everything below
+    'sgcx_site.ratelimit.RateLimitMiddleware',  # Refuses floods before any work
+    'sgcx_site.middleware.SecurityMiddleware',
+    'sgcx_site.middleware.StaticFilesMiddleware',
+    'sgcx_site.middleware.RouteProfileMiddleware',  # Adds MIDDLEWARE_PROFILES
+    'sgcx_site.middleware.CommonMiddleware',
+    'sgcx_site.middleware.XFrameOptionsMiddleware',
+    'sgcx_site.metrics.ViewTimingMiddleware',  # Keep last: times the view
 ]
 
+# Middleware that only some URL namespaces need (see RouteProfileMiddleware).
+# The public pages use no sessions, users, messages or forms, so only the
+# admin pays for them; only the public pages preload their critical assets.
+MIDDLEWARE_PROFILES = {
+    'public': [
+        'sgcx_site.preload.PreloadMiddleware',
+    ],
+}
+MIDDLEWARE_PROFILE_NAMESPACES = {}
+MIDDLEWARE_DEFAULT_PROFILE = 'public'
+
+if ADMIN_ENABLED:
+    MIDDLEWARE_PROFILES['admin'] = [
+        'django.contrib.sessions.middleware.SessionMiddleware',  # Saves to the database
+        'sgcx_site.middleware.CsrfViewMiddleware',
+        'sgcx_site.admin_middleware.AuthenticationMiddleware',
+        'sgcx_site.admin_middleware.MessageMiddleware',
+    ]
+    MIDDLEWARE_PROFILE_NAMESPACES['admin'] = 'admin'
+
+# The admin's checks look for these in MIDDLEWARE; the 'admin' profile
+# installs them for every /admin/ request instead.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'sgcx_site.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render timing (see sgcx_site.metrics).
+        'BACKEND': 'sgcx_site.metrics.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'sgcx_site/templates'],  # Add this line
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
+                *([
+                    'django.contrib.auth.context_processors.auth',
+                    'django.contrib.messages.context_processors.messages',
+                ] if ADMIN_ENABLED else []),
             ],
         },
     },
@@ -79,17 +133,74 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'sgcx_site.wsgi.application'
 
+# Serve the public views as coroutines. sgcx_site/asgi.py turns this on, so
+# the same code runs natively under either gunicorn profile.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Heroku Postgres sets DATABASE_URL; without it a tuned local SQLite file is
+# used (see sgcx_site.database). Postgres connections are pooled per process,
+# one per server thread, unless DATABASE_POOL is off, in which case they
+# persist for DATABASE_CONN_MAX_AGE seconds. DATABASE_MAX_CONNECTIONS caps
+# what one dyno's workers hold in total.
+DATABASE_URL = config('DATABASE_URL', default='')
+DATABASE_POOL = config('DATABASE_POOL', default=True, cast=bool)
+
+_server = server_config()
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_config(
+        DATABASE_URL,
+        BASE_DIR / 'db.sqlite3',
+        pool_size=pool_size(
+            _server['workers'],
+            _server['threads'],
+            config('DATABASE_MAX_CONNECTIONS', default=0, cast=int),
+        ) if DATABASE_POOL else None,
+        conn_max_age=config('DATABASE_CONN_MAX_AGE', default=600, cast=int),
+        require_ssl=IS_HEROKU,
+    ),
+}
+
+
+# Caching
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Heroku Data for Redis exposes REDIS_URL; fall back to per-process memory
+# locally so the page cache works without a Redis server.
+REDIS_URL = config('REDIS_URL', default=None)
+
+if REDIS_URL:
+    PAGE_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'sgcx',
     }
+    if REDIS_URL.startswith('rediss://'):
+        # Heroku Redis uses self-signed certificates.
+        PAGE_CACHE_BACKEND['OPTIONS'] = {'ssl_cert_reqs': None}
+else:
+    PAGE_CACHE_BACKEND = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sgcx-pages',
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': PAGE_CACHE_BACKEND,
 }
 
+# Full-page cache for the landing and projects views (see sgcx_site.pagecache).
+# Keys include the content version, so a deploy invalidates every entry and
+# the timeout only bounds how long orphaned entries linger in Redis.
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_LOCAL_ENTRIES = 256
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -133,8 +244,113 @@ STATICFILES_DIRS = [
     BASE_DIR / 'landing/static',
 ]
 
-# Simplified static file serving with WhiteNoise
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Simplified static file serving with WhiteNoise. Django 5.1 removed the old
+# STATICFILES_STORAGE setting, so the storage is configured through STORAGES.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# CSS heights (1x) of images rendered with {% picture %}; build_images makes
+# 1x/2x/3x variants of these. Other images are treated as their own 3x asset.
+RESPONSIVE_IMAGE_HEIGHTS = {
+    'images/sgcx-logo-small-white.png': 32,
+}
+
+# Per-template critical CSS written by `manage.py build_critical_css`.
+CRITICAL_CSS_ROOT = BASE_DIR / 'prerendered' / 'critical_css'
+
+# Static HTML written by `manage.py prerender`. In production WhiteNoise serves
+# these files directly, so prerendered paths never reach a Django view.
+PRERENDER_ROOT = BASE_DIR / 'prerendered' / 'site'
+PRERENDER_MANIFEST = BASE_DIR / 'prerendered' / 'manifest.json'
+PRERENDER_HOST = 'sgcx.org'
+
+if (not DEBUG or IS_HEROKU) and PRERENDER_ROOT.is_dir():
+    WHITENOISE_ROOT = PRERENDER_ROOT
+    WHITENOISE_INDEX_FILE = True
+
+# CDN in front of the site (see sgcx_site.cdn): the backend sets the surrogate
+# key header and purges changed keys when `manage.py purge_cdn` runs after a
+# deploy. CDN_SERVICE is the Fastly service ID or the Cloudflare zone ID.
+# The keys of the last purge are kept in Redis, or without it in
+# CDN_STATE_FILE, which does not survive a dyno: on Heroku purge_cdn refuses
+# to run without REDIS_URL. The web dynos purge the release's keys again
+# CDN_REPURGE_DELAY seconds after they are ready; with preboot, set it to how
+# long the old dynos keep serving.
+CDN_BACKEND = config('CDN_BACKEND', default='sgcx_site.cdn.LocalBackend')
+CDN_OPTIONS = {
+    'api_token': config('CDN_API_TOKEN', default=''),
+    'service': config('CDN_SERVICE', default=''),
+}
+CDN_STATE_FILE = config('CDN_STATE_FILE', default=str(BASE_DIR / '.cdn_keys.json'), cast=Path)
+CDN_REPURGE_DELAY = config('CDN_REPURGE_DELAY', default=0, cast=int)
+
+# Seconds gunicorn's arbiter may spend warming the app up before it forks
+# workers (see sgcx_site.warmup); whatever is left is warmed by first requests.
+WARMUP_BUDGET = config('WARMUP_BUDGET', default=5.0, cast=float)
+
+# Request metrics (see sgcx_site.metrics). Set METRICS_DIR to a directory
+# shared by the gunicorn workers so a scrape of /internal/metrics/ covers all
+# of them; METRICS_TOKEN is the bearer token the scraper must send.
+METRICS_DIR = config('METRICS_DIR', default=None)
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_TOKEN = config('METRICS_TOKEN', default=None)
+METRICS_SERVER_TIMING = True
+
+# Outgoing mail, sent by the deliver_contact worker. Development prints
+# messages to the console instead.
+EMAIL_BACKEND = config(
+    'EMAIL_BACKEND',
+    default='django.core.mail.backends.console.EmailBackend' if DEBUG else 'django.core.mail.backends.smtp.EmailBackend',
+)
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='SGCX <noreply@sgcx.org>')
+
+# Contact form (see landing.outbox): where each kind of submission goes, the
+# Redis list they are queued on, and how often one client may submit: bursts
+# of CONTACT_BURST, then one every CONTACT_REFILL_SECONDS.
+CONTACT_RECIPIENTS = {
+    'general': 'contact@sgcx.org',
+    'collaboration': 'research@sgcx.org',
+    'lacuna': 'lacuna@sgcx.org',
+}
+CONTACT_QUEUE = 'sgcx:contact'
+CONTACT_BURST = 5
+CONTACT_REFILL_SECONDS = 120
+
+# Proxies in front of the app that append to X-Forwarded-For (Heroku's
+# router, and the CDN when CDN_BACKEND names one); rate limits key on the
+# address the outermost of them saw. Counting too few hops would rate limit
+# the CDN's edge servers instead of their clients.
+TRUSTED_PROXY_HOPS = config(
+    'TRUSTED_PROXY_HOPS',
+    default=(1 if IS_HEROKU else 0) + (CDN_BACKEND != 'sgcx_site.cdn.LocalBackend'),
+    cast=int,
+)
+
+# Per-client rate limits (see sgcx_site.ratelimit): (requests per second,
+# burst) for visitors and for known search engine crawlers. With Redis, the
+# same limits also apply across every worker and dyno per RATE_LIMIT_WINDOW
+# seconds, synced every RATE_LIMIT_SYNC_INTERVAL. Static files are exempt: a
+# page view fetches several.
+RATE_LIMIT = config('RATE_LIMIT', default=True, cast=bool)
+RATE_LIMITS = {
+    'client': (5, 50),
+    'bot': (20, 100),
+}
+RATE_LIMIT_WINDOW = 10
+RATE_LIMIT_SYNC_INTERVAL = 1.0
+RATE_LIMIT_EXEMPT = (STATIC_URL,)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,107 @@
+# sgcx_site/sitemap.py
+"""
+``/sitemap.xml`` and ``/robots.txt``.
+
+The sitemap lists every public route (see ``sgcx_site.routes``), including a
+detail page per catalog project. Each ``lastmod`` is the newest modification
+time among the templates the page renders, as recorded by ``prerender``, and
+the view module serving it, so crawlers only revisit pages that changed.
+Without a prerender manifest every page reports the content's newest change.
+
+Both documents are built once per content version and served through the page
+cache and conditional GET like the pages themselves, with a long shared-cache
+lifetime on top: a deploy changes the version, and with it the ETag.
+"""
+
+import inspect
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template import TemplateDoesNotExist
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+
+from .conditional import conditional_page
+from .pagecache import cached_page
+from .routes import public_routes
+from .versioning import content_last_modified, content_version, templates_last_modified
+
+# Crawlers have nothing to index here; search results only repeat pages.
+DISALLOWED_PATHS = ('/admin/', '/internal/', '/search/')
+
+# Browsers and shared caches may reuse both documents for a day.
+MAX_AGE = 60 * 60 * 24
+
+_entries = None
+_entries_version = None
+
+
+def _manifest():
+    try:
+        return json.loads(Path(settings.PRERENDER_MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def route_last_modified(route, templates):
+    """Newest change to ``route``'s view module or to ``templates``."""
+    if not templates:
+        return content_last_modified()
+    try:
+        newest = templates_last_modified(templates)
+    except TemplateDoesNotExist:
+        return content_last_modified()
+    view_source = Path(inspect.getsourcefile(inspect.unwrap(route.callback)))
+    view_modified = datetime.fromtimestamp(int(view_source.stat().st_mtime), tz=timezone.utc)
+    return max(newest, view_modified)
+
+
+def sitemap_entries():
+    """``[(path, lastmod)]`` for every public route, once per content version."""
+    global _entries, _entries_version
+    version = content_version()
+    if version != _entries_version:
+        manifest = _manifest()
+        _entries = [
+            (route.path, route_last_modified(route, manifest.get(route.path, {}).get('templates')))
+            for route in public_routes()
+        ]
+        _entries_version = version
+    return _entries
+
+
+def sitemap_xml(request):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for path, lastmod in sitemap_entries():
+        lines.append(
+            f'<url><loc>{escape(request.build_absolute_uri(path))}</loc>'
+            f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod></url>'
+        )
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def robots_txt(request):
+    lines = ['User-agent: *']
+    lines += [f'Disallow: {path}' for path in DISALLOWED_PATHS]
+    lines.append(f"Sitemap: {request.build_absolute_uri(reverse('sitemap'))}")
+    return '\n'.join(lines) + '\n'
+
+
+@cache_control(public=True, max_age=MAX_AGE)
+@conditional_page
+@cached_page
+def sitemap_view(request):
+    return HttpResponse(sitemap_xml(request), content_type='application/xml; charset=utf-8')
+
+
+@cache_control(public=True, max_age=MAX_AGE)
+@conditional_page
+@cached_page
+def robots_view(request):
+    return HttpResponse(robots_txt(request), content_type='text/plain; charset=utf-8')
@@ -14,12 +14,30 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from django.urls import path, include
 
+from landing.views import contact_submit
+
+from .metrics import metrics_view
+from .search import search_view
+from .sitemap import robots_view, sitemap_view
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    path('internal/metrics/', metrics_view, name='metrics'),
+    path('sitemap.xml', sitemap_view, name='sitemap'),
+    path('robots.txt', robots_view, name='robots'),
+    path('search/', search_view, name='search'),
+    # Outside the landing namespace: prerender and the sitemap only GET pages.
+    path('contact/send/', contact_submit, name='contact_submit'),
     path('', include('landing.urls')),  # Landing page at root
     path('projects/', include('projects.urls')),  # Projects under /projects/
+    path('api/projects/', include('projects.api_urls')),  # The catalog as JSON
 ]
+
+# The public site profile does not install the admin (see SITE_PROFILE).
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -0,0 +1,183 @@
+# sgcx_site/versioning.py
+"""
+Content version for the public site.
+
+Every page is a pure function of its templates, the Python that renders
+them (views, template tags and the code those call), the project catalog
+and the static manifest (which fixes the hashed asset URLs in the HTML), so
+a single fingerprint over those inputs tells caches when rendered output
+may have changed. The fingerprint is computed once per process; a deploy starts
+new processes and therefore a new version.
+"""
+
+import hashlib
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.dispatch import receiver
+from django.template import engines
+from django.utils.autoreload import file_changed
+
+from projects import catalog
+
+# Python that shapes the rendered HTML, relative to BASE_DIR: the public
+# views, template tags and the modules they render through.
+RENDERING_SOURCES = (
+    'landing/views.py',
+    'landing/templatetags',
+    'projects/views.py',
+    'projects/templatetags',
+    'projects/themes.py',
+    'logo_gen.py',
+    'sgcx_site/critical_css.py',
+    'sgcx_site/fragments.py',
+    'sgcx_site/images.py',
+    'sgcx_site/logo.py',
+)
+
+
+def project_template_dirs():
+    """Template directories that belong to this project (not to Django)."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = []
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory).resolve()
+            if directory.is_relative_to(base_dir) and directory.is_dir():
+                dirs.append(directory)
+    return dirs
+
+
+def template_files():
+    """All project template files, sorted for a stable fingerprint."""
+    files = []
+    for directory in project_template_dirs():
+        files.extend(path for path in directory.rglob('*') if path.is_file())
+    return sorted(files)
+
+
+def rendering_sources():
+    """The Python files of ``RENDERING_SOURCES``, sorted."""
+    base_dir = Path(settings.BASE_DIR)
+    files = []
+    for name in RENDERING_SOURCES:
+        path = base_dir / name
+        files.extend(path.rglob('*.py') if path.is_dir() else [path])
+    return sorted(files)
+
+
+# Any template tag argument naming a template: extends, include, fragment, ...
+_TEMPLATE_REF = re.compile(r"""{%[^%]*?['"]([\w./-]+\.html)['"][^%]*%}""")
+_STATIC_REF = re.compile(r"""{%\s*(?:static|critical_css|picture)\s+['"]([^'"]+)['"]""")
+
+
+def static_manifest_path():
+    """The collectstatic manifest, or ``None`` when static files are not collected."""
+    if not settings.STATIC_ROOT:
+        return None
+    path = Path(settings.STATIC_ROOT) / 'staticfiles.json'
+    return path if path.is_file() else None
+
+
+def template_source(template_name):
+    template = engines['django'].engine.get_template(template_name)
+    return Path(template.origin.name).read_text(encoding='utf-8')
+
+
+def template_dependencies(template_names):
+    """
+    Templates and static files reachable from ``template_names``.
+
+    Returns ``(templates, static_names)``, both sorted. Template references
+    are found by scanning tag arguments, so fragments and cards rendered
+    through custom tags are included along with ``extends``/``include``.
+    """
+    seen = set()
+    statics = set()
+    pending = list(template_names)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = template_source(name)
+        pending.extend(_TEMPLATE_REF.findall(source))
+        statics.update(_STATIC_REF.findall(source))
+    return sorted(seen), sorted(statics)
+
+
+def dependency_fingerprint(template_names, extra=()):
+    """Digest of the templates and static files a page depends on."""
+    templates, statics = template_dependencies(template_names)
+    digest = hashlib.sha256()
+    digest.update(django.get_version().encode())
+    for name in templates:
+        digest.update(name.encode())
+        digest.update(template_source(name).encode())
+    for name in statics:
+        digest.update(name.encode())
+        path = finders.find(name)
+        if path:
+            digest.update(Path(path).read_bytes())
+    for chunk in extra:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def templates_last_modified(template_names):
+    """Newest modification time among ``template_names`` and the templates they use."""
+    templates, _ = template_dependencies(template_names)
+    engine = engines['django'].engine
+    newest = max(Path(engine.get_template(name).origin.name).stat().st_mtime for name in templates)
+    return datetime.fromtimestamp(int(newest), tz=timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def content_version():
+    """Short hex digest over templates, rendering code, the project catalog and Django."""
+    digest = hashlib.sha256()
+    digest.update(django.get_version().encode())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for path in template_files():
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    for path in rendering_sources():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(catalog.VERSION.encode())
+    manifest = static_manifest_path()
+    if manifest:
+        digest.update(manifest.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def content_last_modified():
+    """Newest modification time among the inputs to ``content_version()``."""
+    paths = template_files() + rendering_sources() + [Path(catalog.__file__)]
+    manifest = static_manifest_path()
+    if manifest:
+        paths.append(manifest)
+    newest = max(path.stat().st_mtime for path in paths)
+    return datetime.fromtimestamp(int(newest), tz=timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def base_version():
+    """Short hex digest of ``base.html``, its partials and the assets they reference."""
+    return dependency_fingerprint(['base.html'])[:12]
+
+
+@receiver(file_changed, dispatch_uid='sgcx_content_version_template_changed')
+def template_changed(sender, file_path, **kwargs):
+    """Pick up template edits under runserver without a restart."""
+    file_path = Path(file_path).resolve()
+    if any(file_path.is_relative_to(directory) for directory in project_template_dirs()):
+        content_version.cache_clear()
+        content_last_modified.cache_clear()
+        base_version.cache_clear()
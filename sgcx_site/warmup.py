@@ -0,0 +1,125 @@
+# sgcx_site/warmup.py
+"""
+Warm the application up before it serves its first request.
+
+Without this, the first request to each page after a deploy or the daily
+dyno restart pays for populating the URL resolver, parsing the static
+files manifest, compiling templates and building the search index.
+``warm_up()`` does that work once, in gunicorn's arbiter after the app is
+preloaded (see ``gunicorn.conf.py``). Every forked worker then starts warm
+and shares the result copy-on-write.
+
+Every public route is rendered by calling its view without decorators or
+middleware. That means no page cache lookup, no database or Redis
+connection and no event loop: nothing the arbiter should not carry across
+the fork. Unless WhiteNoise serves the prerendered site (so these paths
+never reach Django), the rendered pages also go into this process's page
+cache (``pagecache.local_pages``). Each worker then answers its first
+request for a page from memory. Compressing the pages for the cache takes
+most of the warm-up time.
+
+Steps run in order, cheapest and most widely useful first. Once
+``WARMUP_BUDGET`` seconds have passed, the remaining steps and pages are
+skipped and left to the first requests, so warm-up never holds up the
+workers longer than that. A step that fails is logged and skipped: a cold
+page is better than a dyno that does not boot.
+"""
+
+import inspect
+import logging
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import engines
+from django.test import RequestFactory
+
+from .pagecache import prime
+from .preload import preload_links
+from .routes import public_routes
+from .search import search_index
+from .versioning import base_version, content_version, project_template_dirs
+
+logger = logging.getLogger(__name__)
+
+
+class Report(namedtuple('Report', ['seconds', 'steps', 'pages', 'skipped'])):
+    """How long warm-up took, per step, and the pages it rendered or skipped."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        text = f'Warm-up took {self.seconds * 1000:.0f}ms'
+        if self.steps:
+            text += ' (' + ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in self.steps.items()) + ')'
+        text += f'; {self.pages} page(s) rendered'
+        if self.skipped:
+            text += f", budget spent, skipped: {', '.join(self.skipped)}"
+        return text
+
+
+def compile_templates():
+    """Load every project template into the cached template loader."""
+    engine = engines['django'].engine
+    for directory in project_template_dirs():
+        for path in sorted(directory.rglob('*.html')):
+            engine.get_template(path.relative_to(directory).as_posix())
+
+
+def load_static_manifest():
+    """Parse ``staticfiles.json``, which the storage does when it is first used."""
+    return len(staticfiles_storage.hashed_files)
+
+
+def render_page(factory, route, cache):
+    """Render ``route``, keeping the page in this process's page cache if ``cache``."""
+    request = factory.get(route.path, secure=True)
+    response = inspect.unwrap(route.callback)(request, **route.kwargs)
+    if cache:
+        prime(request, response)
+    preload_links(route.path)
+
+
+def warm_up(budget=None):
+    """Run the warm-up steps until they finish or ``budget`` seconds pass."""
+    budget = settings.WARMUP_BUDGET if budget is None else budget
+    start = time.perf_counter()
+    deadline = start + budget
+    steps = {}
+    skipped = []
+    routes = []
+
+    def run(name, step, *args):
+        """``True`` if ``step`` succeeded; its time is added to ``name``'s."""
+        began = time.perf_counter()
+        try:
+            step(*args)
+        except Exception:
+            logger.warning('Warm-up step %s failed for %r', name, args, exc_info=True)
+            return False
+        finally:
+            steps[name] = steps.get(name, 0) + time.perf_counter() - began
+        return True
+
+    for name, step in (
+        ('urls', lambda: routes.extend(public_routes())),
+        ('static manifest', load_static_manifest),
+        ('content version', lambda: (content_version(), base_version())),
+        ('templates', compile_templates),
+        ('search index', search_index),
+    ):
+        if time.perf_counter() >= deadline:
+            skipped.append(name)
+        else:
+            run(name, step)
+
+    factory = RequestFactory(HTTP_HOST=settings.PRERENDER_HOST)
+    cache = not getattr(settings, 'WHITENOISE_INDEX_FILE', False)
+    pages = 0
+    for route in routes:
+        if time.perf_counter() >= deadline:
+            skipped.append(route.path)
+        elif run('pages', render_page, factory, route, cache):
+            pages += 1
+    return Report(time.perf_counter() - start, steps, pages, skipped)